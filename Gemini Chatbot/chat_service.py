@@ -1,14 +1,44 @@
+import json
 import os
+import threading
+import time
 from google import genai
 from google.genai import types
 from dotenv import load_dotenv
+from retrieval import HybridRetriever, tokenize
+from semantic_cache import SemanticCache
 
 # Prevent Windows/ISP IPv6 routing drops for the Gemini connections
 os.environ["GRPC_DNS_RESOLVER"] = "native"
 
+# RAG context sizing: candidates per collection, and the prompt budget they are trimmed to
+RETRIEVAL_LIMITS = {"academic": 5, "course": 5, "job": 5}
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CHAT_CONTEXT_TOKENS", "400"))
+# A local index built from MongoDB is rebuilt after this long, so new scrapes show up
+RETRIEVAL_REFRESH_S = float(os.getenv("CHAT_RETRIEVAL_REFRESH_S", "3600"))
+GENERIC_ACADEMIC_QUERY = "university career study job institute college"
+
+# Answer reuse across paraphrased questions (see semantic_cache.py)
+CACHE_ENABLED = os.getenv("CHAT_CACHE_ENABLED", "1") == "1"
+CACHE_THRESHOLD = float(os.getenv("CHAT_CACHE_THRESHOLD", "0.92"))
+CACHE_TTL_S = float(os.getenv("CHAT_CACHE_TTL_S", "86400"))
+# Follow-up questions depend on the conversation; only openers (this many prior user turns) use the cache
+CACHE_MAX_HISTORY_TURNS = int(os.getenv("CHAT_CACHE_MAX_HISTORY_TURNS", "0"))
+# JSONL log of questions and answers, replayable with `python semantic_cache.py replay`
+CHAT_LOG_PATH = os.getenv("CHAT_LOG_PATH")
+
 class ChatService:
-    def __init__(self, db=None):
+    def __init__(self, db=None, retriever=None, cache=None):
         self.db = db          #  MongoDB
+        # HybridRetriever, or a callable returning the current one (e.g. rebuilt per engine data release)
+        self.retriever = retriever
+        self._retriever_lock = threading.Lock()
+        self._retriever_failed_at = 0.0
+        # Standalone (no encoder) the cache only reuses answers to identical normalized questions
+        if cache is None and CACHE_ENABLED:
+            cache = SemanticCache(threshold=CACHE_THRESHOLD, ttl_s=CACHE_TTL_S)
+        self.cache = cache
+        self._log_lock = threading.Lock()
         self._setup_gemini()
 
     def _setup_gemini(self):
@@ -86,17 +116,73 @@ class ChatService:
         except Exception:
             return ""
 
+    def _get_retriever(self):
+        """Local BM25 + embedding index; without one passed in, built from MongoDB on first use (and refreshed)."""
+        if callable(self.retriever):
+            try:
+                return self.retriever()
+            except Exception as e:
+                print(f"Chat retrieval index unavailable, using Mongo lookups: {e}")
+                return None
+        if self.db is None:
+            return self.retriever
+        with self._retriever_lock:
+            stale = self.retriever is not None and self.retriever.version == "mongo" and time.time() - self.retriever.built_at > RETRIEVAL_REFRESH_S
+            if (self.retriever is None or stale) and time.time() - self._retriever_failed_at > RETRIEVAL_REFRESH_S:
+                try:
+                    self.retriever = HybridRetriever.from_mongo(self.db)
+                except Exception as e:
+                    # Keep serving the old index (or the regex lookups) until the next refresh window
+                    print(f"Failed to build chat retrieval index: {e}")
+                    self._retriever_failed_at = time.time()
+            return self.retriever
+
+    def get_retrieved_context(self, retriever, query):
+        """(academic, jobs) context from the local index, trimmed to CONTEXT_TOKEN_BUDGET."""
+        if tokenize(query):
+            hits = retriever.context(query, RETRIEVAL_LIMITS, CONTEXT_TOKEN_BUDGET)
+        else:
+            # Small talk: general study options, no vacancies (as the regex lookups did)
+            hits = retriever.context(GENERIC_ACADEMIC_QUERY, {"academic": 5, "course": 5}, CONTEXT_TOKEN_BUDGET)
+        return " | ".join(hits.get("academic", []) + hits.get("course", [])), " | ".join(hits.get("job", []))
+
     def get_smart_context(self, user_id, user_message=""):
         """Silent RAG only answers what it is questioned for and based on context and try not to hallucinate."""
         context_parts = []
-        acad = self.get_academic_context(user_message)
-        jobs = self.get_job_context(user_message)
+        retriever = self._get_retriever()
+        if retriever is not None:
+            acad, jobs = self.get_retrieved_context(retriever, str(user_message))
+        else:
+            acad = self.get_academic_context(user_message)
+            jobs = self.get_job_context(user_message)
         if acad: context_parts.append(f"Academic: {acad}")
         if jobs: context_parts.append(f"Live Vacancies: {jobs}")
         return " | ".join(context_parts) if context_parts else ""
 
-    def get_reply(self, user_id, user_message, chat_history=None):
+    def _log_exchange(self, **record):
+        if not CHAT_LOG_PATH:
+            return
+        try:
+            with self._log_lock, open(CHAT_LOG_PATH, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"ts": time.time(), **record}, default=str) + "\n")
+        except OSError as e:
+            print(f"Chat log write failed: {e}")
+
+    def get_reply(self, user_id, user_message, chat_history=None, profile=None):
         """Standard reply logic using the new generate_content logic mimicking start_chat."""
+        user_turns = sum(1 for m in chat_history or [] if isinstance(m, dict) and m.get("role", "user") == "user")
+        use_cache = self.cache is not None and user_turns <= CACHE_MAX_HISTORY_TURNS
+        if use_cache:
+            try:
+                hit = self.cache.lookup(user_message, profile)
+            except Exception as e:
+                print(f"Chat cache lookup failed: {e}")
+                hit = None
+            if hit:
+                self._log_exchange(user_id=user_id, message=user_message, profile=profile, history_turns=user_turns,
+                                   reply=hit["reply"], cached=True, similarity=hit["similarity"])
+                return hit["reply"]
+
         try:
             facts = self.get_smart_context(user_id, user_message)
             
@@ -124,11 +210,19 @@ class ChatService:
                 model=self.model_version,
                 contents=full_prompt
             )
+            if use_cache and response.text:
+                try:
+                    self.cache.store(user_message, response.text, profile)
+                except Exception as e:
+                    print(f"Chat cache store failed: {e}")
+            self._log_exchange(user_id=user_id, message=user_message, profile=profile, history_turns=user_turns,
+                               reply=response.text, cached=False)
             return response.text
  
         except Exception as e:
             error_str = str(e).lower()
             print(f"CRITICAL CHATBOT EXCEPTION: {e}")
+            self._log_exchange(user_id=user_id, message=user_message, profile=profile, history_turns=user_turns, error=str(e))
             if "429" in error_str or "quota" in error_str or "exhausted" in error_str:
                 return f"Google API Quota Error: {e}"
             return f"API Exception: {e}"
@@ -0,0 +1,228 @@
+"""
+Local hybrid retrieval for the chatbot's RAG context.
+
+Academic programs, professional courses and job vacancies are indexed once in
+process: a BM25 inverted index over their titles / categories / providers, plus
+the sentence embeddings the recommendation engine already holds for them.
+A message is ranked by both and the two rankings are fused with reciprocal
+rank fusion, so the context no longer depends on literal keyword hits and
+no longer costs three unindexed $regex scans in MongoDB per message.
+"""
+import math
+import re
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+STOPWORDS = frozenset(
+    "a an and are as at be by can do for from how i in is it me my of on or should the to what which "
+    "who why will with you your want like need get about".split()
+)
+# Short terms that still matter for Sri Lankan degrees / tracks ("it" stays a stopword: in chat it is nearly always the pronoun)
+SHORT_TERMS = frozenset({"bsc", "msc", "ba", "ma", "cs", "ai", "ml", "ui", "ux", "law", "imb", "hnd"})
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in TOKEN_RE.findall(str(text).lower()) if t not in STOPWORDS and (len(t) > 2 or t in SHORT_TERMS)]
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token for English prose; good enough for budgeting a prompt
+    return max(1, math.ceil(len(text) / 4))
+
+
+class BM25Index:
+    """Inverted index with per-posting BM25 weights precomputed, so a query is a few scatter-adds."""
+
+    def __init__(self, documents: Sequence[str], k1: float = 1.5, b: float = 0.75):
+        self.size = len(documents)
+        tokenized = [tokenize(d) for d in documents]
+        lengths = np.array([len(t) for t in tokenized], dtype=np.float32)
+        avg_len = float(lengths.mean()) if self.size and lengths.sum() else 1.0
+
+        postings: Dict[str, Dict[int, int]] = {}
+        for doc_id, tokens in enumerate(tokenized):
+            for token in tokens:
+                counts = postings.setdefault(token, {})
+                counts[doc_id] = counts.get(doc_id, 0) + 1
+
+        self.postings: Dict[str, tuple] = {}
+        for term, counts in postings.items():
+            ids = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+            tf = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+            idf = math.log(1 + (self.size - len(ids) + 0.5) / (len(ids) + 0.5))
+            weights = idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * lengths[ids] / avg_len))
+            self.postings[term] = (ids, weights.astype(np.float32))
+
+    def scores(self, query_tokens: Sequence[str]) -> np.ndarray:
+        scores = np.zeros(self.size, dtype=np.float32)
+        for term in set(query_tokens):
+            if term in self.postings:
+                ids, weights = self.postings[term]
+                scores[ids] += weights
+        return scores
+
+
+class CollectionIndex:
+    """One collection (academic / course / job): snippets, BM25 and an optional normalized embedding matrix."""
+
+    def __init__(self, snippets: List[str], texts: List[str], embeddings=None):
+        self.snippets = snippets
+        self.bm25 = BM25Index(texts)
+        self.embeddings = None
+        if embeddings is not None and len(embeddings) == len(snippets) and len(snippets):
+            # torch tensors from the engine as well as numpy arrays
+            embs = embeddings.detach().cpu().numpy() if hasattr(embeddings, "detach") else np.asarray(embeddings)
+            embs = embs.astype(np.float32)
+            self.embeddings = embs / np.clip(np.linalg.norm(embs, axis=1, keepdims=True), 1e-12, None)
+
+    def __len__(self):
+        return len(self.snippets)
+
+    def search(self, query_tokens: List[str], query_emb: Optional[np.ndarray], k: int,
+               candidates: int = 50, rrf_k: int = 60, min_similarity: float = 0.3) -> List[int]:
+        """
+        Top-k row indices by reciprocal rank fusion of the BM25 and embedding rankings.
+        Rows below min_similarity stay out of the embedding ranking, so small talk retrieves nothing.
+        """
+        if not len(self):
+            return []
+        fused: Dict[int, float] = {}
+        bm25 = self.bm25.scores(query_tokens)
+        hits = np.flatnonzero(bm25 > 0)
+        for rank, i in enumerate(hits[np.argsort(-bm25[hits], kind="stable")][:candidates]):
+            fused[int(i)] = fused.get(int(i), 0.0) + 1.0 / (rrf_k + rank + 1)
+        if query_emb is not None and self.embeddings is not None:
+            sims = self.embeddings @ query_emb
+            top = np.argpartition(-sims, min(candidates, len(sims)) - 1)[:candidates]
+            top = top[sims[top] >= min_similarity]
+            for rank, i in enumerate(top[np.argsort(-sims[top], kind="stable")]):
+                fused[int(i)] = fused.get(int(i), 0.0) + 1.0 / (rrf_k + rank + 1)
+        return [i for i, _ in sorted(fused.items(), key=lambda item: -item[1])[:k]]
+
+
+def _field(record: dict, *names: str) -> str:
+    for name in names:
+        value = record.get(name)
+        if value is not None and str(value) != "nan" and str(value).strip():
+            return str(value).strip()
+    return ""
+
+
+def _academic(records: List[dict]):
+    snippets = [f"Degree: {_field(r, 'course_title')} at {_field(r, 'provider')}" for r in records]
+    # Titles count twice: they carry most of the signal
+    texts = [" ".join([_field(r, "course_title")] * 2 + [_field(r, "category", "cat"), _field(r, "provider")]) for r in records]
+    return snippets, texts
+
+
+def _courses(records: List[dict]):
+    snippets = [f"Course: {_field(r, 'course_title')} ({_field(r, 'provider')})" for r in records]
+    texts = [" ".join([_field(r, "course_title")] * 2 + [_field(r, "category", "cat"), _field(r, "provider")]) for r in records]
+    return snippets, texts
+
+
+def _jobs(records: List[dict]):
+    snippets = [f"Job: {_field(r, 'title')} at {_field(r, 'company')}" for r in records]
+    texts = [" ".join([_field(r, "title")] * 2 + [_field(r, "company"), _field(r, "category", "domain")]) for r in records]
+    return snippets, texts
+
+
+BUILDERS = {"academic": _academic, "course": _courses, "job": _jobs}
+
+
+class HybridRetriever:
+    """
+    academic / course / job indexes plus the query encoder. The encoder must be the model
+    the embedding matrices were built with (the engine's SentenceTransformer); without it
+    retrieval is BM25 only.
+    """
+
+    def __init__(self, collections: Dict[str, CollectionIndex], encode: Optional[Callable] = None, version: str = ""):
+        self.collections = collections
+        self.encode = encode if any(c.embeddings is not None for c in collections.values()) else None
+        self.version = version
+        self.built_at = time.time()
+
+    @classmethod
+    def from_records(cls, records: Dict[str, List[dict]], embeddings: Optional[Dict[str, object]] = None,
+                     encode: Optional[Callable] = None, version: str = "") -> "HybridRetriever":
+        collections = {}
+        for kind, rows in records.items():
+            snippets, texts = BUILDERS[kind](rows)
+            collections[kind] = CollectionIndex(snippets, texts, (embeddings or {}).get(kind))
+        return cls(collections, encode, version)
+
+    @classmethod
+    def from_mongo(cls, db) -> "HybridRetriever":
+        """BM25-only index straight from the MongoDB collections the regex lookups used to scan."""
+        fields = {"_id": 0, "course_title": 1, "category": 1, "provider": 1, "title": 1, "company": 1}
+        return cls.from_records({
+            "academic": list(db.courses_academic.find({}, fields)),
+            "course": list(db.courses.find({}, fields)),
+            "job": list(db.all_jobs.find({}, fields)),
+        }, version="mongo")
+
+    @classmethod
+    def from_engine(cls, engine) -> "HybridRetriever":
+        """Index over the engine's loaded datasets, reusing its embedding matrices and encoder."""
+        def rows(df):
+            return df.to_dict("records") if df is not None and not df.empty else []
+
+        return cls.from_records(
+            {
+                "academic": rows(getattr(engine, "academic_df", None)),
+                "course": rows(getattr(engine, "courses_df", None)),
+                "job": rows(getattr(engine, "jobs_df", None)),
+            },
+            embeddings={
+                "academic": getattr(engine, "academic_embs", None),
+                "course": getattr(engine, "course_embs", None),
+                "job": getattr(engine, "job_embs", None),
+            },
+            encode=lambda text: engine.model.encode(text, convert_to_numpy=True, show_progress_bar=False),
+            version=getattr(engine, "dataset_version", ""),
+        )
+
+    def _query_embedding(self, query: str) -> Optional[np.ndarray]:
+        if self.encode is None:
+            return None
+        try:
+            emb = np.asarray(self.encode(query), dtype=np.float32).ravel()
+        except Exception as e:
+            print(f"[Retrieval] Query encoding failed, using BM25 only: {e}")
+            return None
+        return emb / max(float(np.linalg.norm(emb)), 1e-12)
+
+    def search(self, query: str, limits: Dict[str, int]) -> Dict[str, List[str]]:
+        """{kind: top snippets} for each kind in limits ({"academic": 5, ...})."""
+        tokens = tokenize(query)
+        query_emb = self._query_embedding(query) if query.strip() else None
+        results = {}
+        for kind, k in limits.items():
+            index = self.collections.get(kind)
+            if index is None or (not tokens and query_emb is None):
+                results[kind] = []
+                continue
+            # Scraped postings repeat; over-fetch and keep distinct snippets
+            snippets = dict.fromkeys(index.snippets[i] for i in index.search(tokens, query_emb, k * 4))
+            results[kind] = list(snippets)[:k]
+        return results
+
+    def context(self, query: str, limits: Dict[str, int], token_budget: int) -> Dict[str, List[str]]:
+        """search(), trimmed to token_budget by taking snippets round-robin across kinds in rank order."""
+        ranked = self.search(query, limits)
+        kept: Dict[str, List[str]] = {kind: [] for kind in ranked}
+        used = 0
+        for rank in range(max((len(v) for v in ranked.values()), default=0)):
+            for kind, snippets in ranked.items():
+                if rank < len(snippets):
+                    # " | " separators cost about a token each
+                    cost = estimate_tokens(snippets[rank]) + 1
+                    if used + cost > token_budget:
+                        return kept
+                    kept[kind].append(snippets[rank])
+                    used += cost
+        return kept
@@ -0,0 +1,250 @@
+"""
+Semantic response cache for the career chatbot.
+
+Most questions are paraphrases of a small set of FAQs ("how do I become a data
+scientist", "what courses for data science"). Before calling Gemini, the
+normalized question is embedded and compared with previously answered ones;
+a previous answer is reused when the cosine similarity clears a threshold.
+
+Answers are only shared between askers with the same coarse profile (status,
+education, target role), expire after a TTL, and are dropped when the dataset
+version the RAG context was built from changes. Without an encoder the cache
+degrades to exact matching on the normalized question.
+
+Offline evaluation replays a chat log (JSONL, as written by ChatService when
+CHAT_LOG_PATH is set) through the cache at several thresholds, without calling
+Gemini, and reports hit rates plus sample matches for review:
+
+    python semantic_cache.py replay chat_log.jsonl --thresholds 0.88 0.92 0.95
+"""
+import argparse
+import json
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    from sentence_transformers import SentenceTransformer
+    HAS_SBERT = True
+except ImportError:
+    HAS_SBERT = False
+
+PROFILE_KEYS = ("status", "education", "target_role")
+
+
+def normalize_question(text: str) -> str:
+    text = re.sub(r"[^\w\s+#]", " ", str(text).lower())
+    return " ".join(text.split())
+
+
+def coarse_profile(profile: Optional[Dict[str, Any]]) -> str:
+    """Partition key: the few profile fields that change what a good answer is."""
+    if not profile:
+        return ""
+    return "|".join(f"{k}={normalize_question(profile.get(k, ''))}" for k in PROFILE_KEYS)
+
+
+class _Partition:
+    """Entries of one coarse profile plus their stacked, normalized question embeddings."""
+
+    def __init__(self):
+        self.entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._matrix: Optional[np.ndarray] = None
+        self._keys: List[str] = []
+
+    def matrix(self) -> Tuple[List[str], Optional[np.ndarray]]:
+        if self._matrix is None and self.entries:
+            self._keys = [k for k, e in self.entries.items() if e["embedding"] is not None]
+            self._matrix = np.stack([self.entries[k]["embedding"] for k in self._keys]) if self._keys else None
+        return self._keys, self._matrix
+
+    def invalidate(self):
+        self._matrix = None
+
+
+class SemanticCache:
+    def __init__(self, encode: Optional[Callable[[str], Any]] = None, threshold: float = 0.92,
+                 ttl_s: float = 86400, max_entries: int = 2000, version: Optional[Callable[[], str]] = None):
+        self.encode = encode
+        self.threshold = threshold
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self.version = version or (lambda: "")
+        self._partitions: Dict[str, _Partition] = {}
+        self._version = self.version()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.expired = 0
+        self.invalidations = 0
+        self._hit_similarity = 0.0
+
+    def _embed(self, question: str) -> Optional[np.ndarray]:
+        if self.encode is None:
+            return None
+        emb = np.asarray(self.encode(question), dtype=np.float32).ravel()
+        return emb / max(float(np.linalg.norm(emb)), 1e-12)
+
+    def _check_version(self):
+        current = self.version()
+        if current != self._version:
+            # RAG facts in the cached answers came from the old data release
+            self._partitions.clear()
+            self._version = current
+            self.invalidations += 1
+
+    def _size(self) -> int:
+        return sum(len(p.entries) for p in self._partitions.values())
+
+    def lookup(self, question: str, profile: Optional[Dict[str, Any]] = None, now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        {"reply", "question", "similarity"} of the closest live answer above threshold, else None.
+        now overrides the clock (log replay).
+        """
+        normalized = normalize_question(question)
+        emb = self._embed(normalized)
+        now = time.time() if now is None else now
+        with self._lock:
+            self._check_version()
+            partition = self._partitions.get(coarse_profile(profile))
+            if partition is not None:
+                stale = [k for k, e in partition.entries.items() if now - e["created"] > self.ttl_s]
+                for key in stale:
+                    del partition.entries[key]
+                if stale:
+                    self.expired += len(stale)
+                    partition.invalidate()
+
+            best_key, best_sim = None, 0.0
+            if partition is not None and normalized in partition.entries:
+                best_key, best_sim = normalized, 1.0
+            elif partition is not None and emb is not None:
+                keys, matrix = partition.matrix()
+                if matrix is not None:
+                    sims = matrix @ emb
+                    i = int(np.argmax(sims))
+                    best_key, best_sim = keys[i], float(sims[i])
+
+            if best_key is None or best_sim < self.threshold:
+                self.misses += 1
+                return None
+            entry = partition.entries[best_key]
+            entry["hits"] += 1
+            entry["used"] = now
+            partition.entries.move_to_end(best_key)
+            self.hits += 1
+            self._hit_similarity += best_sim
+            return {"reply": entry["reply"], "question": best_key, "similarity": round(best_sim, 4)}
+
+    def store(self, question: str, reply: str, profile: Optional[Dict[str, Any]] = None, now: Optional[float] = None):
+        normalized = normalize_question(question)
+        if not normalized or not reply:
+            return
+        emb = self._embed(normalized)
+        with self._lock:
+            self._check_version()
+            partition = self._partitions.setdefault(coarse_profile(profile), _Partition())
+            now = time.time() if now is None else now
+            partition.entries[normalized] = {"reply": reply, "embedding": emb, "created": now, "used": now, "hits": 0}
+            partition.entries.move_to_end(normalized)
+            partition.invalidate()
+            self.stores += 1
+            # Evict least recently used across partitions
+            while self._size() > self.max_entries:
+                oldest = min((p for p in self._partitions.values() if p.entries),
+                             key=lambda p: next(iter(p.entries.values()))["used"])
+                oldest.entries.popitem(last=False)
+                oldest.invalidate()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": self._size(),
+                "partitions": len(self._partitions),
+                "threshold": self.threshold,
+                "semantic": self.encode is not None,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "avg_hit_similarity": round(self._hit_similarity / self.hits, 4) if self.hits else 0.0,
+                "stores": self.stores,
+                "expired": self.expired,
+                "invalidations": self.invalidations,
+            }
+
+
+# ── Offline evaluation ───────────────────────────────────────────────
+
+def load_chat_log(path: str) -> List[Dict[str, Any]]:
+    records = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                records.append(json.loads(line))
+    return [r for r in records if r.get("message")]
+
+
+def replay(records: List[Dict[str, Any]], encode: Optional[Callable], threshold: float,
+           ttl_s: float, max_history_turns: int, samples: int = 5) -> Dict[str, Any]:
+    """Feeds the log through a fresh cache in order; misses store the logged reply, as live traffic would."""
+    cache = SemanticCache(encode=encode, threshold=threshold, ttl_s=ttl_s, max_entries=len(records) + 1)
+    matches, bypassed = [], 0
+    for r in records:
+        if r.get("history_turns", 0) > max_history_turns:
+            bypassed += 1
+            continue
+        hit = cache.lookup(r["message"], r.get("profile"), now=r.get("ts"))
+        if hit:
+            matches.append((hit["similarity"], r["message"], hit["question"]))
+        elif r.get("reply") and not r.get("error"):
+            cache.store(r["message"], r["reply"], r.get("profile"), now=r.get("ts"))
+    stats = cache.stats()
+    stats["bypassed"] = bypassed
+    # Lowest-similarity hits are the ones most likely to be wrong answers
+    stats["borderline_hits"] = [
+        {"similarity": s, "question": q, "matched": m} for s, q, m in sorted(matches)[:samples]
+    ]
+    return stats
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Semantic chat cache tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rp = sub.add_parser("replay", help="Replay a chat log through the cache at several thresholds")
+    rp.add_argument("log", help="JSONL chat log (CHAT_LOG_PATH output)")
+    rp.add_argument("--thresholds", type=float, nargs="+", default=[0.88, 0.92, 0.95])
+    rp.add_argument("--ttl", type=float, default=86400, help="Entry TTL in seconds")
+    rp.add_argument("--max-history-turns", type=int, default=0, help="Questions with more prior user turns bypass the cache")
+    rp.add_argument("--model", default="all-MiniLM-L6-v2", help="SentenceTransformer used to embed questions")
+    rp.add_argument("--exact", action="store_true", help="Exact matching only (no encoder)")
+    args = parser.parse_args(argv)
+
+    records = load_chat_log(args.log)
+    encode = None
+    if not args.exact:
+        if not HAS_SBERT:
+            print("sentence-transformers is not installed; replaying with exact matching.")
+        else:
+            model = SentenceTransformer(args.model)
+            encode = lambda text: model.encode(text, convert_to_numpy=True, show_progress_bar=False)
+    print(f"[semantic_cache] Replaying {len(records)} messages")
+    for threshold in args.thresholds:
+        stats = replay(records, encode, threshold, args.ttl, args.max_history_turns)
+        print(f"\nthreshold {threshold:.2f}: hit rate {stats['hit_rate']:.1%} "
+              f"({stats['hits']} hits / {stats['misses']} misses, {stats['bypassed']} bypassed), "
+              f"avg hit similarity {stats['avg_hit_similarity']}")
+        for m in stats["borderline_hits"]:
+            print(f"  {m['similarity']:.3f}  {m['question']!r}  ->  {m['matched']!r}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from retrieval import BM25Index, CollectionIndex, HybridRetriever, estimate_tokens, tokenize
+
+
+def test_tokenize_drops_stopwords_but_keeps_short_degree_terms():
+    assert tokenize("What is a BSc in IT at SLIIT?") == ["bsc", "sliit"]
+    assert tokenize("AI or ML at an HND level") == ["ai", "ml", "hnd", "level"]
+    assert tokenize("C++ and Node.js for .NET") == ["c++", "node.js", "net"]
+
+
+def test_bm25_ranks_rarer_and_repeated_terms_higher():
+    index = BM25Index(["python python developer", "python tester", "java developer", ""])
+    scores = index.scores(["python", "developer"])
+    assert scores[0] > scores[1] > 0 and scores[0] > scores[2] > 0
+    assert scores[3] == 0
+    # "java" appears in one document, "python" in two: the rarer term weighs more
+    assert index.scores(["java"])[2] > index.scores(["python"])[1]
+    # Repeating a query term does not count it twice
+    np.testing.assert_array_equal(index.scores(["python", "python"]), index.scores(["python"]))
+    assert not index.scores(["unknown"]).any()
+
+
+def test_search_fuses_bm25_and_embedding_rankings():
+    embeddings = np.array([[1, 0, 0], [0, 1, 0], [0, 0, 1], [0.8, 0.6, 0]], dtype=np.float32)
+    index = CollectionIndex(["a", "b", "c", "d"], ["data analyst", "data engineer", "nurse", "teacher"], embeddings)
+    query_emb = np.array([0.0, 1.0, 0.0], dtype=np.float32)
+    # BM25: a, b (tied, stable order); embeddings: b, d (a and c below min_similarity)
+    assert index.search(["data"], query_emb, k=4) == [1, 0, 3]
+    assert index.search(["data"], None, k=4) == [0, 1]
+    assert index.search([], query_emb, k=1) == [1]
+    assert index.search(["data"], query_emb, k=4, min_similarity=1.5) == [0, 1]
+
+
+def test_search_dedupes_repeated_postings_per_kind():
+    records = {"job": [{"title": "Data Analyst", "company": "Acme"}] * 3 + [{"title": "Data Engineer", "company": "Beta"}]}
+    retriever = HybridRetriever.from_records(records)
+    assert retriever.encode is None
+    assert retriever.search("data analyst", {"job": 2}) == {"job": ["Job: Data Analyst at Acme", "Job: Data Engineer at Beta"]}
+    assert retriever.search("hello there", {"job": 2, "course": 2}) == {"job": [], "course": []}
+
+
+def test_context_trims_round_robin_to_the_token_budget():
+    records = {
+        "academic": [{"course_title": f"BSc Data Science {i}", "provider": "UoC"} for i in range(3)],
+        "job": [{"title": f"Data Scientist {i}", "company": "Acme"} for i in range(3)],
+    }
+    retriever = HybridRetriever.from_records(records)
+    full = retriever.search("data science", {"academic": 3, "job": 3})
+    assert all(len(v) == 3 for v in full.values())
+
+    costs = {s: estimate_tokens(s) + 1 for v in full.values() for s in v}
+    # Room for the first snippet of each kind and the academic second one, but not the job second one
+    budget = costs[full["academic"][0]] + costs[full["job"][0]] + costs[full["academic"][1]]
+    kept = retriever.context("data science", {"academic": 3, "job": 3}, budget)
+    assert kept == {"academic": full["academic"][:2], "job": full["job"][:1]}
+    assert sum(costs[s] for v in kept.values() for s in v) <= budget
+
+    assert retriever.context("data science", {"academic": 3, "job": 3}, 10_000) == full
+    assert retriever.context("data science", {"academic": 3, "job": 3}, 0) == {"academic": [], "job": []}
@@ -0,0 +1,70 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from semantic_cache import SemanticCache, coarse_profile, normalize_question
+
+VOCAB = ["data", "scientist", "become", "courses", "science", "nurse"]
+PROFILE = {"status": "Student", "education": "A/L", "target_role": "Data Scientist"}
+
+
+def encode(text):
+    """Bag-of-words over a tiny vocabulary: paraphrases sharing the key words are near-duplicates."""
+    words = text.split()
+    return np.array([words.count(w) for w in VOCAB], dtype=np.float32) + 1e-3
+
+
+def _cache(**kwargs):
+    return SemanticCache(encode=encode, threshold=0.9, **kwargs)
+
+
+def test_paraphrase_hits_within_the_same_profile_only():
+    cache = _cache()
+    cache.store("How do I become a data scientist?", "Learn Python.", PROFILE, now=0)
+    hit = cache.lookup("how to BECOME a Data Scientist", PROFILE, now=1)
+    assert hit["reply"] == "Learn Python."
+    assert hit["question"] == normalize_question("How do I become a data scientist?")
+    assert cache.lookup("how to become a data scientist", {**PROFILE, "status": "Graduate"}, now=1) is None
+    assert cache.lookup("how do I become a nurse", PROFILE, now=1) is None
+    assert coarse_profile(None) == ""
+
+
+def test_entries_expire_after_the_ttl():
+    cache = _cache(ttl_s=100)
+    cache.store("data science courses", "Try these.", PROFILE, now=0)
+    assert cache.lookup("data science courses", PROFILE, now=100) is not None
+    assert cache.lookup("data science courses", PROFILE, now=101) is None
+    stats = cache.stats()
+    assert stats["expired"] == 1 and stats["entries"] == 0
+
+
+def test_dataset_version_change_drops_every_answer():
+    version = {"v": "2026-01"}
+    cache = _cache(version=lambda: version["v"])
+    cache.store("data science courses", "Try these.", PROFILE, now=0)
+    cache.store("become a nurse", "Study nursing.", None, now=0)
+    version["v"] = "2026-02"
+    assert cache.lookup("data science courses", PROFILE, now=1) is None
+    assert cache.lookup("become a nurse", None, now=1) is None
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_least_recently_used_answer_is_evicted_across_profiles():
+    cache = _cache(max_entries=2)
+    cache.store("become a nurse", "Study nursing.", None, now=0)
+    cache.store("data science courses", "Try these.", PROFILE, now=1)
+    assert cache.lookup("become a nurse", None, now=2) is not None
+    cache.store("become a data scientist", "Learn Python.", PROFILE, now=3)
+    assert cache.lookup("data science courses", PROFILE, now=4) is None
+    assert cache.lookup("become a nurse", None, now=4)["reply"] == "Study nursing."
+    assert cache.stats()["entries"] == 2
+
+
+def test_without_an_encoder_only_exact_questions_match():
+    cache = SemanticCache()
+    cache.store("Data science courses?", "Try these.", now=0)
+    assert cache.lookup("data science   courses", now=1)["similarity"] == 1.0
+    assert cache.lookup("courses for data science", now=1) is None
@@ -0,0 +1,152 @@
+"""
+core/logic/ats_matcher.py — Resume x Jobs ATS Match Matrix
+Scores parsed resumes against every posting in jobs_df (or a filtered subset)
+in one pass: a sparse resume x skill matrix times the sparse skill x job
+matrix gives required-skill coverage for every pair, and one dense matmul of
+normalized embeddings gives semantic similarity. The job-side matrices are
+built once per data release.
+"""
+import re
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+
+def skill_key(skill: Any) -> str:
+    return " ".join(str(skill).lower().split())
+
+
+def _split_skills(raw: Any) -> List[str]:
+    if isinstance(raw, list):
+        items = raw
+    elif isinstance(raw, str):
+        items = raw.split(",")
+    else:
+        return []
+    return [str(s).strip() for s in items if len(str(s).strip()) > 2]
+
+
+class ATSMatcher:
+    """
+    score = SKILL_WEIGHT * coverage + EMBEDDING_WEIGHT * semantic, where coverage is the
+    share of a job's listed skills found on the resume and semantic the cosine similarity
+    of the resume's skill profile to the job title embedding.
+    """
+
+    SKILL_WEIGHT = 0.6
+    EMBEDDING_WEIGHT = 0.4
+
+    def __init__(self, jobs_df: pd.DataFrame, job_embs: Optional[np.ndarray], version: str = ""):
+        self.version = version
+        self.jobs_df = jobs_df
+        self.titles = jobs_df["title"].fillna("").astype(str).tolist() if "title" in jobs_df.columns else [""] * len(jobs_df)
+
+        skills_col = jobs_df["extracted_skills"] if "extracted_skills" in jobs_df.columns else pd.Series([None] * len(jobs_df))
+        self.vocab: Dict[str, int] = {}
+        self.labels: List[str] = []
+        rows, cols = [], []
+        for j, raw in enumerate(skills_col):
+            for skill in dict.fromkeys(_split_skills(raw)):
+                key = skill_key(skill)
+                if key not in self.vocab:
+                    self.vocab[key] = len(self.labels)
+                    self.labels.append(skill)
+                rows.append(j)
+                cols.append(self.vocab[key])
+        # job x skill binary matrix; deduplicated per job so row sums are skill-set sizes
+        self.job_skills = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (rows, cols)), shape=(len(jobs_df), len(self.labels))
+        )
+        self.job_skills.sum_duplicates()
+        self.job_skills.data[:] = 1.0
+        self.job_skill_counts = np.asarray(self.job_skills.sum(axis=1)).ravel()
+
+        self.job_embs = None
+        if job_embs is not None and len(job_embs) == len(jobs_df):
+            embs = np.asarray(job_embs, dtype=np.float32)
+            self.job_embs = embs / np.clip(np.linalg.norm(embs, axis=1, keepdims=True), 1e-12, None)
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    # ── Job subset ───────────────────────────────────────────────────
+
+    def select(self, filters: Optional[Dict[str, str]] = None) -> np.ndarray:
+        """Job row indices matching every {column: case-insensitive substring} filter (unknown columns are ignored)."""
+        mask = np.ones(len(self.jobs_df), dtype=bool)
+        for column, needle in (filters or {}).items():
+            if column in self.jobs_df.columns and needle:
+                mask &= self.jobs_df[column].astype(str).str.contains(re.escape(str(needle)), case=False, na=False).to_numpy()
+        return np.flatnonzero(mask)
+
+    # ── Scoring ──────────────────────────────────────────────────────
+
+    def _resume_matrix(self, skill_lists: Sequence[Sequence[str]]) -> sparse.csr_matrix:
+        rows, cols = [], []
+        for r, skills in enumerate(skill_lists):
+            ids = {self.vocab[k] for k in map(skill_key, skills) if k in self.vocab}
+            rows.extend([r] * len(ids))
+            cols.extend(ids)
+        return sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (rows, cols)), shape=(len(skill_lists), len(self.labels))
+        )
+
+    def match_matrix(self, skill_lists: Sequence[Sequence[str]], resume_embs: Optional[np.ndarray] = None,
+                     job_ids: Optional[np.ndarray] = None) -> Dict[str, Any]:
+        """resumes x jobs matrices (total, coverage, semantic) over job_ids (all jobs by default)."""
+        job_ids = np.arange(len(self)) if job_ids is None else np.asarray(job_ids, dtype=np.int64)
+        overlap = (self._resume_matrix(skill_lists) @ self.job_skills[job_ids].T).toarray()
+        counts = self.job_skill_counts[job_ids]
+        coverage = np.divide(overlap, counts, out=np.zeros_like(overlap), where=counts > 0)
+
+        semantic = np.zeros_like(coverage)
+        if resume_embs is not None and self.job_embs is not None:
+            embs = np.asarray(resume_embs, dtype=np.float32)
+            embs = embs / np.clip(np.linalg.norm(embs, axis=1, keepdims=True), 1e-12, None)
+            semantic = np.clip(embs @ self.job_embs[job_ids].T, 0.0, 1.0)
+            total = self.SKILL_WEIGHT * coverage + self.EMBEDDING_WEIGHT * semantic
+        else:
+            total = coverage
+        return {"job_ids": job_ids, "scores": total, "coverage": coverage, "semantic": semantic}
+
+    def explain(self, skills: Sequence[str], job_id: int):
+        """(matched, missing) skill labels of one job for one resume."""
+        have = {self.vocab[k] for k in map(skill_key, skills) if k in self.vocab}
+        job_skills = self.job_skills.indices[self.job_skills.indptr[job_id]:self.job_skills.indptr[job_id + 1]]
+        matched = [self.labels[i] for i in job_skills if i in have]
+        missing = [self.labels[i] for i in job_skills if i not in have]
+        return matched, missing
+
+    def rank(self, skill_lists: Sequence[Sequence[str]], resume_embs: Optional[np.ndarray] = None,
+             job_ids: Optional[np.ndarray] = None, top_k: int = 10) -> List[List[Dict[str, Any]]]:
+        """Top-k jobs per resume with their score breakdown and matched / missing skills."""
+        return self.rank_matrix(skill_lists, self.match_matrix(skill_lists, resume_embs, job_ids), top_k)
+
+    def rank_matrix(self, skill_lists: Sequence[Sequence[str]], result: Dict[str, Any], top_k: int = 10) -> List[List[Dict[str, Any]]]:
+        """rank() over an already computed match_matrix() result."""
+        scores = result["scores"]
+        ranked = []
+        for r, skills in enumerate(skill_lists):
+            k = min(top_k, scores.shape[1])
+            if k == 0:
+                ranked.append([])
+                continue
+            top = np.argpartition(-scores[r], k - 1)[:k]
+            top = top[np.argsort(-scores[r][top], kind="stable")]
+            matches = []
+            for col in top:
+                job_id = int(result["job_ids"][col])
+                matched, missing = self.explain(skills, job_id)
+                matches.append({
+                    "job_index": job_id,
+                    "title": self.titles[job_id],
+                    "score": round(float(scores[r, col]) * 100, 1),
+                    "skill_coverage": round(float(result["coverage"][r, col]), 3),
+                    "semantic_similarity": round(float(result["semantic"][r, col]), 3),
+                    "matched_skills": matched,
+                    "missing_skills": missing,
+                })
+            ranked.append(matches)
+        return ranked
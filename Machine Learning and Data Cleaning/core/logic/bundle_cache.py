@@ -0,0 +1,151 @@
+"""
+core/logic/bundle_cache.py — Assessment Bundle Cache
+Deterministic result cache for get_recommendations_from_assessment, keyed on
+a canonical fingerprint of the normalized assessment vector, the target role,
+the requested sections and the dataset version. Tier 1 is an in-process LRU;
+tier 2 is an optional SQLite file shared across workers and restarts.
+"""
+import copy
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+
+class BundleCache:
+    """Two-tier (memory LRU + optional SQLite) bundle cache. Returned bundles are private copies."""
+
+    # Assessment fields the bundle never reads; excluding them lets near-identical assessments share entries
+    IGNORED_FIELDS = {"intent_embedding"}
+
+    def __init__(self, max_entries: int = 256, disk_path: Optional[Path] = None):
+        self.max_entries = max_entries
+        self.disk_path = Path(disk_path) if disk_path else None
+        self.dataset_version = ""
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if self.disk_path:
+            self._execute(
+                "CREATE TABLE IF NOT EXISTS bundles ("
+                "key TEXT PRIMARY KEY, dataset_version TEXT, created REAL, payload TEXT)"
+            )
+
+    # ── Fingerprint ──────────────────────────────────────────────────
+
+    @classmethod
+    def _normalize(cls, value: Any) -> Any:
+        if isinstance(value, dict):
+            return {str(k): cls._normalize(v) for k, v in sorted(value.items(), key=lambda kv: str(kv[0])) if k not in cls.IGNORED_FIELDS}
+        if isinstance(value, set):
+            return sorted((cls._normalize(v) for v in value), key=str)
+        if isinstance(value, (list, tuple)):
+            # Order is kept: skill order feeds the query text and so the ranking
+            return [cls._normalize(v) for v in value]
+        if isinstance(value, str):
+            return " ".join(value.split())
+        if isinstance(value, (bool, np.bool_)):
+            return bool(value)
+        if isinstance(value, (int, float, np.integer, np.floating)):
+            # 3, 3.0 and np.int64(3) must fingerprint identically
+            number = round(float(value), 4)
+            return int(number) if number.is_integer() else number
+        return value if value is None else str(value)
+
+    def fingerprint(self, assessment_vector: Dict[str, Any], target_job: str, sections: Any = None) -> str:
+        payload = {
+            "v": self.dataset_version,
+            "target": self._normalize(target_job or ""),
+            "sections": self._normalize(sections),
+            "assessment": self._normalize(assessment_vector or {}),
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+    # ── Tiers ────────────────────────────────────────────────────────
+
+    def _execute(self, sql: str, params: tuple = (), fetch: bool = False):
+        conn = sqlite3.connect(str(self.disk_path), timeout=5)
+        try:
+            with conn:
+                cursor = conn.execute(sql, params)
+                return cursor.fetchone() if fetch else None
+        finally:
+            conn.close()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            bundle = self._memory.get(key)
+            if bundle is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(bundle)
+
+        if self.disk_path:
+            try:
+                row = self._execute(
+                    "SELECT payload FROM bundles WHERE key = ? AND dataset_version = ?",
+                    (key, self.dataset_version), fetch=True,
+                )
+            except sqlite3.Error:
+                row = None
+            if row is not None:
+                bundle = json.loads(row[0])
+                self._remember(key, bundle)
+                with self._lock:
+                    self.hits += 1
+                    self.disk_hits += 1
+                return copy.deepcopy(bundle)
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def _remember(self, key: str, bundle: Dict[str, Any]):
+        with self._lock:
+            self._memory[key] = bundle
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def put(self, key: str, bundle: Dict[str, Any]):
+        stored = copy.deepcopy(bundle)
+        self._remember(key, stored)
+        if self.disk_path:
+            try:
+                self._execute(
+                    "INSERT OR REPLACE INTO bundles (key, dataset_version, created, payload) VALUES (?, ?, ?, ?)",
+                    (key, self.dataset_version, time.time(), json.dumps(stored, default=str)),
+                )
+            except sqlite3.Error as e:
+                print(f"[BundleCache] Disk write failed: {e}")
+
+    def invalidate(self, dataset_version: str):
+        """Called on every data (re)load: drops all entries built from another dataset version."""
+        with self._lock:
+            self.dataset_version = dataset_version
+            self._memory.clear()
+        if self.disk_path:
+            try:
+                self._execute("DELETE FROM bundles WHERE dataset_version != ?", (dataset_version,))
+            except sqlite3.Error as e:
+                print(f"[BundleCache] Disk invalidation failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._memory),
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "dataset_version": self.dataset_version,
+            }
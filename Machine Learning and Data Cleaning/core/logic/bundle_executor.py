@@ -0,0 +1,218 @@
+"""
+core/logic/bundle_executor.py — Dependency-Aware Bundle Executor
+Each section of the 11-point dashboard bundle is declared with the sections
+it depends on. Independent sections run concurrently on a bounded thread pool
+(torch / NumPy release the GIL), so bundle latency tracks the slowest chain of
+sections rather than the sum of all of them.
+"""
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+class BundleSection:
+    """A named unit of work: fn(ctx, results) -> value, runnable once `deps` are done."""
+
+    def __init__(self, name: str, fn: Callable[[Dict[str, Any], Dict[str, Any]], Any], deps: Iterable[str] = ()):
+        self.name = name
+        self.fn = fn
+        self.deps = tuple(deps)
+
+
+class _Task:
+    """Slot bookkeeping for one submitted section: queued -> running -> done, or running -> orphaned -> done."""
+
+    __slots__ = ("lock", "state")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.state = "queued"
+
+
+class BundleExecutor:
+    """
+    Runs registered sections in dependency order on a shared, bounded pool.
+    The pool is shared by all concurrent bundle requests; sections never submit
+    work to it themselves, so a full pool cannot deadlock.
+
+    At most `max_workers` sections run at once (one slot each). A section abandoned
+    at its bundle's deadline cannot be interrupted; it gives its slot back and
+    finishes on one of `orphan_headroom` extra threads, so abandoned work does not
+    starve the bundles that are still within their budget.
+    """
+
+    def __init__(self, max_workers: int = 4, orphan_headroom: Optional[int] = None):
+        self.max_workers = max_workers
+        self.orphan_headroom = max_workers if orphan_headroom is None else orphan_headroom
+        self.sections: Dict[str, BundleSection] = {}
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        self._slots = threading.Semaphore(max_workers)
+        self._stats_lock = threading.Lock()
+        self._orphans = 0
+        self.abandoned = 0
+        self.skipped = 0
+
+    def section(self, name: str, fn: Callable, deps: Iterable[str] = ()):
+        for d in deps:
+            if d not in self.sections:
+                raise ValueError(f"Section '{name}' depends on unknown section '{d}'")
+        self.sections[name] = BundleSection(name, fn, deps)
+
+    @property
+    def pool(self) -> ThreadPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers + self.orphan_headroom, thread_name_prefix="bundle")
+            return self._pool
+
+    def plan(self, wanted: Optional[Iterable[str]] = None) -> List[str]:
+        """Requested sections plus their transitive dependencies, in registration (topological) order."""
+        if wanted is None:
+            return list(self.sections)
+        needed = set()
+        stack = list(wanted)
+        while stack:
+            name = stack.pop()
+            if name not in self.sections:
+                raise ValueError(f"Unknown bundle section '{name}'")
+            if name not in needed:
+                needed.add(name)
+                stack.extend(self.sections[name].deps)
+        return [name for name in self.sections if name in needed]
+
+    def dependents(self, names: Iterable[str]) -> List[str]:
+        """`names` plus every section downstream of them, in registration (topological) order."""
+        dirty = set(names)
+        for name, section in self.sections.items():
+            if any(d in dirty for d in section.deps):
+                dirty.add(name)
+        return [name for name in self.sections if name in dirty]
+
+    def _timed(self, section: BundleSection, ctx: Dict[str, Any], results: Dict[str, Any],
+               task: _Task, abandoned: threading.Event) -> Tuple[Any, float]:
+        self._slots.acquire()
+        with task.lock:
+            if abandoned.is_set():
+                # The bundle gave up while this section waited for a slot
+                task.state = "done"
+                self._slots.release()
+                with self._stats_lock:
+                    self.skipped += 1
+                return None, 0.0
+            task.state = "running"
+        start = time.perf_counter()
+        try:
+            value = section.fn(ctx, results)
+        finally:
+            with task.lock:
+                if task.state == "orphaned":
+                    with self._stats_lock:
+                        self._orphans -= 1
+                else:
+                    self._slots.release()
+                task.state = "done"
+        return value, (time.perf_counter() - start) * 1000
+
+    def _abandon(self, running: Dict[Any, Tuple[str, _Task]], abandoned: threading.Event):
+        """Stops a run's in-flight sections: queued ones never start, running ones give up their slot."""
+        abandoned.set()
+        for future, (_, task) in running.items():
+            future.cancel()
+            with task.lock:
+                if task.state == "running":
+                    task.state = "orphaned"
+                    self._slots.release()
+                    with self._stats_lock:
+                        self._orphans += 1
+                        self.abandoned += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return {
+                "max_workers": self.max_workers,
+                "orphan_headroom": self.orphan_headroom,
+                "orphaned_running": self._orphans,
+                "abandoned_sections": self.abandoned,
+                "skipped_sections": self.skipped,
+            }
+
+    def run(self, ctx: Dict[str, Any], wanted: Optional[Iterable[str]] = None,
+            on_section: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+            reuse: Optional[Dict[str, Any]] = None, deadline: Optional[float] = None,
+            fallback: Optional[Callable[[str, Dict[str, Any], Dict[str, Any]], Any]] = None
+            ) -> Tuple[Dict[str, Any], Dict[str, float], List[str]]:
+        """
+        Computes the planned sections. Returns (results, timings_ms, degraded) where timings
+        hold each section's own run time plus "total" wall-clock time.
+        on_section(name, results) is called on the calling thread as each section finishes; if it
+        raises, the rest of the run is abandoned and the exception propagates.
+        Sections present in `reuse` (results of an earlier run) are taken as-is, not recomputed.
+
+        `deadline` is a time.perf_counter() timestamp. Sections still running when it passes,
+        or not yet started, get fallback(name, ctx, results) instead and are listed in `degraded`
+        (fallbacks see the placeholders of degraded dependencies). Once the deadline has passed
+        nothing more is submitted; a degraded section that is already running is left to finish
+        in the background (threads cannot be interrupted) and its result dropped.
+        """
+        started = time.perf_counter()
+        results: Dict[str, Any] = dict(reuse or {})
+        pending = [name for name in self.plan(wanted) if name not in results]
+        timings: Dict[str, float] = {}
+        degraded: List[str] = []
+        running: Dict[Any, Tuple[str, _Task]] = {}
+        abandoned = threading.Event()
+
+        def finish(name, value, elapsed):
+            results[name] = value
+            timings[name] = round(elapsed, 1)
+            if on_section is not None:
+                on_section(name, results)
+
+        def degrade(name):
+            degraded.append(name)
+            finish(name, fallback(name, ctx, results) if fallback is not None else None, 0.0)
+
+        try:
+            while pending or running:
+                ready = [n for n in pending if all(d in results for d in self.sections[n].deps)]
+                expired = deadline is not None and time.perf_counter() >= deadline
+                for name in ready:
+                    pending.remove(name)
+                    if expired:
+                        degrade(name)
+                    else:
+                        task = _Task()
+                        running[self.pool.submit(self._timed, self.sections[name], ctx, results, task, abandoned)] = (name, task)
+                if expired and ready:
+                    continue  # placeholders may have unblocked more sections
+                if not running:
+                    continue
+
+                timeout = None if deadline is None else max(0.0, deadline - time.perf_counter())
+                done, _ = wait(list(running), timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name, _ = running.pop(future)
+                    value, elapsed = future.result()
+                    finish(name, value, elapsed)
+                if not done:
+                    # Deadline reached with sections still in flight
+                    in_flight = [name for name, _ in running.values()]
+                    self._abandon(running, abandoned)
+                    running.clear()
+                    for name in in_flight:
+                        degrade(name)
+        except BaseException:
+            # A failed section, or an on_section listener giving up (e.g. its client went away)
+            self._abandon(running, abandoned)
+            raise
+
+        timings["total"] = round((time.perf_counter() - started) * 1000, 1)
+        return results, timings, degraded
+
+    def shutdown(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False)
+                self._pool = None
@@ -0,0 +1,72 @@
+"""
+core/logic/bundle_state.py — Per-Session Bundle State
+Keeps the intermediate state of a user's last bundle run (prelude context with
+the query embedding, raw section results and the bundle that was served) so a
+"what-if" edit of one assessment answer can recompute only the sections that
+depend on it, and report which bundle keys actually changed.
+"""
+import copy
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+
+def diff_bundles(old: Dict[str, Any], new: Dict[str, Any], ignore=("section_timings",)) -> List[str]:
+    """Bundle keys whose value differs between two bundles (added or removed keys count as changed)."""
+    changed = []
+    for key in list(new) + [k for k in old if k not in new]:
+        if key in ignore:
+            continue
+        if key not in old or key not in new:
+            changed.append(key)
+        elif json.dumps(old[key], sort_keys=True, default=str) != json.dumps(new[key], sort_keys=True, default=str):
+            changed.append(key)
+    return changed
+
+
+class BundleStateStore:
+    """
+    session id → {"args", "assessment_vector", "keys", "ctx", "results", "bundle"}.
+    Bounded LRU; "ctx" / "results" are None when the bundle was served from the
+    bundle cache, in which case a what-if falls back to a full recompute.
+    """
+
+    def __init__(self, max_entries: int = 128):
+        self.max_entries = max_entries
+        self._states: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def put(self, session_id: str, args: Dict[str, Any], assessment_vector: Dict[str, Any], keys: Optional[List[str]],
+            bundle: Dict[str, Any], ctx: Optional[Dict[str, Any]] = None, results: Optional[Dict[str, Any]] = None):
+        # The served bundle shares objects with ctx / results and is handed to (and mutated by) callers,
+        # so everything kept is a private copy. The query embedding is never mutated and is shared.
+        if ctx is not None:
+            ctx = {k: v if k == "query_emb" else copy.deepcopy(v) for k, v in ctx.items()}
+        state = {
+            "args": copy.deepcopy(args),
+            "assessment_vector": copy.deepcopy(assessment_vector or {}),
+            "keys": list(keys) if keys is not None else None,
+            "ctx": ctx,
+            "results": copy.deepcopy(results),
+            "bundle": copy.deepcopy({k: v for k, v in bundle.items() if k != "section_timings"}),
+        }
+        with self._lock:
+            self._states[session_id] = state
+            self._states.move_to_end(session_id)
+            while len(self._states) > self.max_entries:
+                self._states.popitem(last=False)
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            state = self._states.get(session_id)
+            if state is not None:
+                self._states.move_to_end(session_id)
+            return state
+
+    def drop(self, session_id: str):
+        with self._lock:
+            self._states.pop(session_id, None)
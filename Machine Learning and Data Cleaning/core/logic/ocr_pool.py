@@ -0,0 +1,177 @@
+"""
+core/logic/ocr_pool.py — Parallel OCR Executor
+OCRs scanned resumes in a process pool instead of page by page in the request
+thread. Worker processes render their page at a configurable DPI and run
+pytesseract on it; pages where fitz already finds a text layer are not OCR'd.
+Each page has a timeout, enforced in the worker, where pytesseract kills a hung
+tesseract process so the worker is free again. The parent's wait for a page
+is only a backstop: it is measured from submission and allows for the pages
+queued ahead of it. A semaphore caps how many documents are OCR'd at once, so
+OCR cannot take every core from the recommendation endpoints.
+"""
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, Optional
+
+try:
+    import pytesseract
+    from PIL import Image
+    HAS_OCR = True
+except ImportError:
+    HAS_OCR = False
+
+IMAGE_SUFFIXES = (".jpg", ".jpeg", ".png", ".avif", ".webp")
+
+
+class OCRPoolBusy(RuntimeError):
+    """Raised when no OCR slot frees up within the wait limit."""
+
+
+class OCRPageTimeout(RuntimeError):
+    """Raised in a worker when tesseract ran past the page timeout (and was killed)."""
+
+
+def ocr_page(path: str, page_index: Optional[int], dpi: int, timeout_s: float = 0) -> str:
+    """
+    Worker: renders one PDF page (or loads the image when page_index is None) and OCRs it.
+    timeout_s (0 = none) kills the tesseract subprocess, so a hung page does not keep the worker.
+    """
+    if page_index is None:
+        image = Image.open(path)
+    else:
+        import fitz
+        with fitz.open(path) as doc:
+            pix = doc[page_index].get_pixmap(dpi=dpi)
+            image = Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+    try:
+        return pytesseract.image_to_string(image, timeout=timeout_s)
+    except pytesseract.TesseractError:
+        raise
+    except RuntimeError as e:
+        # Besides TesseractError, pytesseract raises RuntimeError only for "Tesseract process timeout"
+        raise OCRPageTimeout(str(e)) from None
+
+
+class OCRPool:
+    def __init__(self, max_workers: Optional[int] = None, dpi: int = 200, page_timeout_s: float = 30.0,
+                 max_concurrent_jobs: int = 2, job_wait_s: float = 30.0, min_page_chars: int = 50,
+                 ocr_fn: Callable[[str, Optional[int], int, float], str] = ocr_page, available: Optional[bool] = None,
+                 page_grace_s: float = 10.0):
+        # Half the cores by default: the rest stay with the API workers and the encoder
+        self.max_workers = max_workers or max(1, (os.cpu_count() or 2) // 2)
+        self.dpi = dpi
+        self.page_timeout_s = page_timeout_s
+        # Rendering, process start-up and result transfer on top of the tesseract timeout
+        self.page_grace_s = page_grace_s
+        self.job_wait_s = job_wait_s
+        self.min_page_chars = min_page_chars
+        self.ocr_fn = ocr_fn
+        self.available = HAS_OCR if available is None else available
+        self._jobs = threading.BoundedSemaphore(max_concurrent_jobs)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.active_jobs = 0
+        self.queued_pages = 0
+        self.pages_ocr = 0
+        self.pages_text_layer = 0
+        self.page_timeouts = 0
+        self.ocr_seconds = 0.0
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        # Created lazily; spawn, not fork, since the parent holds torch / encoder threads
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+            return self._executor
+
+    def ocr_document(self, path: str, on_page: Optional[Callable[[], None]] = None) -> str:
+        """
+        Text of a PDF or image, OCRing only pages without a usable text layer. Pages that
+        time out contribute no text. on_page is called as each page completes (e.g. a job deadline check).
+        """
+        if not self.available:
+            raise RuntimeError("OCR libraries (PIL/pytesseract) not installed")
+        if not self._jobs.acquire(timeout=self.job_wait_s):
+            raise OCRPoolBusy(f"No OCR capacity within {self.job_wait_s:.0f}s")
+        started = time.perf_counter()
+        with self._lock:
+            self.active_jobs += 1
+        futures = {}
+        pending = 0
+        try:
+            texts = {}
+            with self._lock:
+                # Pages of other documents already waiting for a worker
+                ahead = self.queued_pages
+            submitted = time.monotonic()
+            if path.lower().endswith(IMAGE_SUFFIXES):
+                futures[0] = self.executor.submit(self.ocr_fn, path, None, self.dpi, self.page_timeout_s)
+            else:
+                import fitz
+                with fitz.open(path) as doc:
+                    for index, page in enumerate(doc):
+                        text = page.get_text()
+                        if len(text.strip()) >= self.min_page_chars:
+                            texts[index] = text
+                        else:
+                            futures[index] = self.executor.submit(self.ocr_fn, path, index, self.dpi, self.page_timeout_s)
+                with self._lock:
+                    self.pages_text_layer += len(texts)
+            pending = len(futures)
+            with self._lock:
+                self.queued_pages += pending
+
+            for position, (index, future) in enumerate(futures.items()):
+                try:
+                    texts[index] = future.result(timeout=max(0.0, self.page_deadline(submitted, ahead + position) - time.monotonic()))
+                except (OCRPageTimeout, FutureTimeout):
+                    # OCRPageTimeout: killed in the worker. FutureTimeout (backstop): the page is abandoned
+                    with self._lock:
+                        self.page_timeouts += 1
+                    texts[index] = ""
+                with self._lock:
+                    self.queued_pages -= 1
+                    self.pages_ocr += 1
+                pending -= 1
+                if on_page:
+                    on_page()
+            return "\n".join(texts[i] for i in sorted(texts))
+        finally:
+            for future in futures.values():
+                future.cancel()
+            with self._lock:
+                self.queued_pages -= pending
+                self.active_jobs -= 1
+                self.ocr_seconds += time.perf_counter() - started
+            self._jobs.release()
+
+    def page_deadline(self, submitted: float, queue_position: int) -> float:
+        """
+        time.monotonic() by which a page submitted at `submitted` must be done: one page timeout (plus
+        grace) for every full round of pages queued ahead of it across the workers, and one for itself.
+        """
+        rounds = queue_position // self.max_workers + 1
+        return submitted + rounds * (self.page_timeout_s + self.page_grace_s)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "available": self.available,
+                "workers": self.max_workers,
+                "active_jobs": self.active_jobs,
+                "queue_depth": self.queued_pages,
+                "pages_ocr": self.pages_ocr,
+                "pages_text_layer": self.pages_text_layer,
+                "page_timeouts": self.page_timeouts,
+                "pages_per_sec": round(self.pages_ocr / self.ocr_seconds, 2) if self.ocr_seconds else 0.0,
+            }
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
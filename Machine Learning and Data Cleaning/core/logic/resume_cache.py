@@ -0,0 +1,120 @@
+"""
+core/logic/resume_cache.py — Content-Addressed Parsed-Resume Cache
+Parse results keyed by the SHA-256 of the uploaded bytes: extracted text, OCR
+output, detected sections and extracted skills. Re-uploads of the same file,
+and repeated parses of it within one upload, become lookups. Tier 1 is an
+in-process LRU; tier 2 an optional directory of JSON files bounded by total
+size, evicted least-recently-used (reads touch the file's mtime).
+"""
+import copy
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+class ResumeCache:
+    """digest → {"text", "ocr_text", "sections", "skills", ...}; entries are merged field by field."""
+
+    def __init__(self, max_entries: int = 128, disk_dir: Optional[Path] = None, max_disk_bytes: int = 256 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if self.disk_dir:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def digest_bytes(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    @staticmethod
+    def digest_file(path, chunk_size: int = 1 << 20) -> str:
+        sha = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                sha.update(chunk)
+        return sha.hexdigest()
+
+    def _path(self, digest: str) -> Path:
+        return self.disk_dir / digest[:2] / f"{digest}.json"
+
+    def _remember(self, digest: str, entry: Dict[str, Any]):
+        with self._lock:
+            self._memory[digest] = entry
+            self._memory.move_to_end(digest)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _load(self, digest: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._memory.get(digest)
+            if entry is not None:
+                self._memory.move_to_end(digest)
+                return entry
+        if self.disk_dir:
+            path = self._path(digest)
+            try:
+                entry = json.loads(path.read_text(encoding="utf-8"))
+                os.utime(path)
+            except (OSError, ValueError):
+                return None
+            self._remember(digest, entry)
+            return entry
+        return None
+
+    def get(self, digest: str) -> Optional[Dict[str, Any]]:
+        entry = self._load(digest)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return copy.deepcopy(entry)
+
+    def update(self, digest: str, **fields):
+        """Merges fields into the entry for digest (creating it) and writes it through to disk."""
+        entry = {**(self._load(digest) or {}), **copy.deepcopy(fields)}
+        self._remember(digest, entry)
+        if self.disk_dir:
+            path = self._path(digest)
+            try:
+                path.parent.mkdir(exist_ok=True)
+                tmp = path.with_suffix(".tmp")
+                tmp.write_text(json.dumps(entry, default=str), encoding="utf-8")
+                os.replace(tmp, path)
+                self._evict_disk()
+            except OSError as e:
+                print(f"[ResumeCache] Disk write failed: {e}")
+
+    def _evict_disk(self):
+        files = [(p.stat(), p) for p in self.disk_dir.glob("*/*.json")]
+        total = sum(st.st_size for st, _ in files)
+        if total <= self.max_disk_bytes:
+            return
+        for st, path in sorted(files, key=lambda f: f[0].st_mtime):
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            with self._lock:
+                self._memory.pop(path.stem, None)
+            total -= st.st_size
+            if total <= self.max_disk_bytes:
+                break
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._memory),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
@@ -0,0 +1,69 @@
+"""
+core/logic/singleflight.py — Request Coalescing
+Concurrent callers asking for the same key share one computation: the first
+caller (the leader) runs it, the others wait on its future. Removes the
+thundering herd on cache misses, e.g. a cohort submitting the same target role
+at once. Keys are tuples whose first element names the namespace used in stats.
+"""
+import copy
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+
+class SingleFlight:
+    """Go-style singleflight: do(key, fn) -> (value, shared)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inflight: Dict[Hashable, Dict[str, Any]] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, namespace: str, field: str):
+        ns = self._stats.setdefault(namespace, {"executions": 0, "coalesced": 0})
+        ns[field] += 1
+
+    def do(self, key: Tuple, fn: Callable[[], Any], copy_shared: bool = True) -> Tuple[Any, bool]:
+        """
+        Runs fn() once per key among concurrent callers. `shared` is True for callers
+        that received the leader's result; they get deep copies (of a snapshot taken before
+        the leader returns, so the leader may mutate its own value) unless copy_shared=False.
+        Exceptions raised by the leader propagate to every waiter.
+        """
+        namespace = str(key[0])
+        with self._lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = {"future": Future(), "waiters": 0}
+                self._count(namespace, "executions")
+            else:
+                flight["waiters"] += 1
+                self._count(namespace, "coalesced")
+
+        if not leader:
+            value = flight["future"].result()
+            return (copy.deepcopy(value) if copy_shared else value), True
+
+        try:
+            value = fn()
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight["future"].set_exception(e)
+            raise
+        with self._lock:
+            # No caller can join once the key is gone, so the waiter count is final
+            self._inflight.pop(key, None)
+        if flight["waiters"]:
+            flight["future"].set_result(copy.deepcopy(value) if copy_shared else value)
+        else:
+            flight["future"].set_result(None)
+        return value, False
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {
+                ns: {**counts, "in_flight": sum(1 for k in self._inflight if str(k[0]) == ns)}
+                for ns, counts in self._stats.items()
+            }
@@ -0,0 +1,218 @@
+"""
+core/logic/skill_canonicalizer.py — Skill Canonicalization Service
+Maps raw skill strings ("ReactJS", "react.js", "React") onto one canonical
+skill id: the ESCO conceptUri where known, otherwise "skill:<slug>".
+Resolution order: exact alias table → persistent alias cache → nearest
+neighbour over precomputed skill-label embeddings. Every new variant resolved
+by the embedding search is written back to the alias cache.
+"""
+import hashlib
+import json
+import re
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import pandas as pd
+import torch
+
+
+def compact_key(text: Any) -> str:
+    """Spelling-insensitive key: "React.js" / "react js" / "ReactJS" → "reactjs"."""
+    text = re.sub(r"\(.*?\)", " ", str(text).lower())
+    return re.sub(r"[^a-z0-9+#]+", "", text)
+
+
+def slug_id(label: str) -> str:
+    return "skill:" + re.sub(r"[^a-z0-9+#]+", "-", str(label).lower()).strip("-")
+
+
+class SkillCanonicalizer:
+    """
+    Canonical vocabulary = ESCO skills (preferredLabel + altLabels) plus any
+    extra labels the engine knows (e.g. course_skill_matrix skill labels).
+    """
+
+    def __init__(self, model, esco_skills: Optional[pd.DataFrame] = None, extra_labels: Iterable[str] = (),
+                 models_path: Optional[Path] = None, threshold: float = 0.78, save_every: int = 25,
+                 show_progress: bool = False):
+        self.model = model
+        self.threshold = threshold
+        self.save_every = save_every
+        self.show_progress = show_progress
+        self.labels: List[str] = []
+        self.ids: List[str] = []
+        self.id_to_label: Dict[str, str] = {}
+        self.aliases: Dict[str, str] = {}
+        self.cache: Dict[str, Optional[str]] = {}
+        self.embeddings = None
+        self._dirty = 0
+        self._lock = threading.Lock()
+        # Label embeddings are built lazily, possibly from several bundle workers at once
+        self._embeddings_lock = threading.Lock()
+
+        self.models_path = Path(models_path) if models_path else None
+        self.cache_path = self.models_path / "skill_alias_cache.json" if self.models_path else None
+        self.embeddings_path = self.models_path / "skill_label_embeddings.pt" if self.models_path else None
+
+        self._build_vocabulary(esco_skills, extra_labels)
+        self._load_alias_cache()
+
+    # ── Vocabulary / Persistence ─────────────────────────────────────
+
+    def _add_label(self, label: str, skill_id: str):
+        key = compact_key(label)
+        if not key:
+            return
+        if skill_id not in self.id_to_label:
+            self.id_to_label[skill_id] = label
+            self.labels.append(label)
+            self.ids.append(skill_id)
+        self.aliases.setdefault(key, skill_id)
+
+    def _build_vocabulary(self, esco_skills, extra_labels):
+        if esco_skills is not None and not esco_skills.empty and "preferredLabel" in esco_skills.columns:
+            has_uri = "conceptUri" in esco_skills.columns
+            has_alt = "altLabels" in esco_skills.columns
+            for _, row in esco_skills.iterrows():
+                label = row["preferredLabel"]
+                if pd.isna(label):
+                    continue
+                label = str(label).strip()
+                skill_id = str(row["conceptUri"]) if has_uri and pd.notna(row["conceptUri"]) else slug_id(label)
+                self._add_label(label, skill_id)
+                if has_alt and pd.notna(row["altLabels"]):
+                    for alt in str(row["altLabels"]).split("\n"):
+                        key = compact_key(alt)
+                        if key:
+                            self.aliases.setdefault(key, skill_id)
+
+        for label in extra_labels:
+            if label is None or (isinstance(label, float) and pd.isna(label)):
+                continue
+            label = str(label).strip()
+            key = compact_key(label)
+            if key and key not in self.aliases:
+                self._add_label(label, slug_id(label))
+
+    @property
+    def version(self) -> str:
+        h = hashlib.sha1()
+        for skill_id, label in zip(self.ids, self.labels):
+            h.update(f"{skill_id}\x1f{label}\x1e".encode("utf-8", "ignore"))
+        return h.hexdigest()
+
+    def _load_alias_cache(self):
+        if not self.cache_path or not self.cache_path.exists():
+            return
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+        except Exception:
+            return
+        if payload.get("version") == self.version:
+            self.cache = payload.get("aliases", {})
+
+    def save(self):
+        """Flushes newly resolved variants to the alias cache file."""
+        if not self.cache_path or not self._dirty:
+            return
+        # Held across the write too: concurrent flushes would share the .tmp file
+        with self._lock:
+            payload = {"version": self.version, "aliases": dict(self.cache)}
+            self._dirty = 0
+            tmp = self.cache_path.with_suffix(".json.tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(payload, f)
+            tmp.replace(self.cache_path)
+
+    def _ensure_embeddings(self):
+        if self.embeddings is not None or not self.labels:
+            return
+        with self._embeddings_lock:
+            if self.embeddings is None:
+                self._load_or_encode_embeddings()
+
+    def _load_or_encode_embeddings(self):
+        version = self.version
+        if self.embeddings_path and self.embeddings_path.exists():
+            try:
+                payload = torch.load(self.embeddings_path)
+                if payload.get("version") == version:
+                    self.embeddings = payload["embeddings"]
+            except Exception:
+                self.embeddings = None
+        if self.embeddings is None:
+            if self.show_progress: print(f"[Canonicalizer] Encoding {len(self.labels)} skill labels...")
+            embs = self.model.encode(self.labels, convert_to_tensor=True, show_progress_bar=self.show_progress)
+            embs = torch.nn.functional.normalize(embs.float(), dim=1)
+            if self.embeddings_path:
+                torch.save({"version": version, "embeddings": embs}, self.embeddings_path)
+            self.embeddings = embs
+
+    # ── Resolution ───────────────────────────────────────────────────
+
+    def _exact(self, key: str) -> Optional[str]:
+        if key in self.aliases:
+            return self.aliases[key]
+        # "reactjs" → "react", "vuejs" → "vue"
+        if key.endswith("js") and key[:-2] in self.aliases:
+            return self.aliases[key[:-2]]
+        return None
+
+    def resolve_many(self, raw_skills: List[str], allow_semantic: bool = True) -> List[Optional[str]]:
+        """Canonical id per input (None when nothing is close enough)."""
+        keys = [compact_key(s) for s in raw_skills]
+        out: List[Optional[str]] = [None] * len(keys)
+        pending: Dict[str, List[int]] = {}
+        for i, key in enumerate(keys):
+            if not key:
+                continue
+            hit = self._exact(key)
+            if hit is None and key in self.cache:
+                hit = self.cache[key]
+                if hit is None and allow_semantic:
+                    continue
+            if hit is not None:
+                out[i] = hit
+            elif allow_semantic:
+                pending.setdefault(key, []).append(i)
+
+        if pending and self.labels:
+            self._ensure_embeddings()
+            texts = [str(raw_skills[idxs[0]]).strip() for idxs in pending.values()]
+            query = self.model.encode(texts, convert_to_tensor=True)
+            query = torch.nn.functional.normalize(query.float().reshape(len(texts), -1), dim=1)
+            vals, idx = torch.max(query.to(self.embeddings.device) @ self.embeddings.T, dim=1)
+            with self._lock:
+                for (key, idxs), v, j in zip(pending.items(), vals.tolist(), idx.tolist()):
+                    hit = self.ids[j] if v >= self.threshold else None
+                    self.cache[key] = hit
+                    self._dirty += 1
+                    for i in idxs:
+                        out[i] = hit
+            if self._dirty >= self.save_every:
+                self.save()
+        return out
+
+    def resolve(self, raw_skill: str, allow_semantic: bool = True) -> Optional[str]:
+        return self.resolve_many([raw_skill], allow_semantic)[0]
+
+    def key(self, raw_skill: str) -> str:
+        """Index key: canonical id when resolvable, else the compact spelling key."""
+        return self.resolve(raw_skill) or compact_key(raw_skill)
+
+    def label(self, skill_id: Optional[str]) -> Optional[str]:
+        return self.id_to_label.get(skill_id) if skill_id else None
+
+    def canonicalize(self, raw_skills: List[str], allow_semantic: bool = True) -> List[Dict[str, Any]]:
+        """Deduplicated [{raw, id, label}] preserving first-seen order; unresolved skills keep their raw label."""
+        ids = self.resolve_many(list(raw_skills), allow_semantic)
+        seen, result = set(), []
+        for raw, skill_id in zip(raw_skills, ids):
+            dedupe_key = skill_id or compact_key(raw)
+            if not dedupe_key or dedupe_key in seen:
+                continue
+            seen.add(dedupe_key)
+            result.append({"raw": raw, "id": skill_id, "label": self.label(skill_id) or str(raw).strip()})
+        return result
@@ -0,0 +1,115 @@
+"""
+core/logic/skill_index.py — Inverted Skill → Course Index
+Built once at load time from course_skill_matrix (course_title, skill_label,
+relevance_score). Answers "which courses teach skill X" with a dictionary
+lookup and "cover these missing skills" with a greedy weighted set cover,
+replacing a semantic search per gap skill.
+"""
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+
+def default_skill_key(label: Any) -> str:
+    """Lowercase, drop bracketed qualifiers ("Python (computer programming)" → "python")."""
+    text = re.sub(r"\(.*?\)", " ", str(label).lower())
+    return " ".join(text.split())
+
+
+class SkillCourseIndex:
+    """
+    skill key → [(course_idx, strength), ...] sorted by strength (desc).
+    course_idx is the row position in the professional courses_df pool.
+    """
+
+    def __init__(self, matrix_df: pd.DataFrame, courses_df: pd.DataFrame,
+                 skill_key: Optional[Callable[[str], str]] = None, min_score: float = 0.3):
+        self.skill_key = skill_key or default_skill_key
+        self.postings: Dict[str, List[Tuple[int, float]]] = {}
+        self.course_skills: Dict[int, Dict[str, float]] = {}
+        self.labels: Dict[str, str] = {}
+
+        if matrix_df is None or matrix_df.empty or courses_df is None or courses_df.empty:
+            return
+        if not {"course_title", "skill_label", "relevance_score"}.issubset(matrix_df.columns):
+            return
+        if "course_title" not in courses_df.columns:
+            return
+
+        title_to_idx: Dict[str, int] = {}
+        for idx, title in enumerate(courses_df["course_title"].astype(str)):
+            title_to_idx.setdefault(title.strip().lower(), idx)
+
+        best: Dict[Tuple[str, int], float] = {}
+        for title, label, score in zip(matrix_df["course_title"], matrix_df["skill_label"], matrix_df["relevance_score"]):
+            if pd.isna(title) or pd.isna(label) or pd.isna(score) or float(score) < min_score:
+                continue
+            idx = title_to_idx.get(str(title).strip().lower())
+            if idx is None:
+                continue
+            for key in {self.skill_key(label), str(label).strip().lower()}:
+                if not key:
+                    continue
+                self.labels.setdefault(key, str(label))
+                pair = (key, idx)
+                best[pair] = max(best.get(pair, 0.0), float(score))
+
+        for (key, idx), score in best.items():
+            self.postings.setdefault(key, []).append((idx, score))
+            self.course_skills.setdefault(idx, {})[key] = score
+        for plist in self.postings.values():
+            plist.sort(key=lambda x: (-x[1], x[0]))
+
+    def __len__(self) -> int:
+        return len(self.postings)
+
+    def _key(self, skill: str) -> Optional[str]:
+        for key in (self.skill_key(skill), str(skill).strip().lower()):
+            if key in self.postings:
+                return key
+        return None
+
+    def lookup(self, skill: str, top_n: int = 10) -> List[Tuple[int, float]]:
+        """Ranked (course_idx, strength) pairs for one skill."""
+        key = self._key(skill)
+        return self.postings[key][:top_n] if key else []
+
+    def cover(self, missing_skills: List[str], max_courses: int = 5) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """
+        Greedy weighted set cover over the user's gap.
+        Each round picks the course with the highest summed strength over the
+        still-uncovered skills. Returns (picks, skills not covered by the returned picks:
+        unknown to the index or cut off by max_courses).
+        """
+        key_to_skill: Dict[str, str] = {}
+        unknown: List[str] = []
+        for s in missing_skills:
+            key = self._key(s)
+            if key is None:
+                unknown.append(s)
+            else:
+                key_to_skill.setdefault(key, s)
+
+        uncovered = set(key_to_skill)
+        candidates = {idx for key in uncovered for idx, _ in self.postings[key]}
+        picks: List[Dict[str, Any]] = []
+
+        while uncovered and candidates and len(picks) < max_courses:
+            best_idx, best_gain = None, 0.0
+            for idx in candidates:
+                gain = sum(v for k, v in self.course_skills[idx].items() if k in uncovered)
+                if gain > best_gain or (gain == best_gain and best_idx is not None and idx < best_idx):
+                    best_idx, best_gain = idx, gain
+            if best_idx is None or best_gain <= 0:
+                break
+            covered = sorted(k for k in self.course_skills[best_idx] if k in uncovered)
+            picks.append({
+                "course_idx": best_idx,
+                "covers": [key_to_skill[k] for k in covered],
+                "strength": round(best_gain / len(covered), 3),
+            })
+            uncovered -= set(covered)
+            candidates.discard(best_idx)
+
+        return picks, unknown + [key_to_skill[k] for k in sorted(uncovered)]
@@ -0,0 +1,223 @@
+"""
+core/logic/transferability.py — Role Transferability Matrix
+Precomputed, sparse role x role skill-transferability scores built from
+jobs_df.extracted_skills. Pivot-path ranking becomes a row lookup instead of
+repeated set and embedding computations per request.
+"""
+import hashlib
+import pickle
+import re
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+import pandas as pd
+import torch
+from scipy import sparse
+
+
+def normalize_role(title: Any) -> str:
+    """Canonical role key: lowercase, no bracketed noise, single spaces."""
+    text = re.sub(r"\(.*?\)", " ", str(title).lower())
+    return " ".join(text.split())
+
+
+def _split_skills(raw: Any) -> List[str]:
+    if isinstance(raw, list):
+        items = raw
+    elif isinstance(raw, str):
+        items = raw.split(",")
+    else:
+        return []
+    return [str(s).strip().lower() for s in items if len(str(s).strip()) > 2]
+
+
+class RoleTransferabilityMatrix:
+    """
+    Sparse role x role matrix holding two signals per pair:
+      - Jaccard overlap of the roles' skill sets
+      - Cosine similarity of the roles' skill-set embeddings
+    Only the top-k neighbours of every role are kept for each signal.
+    """
+
+    JACCARD_WEIGHT = 0.5
+    EMBEDDING_WEIGHT = 0.5
+
+    def __init__(self, roles: List[str], titles: List[str], role_skills: List[List[str]],
+                 jaccard: sparse.csr_matrix, embedding: sparse.csr_matrix, version: str):
+        self.roles = roles
+        self.titles = titles
+        self.role_skills = role_skills
+        self.jaccard = jaccard
+        self.embedding = embedding
+        self.version = version
+        self.role_index = {r: i for i, r in enumerate(roles)}
+
+    def __len__(self) -> int:
+        return len(self.roles)
+
+    # ── Build / Persist ──────────────────────────────────────────────
+
+    @staticmethod
+    def fingerprint(jobs_df: pd.DataFrame) -> str:
+        """Data-release fingerprint: changes whenever titles or skills change."""
+        if jobs_df is None or jobs_df.empty or "extracted_skills" not in jobs_df.columns or "title" not in jobs_df.columns:
+            return "empty"
+        h = hashlib.sha1()
+        for title, skills in zip(jobs_df["title"].astype(str), jobs_df["extracted_skills"].astype(str)):
+            h.update(title.encode("utf-8", "ignore"))
+            h.update(b"\x1f")
+            h.update(skills.encode("utf-8", "ignore"))
+            h.update(b"\x1e")
+        return h.hexdigest()
+
+    @classmethod
+    def build(cls, jobs_df: pd.DataFrame, model, top_k: int = 25, min_jaccard: float = 0.05,
+              block_size: int = 1024, show_progress: bool = False) -> "RoleTransferabilityMatrix":
+        """Aggregates skills per role and computes both sparse top-k signals."""
+        version = cls.fingerprint(jobs_df)
+        role_sets: Dict[str, set] = {}
+        titles: Dict[str, str] = {}
+
+        if version != "empty":
+            for title, raw in zip(jobs_df["title"], jobs_df["extracted_skills"]):
+                key = normalize_role(title)
+                skills = _split_skills(raw)
+                if not key or not skills:
+                    continue
+                role_sets.setdefault(key, set()).update(skills)
+                titles.setdefault(key, str(title).strip())
+
+        roles = sorted(role_sets)
+        role_skills = [sorted(role_sets[r]) for r in roles]
+        n = len(roles)
+        if n < 2:
+            empty = sparse.csr_matrix((n, n), dtype=np.float32)
+            return cls(roles, [titles[r] for r in roles], role_skills, empty, empty.copy(), version)
+
+        if show_progress: print(f"[Transferability] Building matrix for {n} roles...")
+
+        # 1. Jaccard via sparse role x skill incidence: |A∩B| = (M · Mᵀ)[a, b]
+        vocab = {s: j for j, s in enumerate(sorted({s for sk in role_skills for s in sk}))}
+        rows, cols = [], []
+        for i, sk in enumerate(role_skills):
+            rows.extend([i] * len(sk))
+            cols.extend(vocab[s] for s in sk)
+        incidence = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (rows, cols)), shape=(n, len(vocab))
+        )
+        sizes = np.asarray(incidence.sum(axis=1)).ravel()
+        inter = (incidence @ incidence.T).tocoo()
+        union = sizes[inter.row] + sizes[inter.col] - inter.data
+        jac = np.divide(inter.data, union, out=np.zeros_like(inter.data), where=union > 0)
+        keep = (inter.row != inter.col) & (jac >= min_jaccard)
+        jaccard = cls._top_k_rows(inter.row[keep], inter.col[keep], jac[keep], n, top_k)
+
+        # 2. Embedding similarity over skill-set sentences, streamed in row blocks
+        texts = [f"{titles[r]}: " + ", ".join(sk[:30]) for r, sk in zip(roles, role_skills)]
+        embs = model.encode(texts, convert_to_tensor=True, show_progress_bar=show_progress)
+        embs = torch.nn.functional.normalize(embs.float(), dim=1)
+        k = min(top_k + 1, n)
+        e_rows, e_cols, e_vals = [], [], []
+        for start in range(0, n, block_size):
+            sims = embs[start:start + block_size] @ embs.T
+            vals, idx = torch.topk(sims, k=k, dim=1)
+            for offset in range(vals.shape[0]):
+                i = start + offset
+                for v, j in zip(vals[offset].tolist(), idx[offset].tolist()):
+                    if j != i:
+                        e_rows.append(i); e_cols.append(j); e_vals.append(v)
+        embedding = cls._top_k_rows(np.array(e_rows), np.array(e_cols), np.array(e_vals, dtype=np.float32), n, top_k)
+
+        return cls(roles, [titles[r] for r in roles], role_skills, jaccard, embedding, version)
+
+    @staticmethod
+    def _top_k_rows(rows: np.ndarray, cols: np.ndarray, vals: np.ndarray, n: int, top_k: int) -> sparse.csr_matrix:
+        """Keeps only the top_k largest values of every row."""
+        if len(vals) == 0:
+            return sparse.csr_matrix((n, n), dtype=np.float32)
+        order = np.lexsort((-vals, rows))
+        rows, cols, vals = rows[order], cols[order], vals[order]
+        rank = np.arange(len(rows)) - np.searchsorted(rows, rows)
+        keep = rank < top_k
+        return sparse.csr_matrix((vals[keep].astype(np.float32), (rows[keep], cols[keep])), shape=(n, n))
+
+    def save(self, path: Path) -> Path:
+        path = Path(path)
+        payload = {
+            "version": self.version,
+            "roles": self.roles,
+            "titles": self.titles,
+            "role_skills": self.role_skills,
+            "jaccard": self.jaccard,
+            "embedding": self.embedding,
+        }
+        with open(path, "wb") as f:
+            pickle.dump(payload, f)
+        return path
+
+    @classmethod
+    def load(cls, path: Path, expected_version: Optional[str] = None) -> Optional["RoleTransferabilityMatrix"]:
+        """Returns None when the file is missing, unreadable or built from another data release."""
+        path = Path(path)
+        if not path.exists():
+            return None
+        try:
+            with open(path, "rb") as f:
+                payload = pickle.load(f)
+        except Exception:
+            return None
+        if expected_version is not None and payload.get("version") != expected_version:
+            return None
+        return cls(payload["roles"], payload["titles"], payload["role_skills"],
+                   payload["jaccard"], payload["embedding"], payload["version"])
+
+    # ── Lookups ──────────────────────────────────────────────────────
+
+    def resolve_role(self, title: str) -> Optional[int]:
+        """Exact role key first, then the shortest role containing the query (or vice versa)."""
+        key = normalize_role(title)
+        if not key:
+            return None
+        if key in self.role_index:
+            return self.role_index[key]
+        candidates = [r for r in self.roles if key in r or r in key]
+        if not candidates:
+            return None
+        return self.role_index[min(candidates, key=len)]
+
+    def _pair_scores(self, i: int, j: int) -> Dict[str, float]:
+        jac = float(self.jaccard[i, j])
+        emb = float(self.embedding[i, j])
+        return {
+            "jaccard": round(jac, 3),
+            "embedding_similarity": round(emb, 3),
+            "score": round(self.JACCARD_WEIGHT * jac + self.EMBEDDING_WEIGHT * emb, 3),
+        }
+
+    def row(self, title: str, top_n: int = 5) -> List[Dict[str, Any]]:
+        """Ranked pivot roles for `title` (empty if the role is unknown)."""
+        i = self.resolve_role(title)
+        if i is None:
+            return []
+        neighbours = set(self.jaccard.getrow(i).indices) | set(self.embedding.getrow(i).indices)
+        own = set(self.role_skills[i])
+        results = []
+        for j in neighbours:
+            entry = {"title": self.titles[j], **self._pair_scores(i, j)}
+            entry["shared_skills"] = sorted(own & set(self.role_skills[j]))[:5]
+            results.append(entry)
+        results.sort(key=lambda x: x["score"], reverse=True)
+        return results[:top_n]
+
+    def pair(self, current_title: str, target_title: str) -> Optional[Dict[str, Any]]:
+        """Transferability between two known roles, or None if either is unknown."""
+        i, j = self.resolve_role(current_title), self.resolve_role(target_title)
+        if i is None or j is None:
+            return None
+        current, target = set(self.role_skills[i]), set(self.role_skills[j])
+        return {
+            **self._pair_scores(i, j),
+            "transferable_skills": sorted(current & target),
+            "missing_skills": sorted(target - current),
+        }
@@ -0,0 +1,60 @@
+"""
+core/logic/vector_shards.py — Partitioned Vector Index
+Splits an embedding store into shards keyed by precomputed attributes
+(domain, level) so a query only scans the shards that can survive the rule
+engine filters, instead of over-fetching the whole pool and discarding most hits.
+"""
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence
+
+import torch
+from sentence_transformers import util
+
+
+class ShardedVectorIndex:
+    """
+    shard key → (embedding slice, global row ids).
+    Search results use the same {"corpus_id", "score"} shape as util.semantic_search,
+    with corpus_id pointing at the row of the original (unsharded) store.
+    """
+
+    def __init__(self, embeddings: torch.Tensor, keys: Sequence[Hashable]):
+        if embeddings is None or len(keys) != len(embeddings):
+            raise ValueError("ShardedVectorIndex needs one shard key per embedding row")
+        groups: Dict[Hashable, List[int]] = {}
+        for i, key in enumerate(keys):
+            groups.setdefault(key, []).append(i)
+
+        self.shards: Dict[Hashable, Dict[str, torch.Tensor]] = {}
+        for key, rows in groups.items():
+            ids = torch.tensor(rows, dtype=torch.long)
+            self.shards[key] = {"embeddings": embeddings[ids.to(embeddings.device)], "ids": ids}
+
+    def __len__(self) -> int:
+        return sum(len(s["ids"]) for s in self.shards.values())
+
+    def sizes(self) -> Dict[Hashable, int]:
+        return {key: len(s["ids"]) for key, s in self.shards.items()}
+
+    def select(self, predicate: Optional[Callable[[Hashable], bool]] = None) -> List[Hashable]:
+        return [key for key in self.shards if predicate is None or predicate(key)]
+
+    def row_ids(self, shard_keys: Optional[List[Hashable]] = None) -> torch.Tensor:
+        """Global row ids covered by the selected shards (all shards when shard_keys is None)."""
+        keys = list(self.shards) if shard_keys is None else [k for k in shard_keys if k in self.shards]
+        if not keys:
+            return torch.empty(0, dtype=torch.long)
+        return torch.cat([self.shards[k]["ids"] for k in keys])
+
+    def search(self, query_emb: torch.Tensor, top_k: int, shard_keys: Optional[List[Hashable]] = None,
+               min_score: float = 0.0) -> List[Dict[str, Any]]:
+        """Top-k over the selected shards only (all shards when shard_keys is None)."""
+        keys = list(self.shards) if shard_keys is None else [k for k in shard_keys if k in self.shards]
+        hits: List[Dict[str, Any]] = []
+        for key in keys:
+            shard = self.shards[key]
+            for h in util.semantic_search(query_emb, shard["embeddings"], top_k=min(top_k, len(shard["ids"])))[0]:
+                if h["score"] < min_score:
+                    continue
+                hits.append({"corpus_id": int(shard["ids"][h["corpus_id"]]), "score": h["score"], "shard": key})
+        hits.sort(key=lambda h: h["score"], reverse=True)
+        return hits[:top_k]
@@ -4,6 +4,74 @@ from sentence_transformers import SentenceTransformer
 from pathlib import Path
 import sys
 import os
+import csv
+import time
+
+
+def _collect_skill_labels(esco_dir, jobs_path, matrix_path):
+    """Skill vocabulary: ESCO skills first, then job-posting skills, then the previous matrix."""
+    esco_skills_path = esco_dir / "skills_en.csv"
+    if esco_skills_path.exists():
+        labels = pd.read_csv(esco_skills_path, usecols=["preferredLabel"])["preferredLabel"].dropna().tolist()
+    else:
+        labels = []
+        if jobs_path.exists():
+            jobs = pd.read_csv(jobs_path)
+            if "extracted_skills" in jobs.columns:
+                for raw in jobs["extracted_skills"].dropna():
+                    labels.extend(s.strip() for s in str(raw).split(","))
+        if not labels and matrix_path.exists():
+            labels = pd.read_csv(matrix_path, usecols=["skill_label"])["skill_label"].dropna().tolist()
+
+    seen, unique = set(), []
+    for label in labels:
+        key = str(label).strip().lower()
+        if len(key) > 1 and key not in seen:
+            seen.add(key)
+            unique.append(str(label).strip())
+    return unique
+
+
+def build_course_skill_matrix(model, course_embs, course_titles, skill_labels, out_path,
+                              top_k=3, min_score=0.25, memory_budget_mb=256):
+    """
+    Streams course embedding blocks against the skill embedding matrix and keeps
+    only the per-course top_k skills (torch.topk), so the full courses x skills
+    similarity matrix is never materialised. Rows are appended to a sparse
+    (course_title, skill_label, relevance_score) CSV as each block finishes.
+    """
+    skill_embs = model.encode(skill_labels, convert_to_tensor=True, show_progress_bar=True)
+    skill_embs = torch.nn.functional.normalize(skill_embs.float(), dim=1)
+    course_embs = torch.nn.functional.normalize(course_embs.float().to(skill_embs.device), dim=1)
+
+    n_courses, n_skills = course_embs.shape[0], skill_embs.shape[0]
+    k = min(top_k, n_skills)
+    # One float32 similarity row per course is the dominant allocation
+    block_size = max(1, int(memory_budget_mb * 1024 * 1024) // (n_skills * 4))
+    print(f"       {n_courses} courses x {n_skills} skills, block size {block_size} (~{memory_budget_mb} MB budget)")
+
+    tmp_path = out_path.with_suffix(".csv.tmp")
+    written = 0
+    started = time.time()
+    with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["course_title", "skill_label", "relevance_score"])
+        for start in range(0, n_courses, block_size):
+            sims = course_embs[start:start + block_size] @ skill_embs.T
+            vals, idx = torch.topk(sims, k=k, dim=1)
+            del sims
+            for offset, (row_vals, row_idx) in enumerate(zip(vals.tolist(), idx.tolist())):
+                title = course_titles[start + offset]
+                for v, j in zip(row_vals, row_idx):
+                    if v >= min_score:
+                        writer.writerow([title, skill_labels[j], v])
+                        written += 1
+            done = min(start + block_size, n_courses)
+            elapsed = max(time.time() - started, 1e-6)
+            print(f"       {done}/{n_courses} courses | {written} links | {done / elapsed:,.0f} courses/s", end="\r")
+    print()
+    os.replace(tmp_path, out_path)
+    return written
 
 
 def generate_artifacts():
@@ -24,6 +92,7 @@ def generate_artifacts():
     PROFESSIONAL_COURSES_PATH = PROCESSED_DIR / "academic_courses_master.csv"  #  courses_df
     ACADEMIC_COURSES_PATH = PROCESSED_DIR / "all_courses_master.csv"           #  academic_df
     JOBS_PATH = PROCESSED_DIR / "all_jobs_master.csv"
+    SKILL_MATRIX_PATH = PROCESSED_DIR / "course_skill_matrix.csv"
 
     print("\n" + "="*60)
     print("   PATHFINDER+ MODEL ARTIFACT GENERATOR")
@@ -48,6 +117,7 @@ def generate_artifacts():
 
 
     print(f"\n Processing Professional Skill-Gap Courses ({PROFESSIONAL_COURSES_PATH.name})...")
+    course_embs, course_titles = None, []
     if PROFESSIONAL_COURSES_PATH.exists():
         courses_df = pd.read_csv(PROFESSIONAL_COURSES_PATH)
 
@@ -69,6 +139,7 @@ def generate_artifacts():
 
         print(f" Encoding {len(course_texts)} professional courses...")
         course_embs = model.encode(course_texts, convert_to_tensor=True, show_progress_bar=True)
+        course_titles = courses_df["course_title"].fillna("").tolist()
 
         # Engine looks for course_embeddings_{stem}.pt
         prof_emb_file = MODELS_DIR / f"course_embeddings_{PROFESSIONAL_COURSES_PATH.stem}.pt"
@@ -121,9 +192,31 @@ def generate_artifacts():
         job_embs = model.encode(job_titles, convert_to_tensor=True, show_progress_bar=True)
         torch.save(job_embs, job_emb_file)
         print(f"       Saved -> {job_emb_file.name} ({len(job_embs)} embeddings)")
+
+        # Role x Role transferability matrix (engine rebuilds it too if the data fingerprint changes)
+        sys.path.append(str(ML_ROOT))
+        from core.logic.transferability import RoleTransferabilityMatrix
+
+        matrix_file = MODELS_DIR / "role_transferability.pkl"
+        print(f"\n[BONUS] Building role transferability matrix...")
+        if "extracted_skills" in jobs_df.columns:
+            matrix = RoleTransferabilityMatrix.build(jobs_df, model, show_progress=True)
+            matrix.save(matrix_file)
+            print(f"       Saved -> {matrix_file.name} ({len(matrix)} roles)")
+        else:
+            print(f"       [WARN] 'extracted_skills' column missing in {JOBS_PATH.name}; skipping matrix.")
     else:
         print(f"       [WARN] Jobs not found: {JOBS_PATH}")
 
+    # Course x Skill matrix (feeds the engine's inverted skill -> course index)
+    print(f"\n[BONUS] Building course-skill matrix ({SKILL_MATRIX_PATH.name})...")
+    skill_labels = _collect_skill_labels(ESCO_DIR, JOBS_PATH, SKILL_MATRIX_PATH)
+    if course_embs is not None and skill_labels:
+        written = build_course_skill_matrix(model, course_embs, course_titles, skill_labels, SKILL_MATRIX_PATH)
+        print(f"       Saved -> {SKILL_MATRIX_PATH.name} ({written} course-skill links)")
+    else:
+        print("       [WARN] No course embeddings or skill vocabulary; skipping matrix.")
+
     print("\n" + "="*60)
     print("  ARTIFACT GENERATION COMPLETE")
     print(f" All .pt files saved to: {MODELS_DIR}")
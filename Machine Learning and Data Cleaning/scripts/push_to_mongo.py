@@ -231,7 +231,7 @@ def upload_skill_matrix(db, matrix_path):
     for record in records:
         try:
             collection.update_one(
-                {'course_id': record.get('course_id')},
+                {'course_title': record.get('course_title'), 'skill_label': record.get('skill_label')},
                 {'$set': record},
                 upsert=True
             )
@@ -0,0 +1,57 @@
+import os
+import re
+import sys
+import zlib
+from pathlib import Path
+
+import pytest
+import torch
+
+ml_root = Path(__file__).resolve().parent.parent
+sys.path.append(str(ml_root))
+
+# Scripts in this folder (final_varied_test.py, ...) need the real models and data; pytest runs the test_* modules only
+collect_ignore = ["final_varied_test.py", "comprehensive_scenarios_10.py"]
+
+
+class HashingEncoder:
+    """
+    Offline stand-in for the SentenceTransformer: hashed bag-of-words vectors, so texts
+    sharing words score high. Deterministic, which is all the engine tests rely on.
+    """
+
+    dim = 384
+
+    def _vec(self, text):
+        v = torch.zeros(self.dim)
+        for token in re.findall(r"[a-z0-9+#]+", str(text).lower()):
+            v[zlib.crc32(token.encode()) % self.dim] += 1.0
+        return torch.nn.functional.normalize(v + 0.05, dim=0)
+
+    def encode(self, texts, convert_to_tensor=True, show_progress_bar=False, **kwargs):
+        single = isinstance(texts, str)
+        batch = [texts] if single else list(texts)
+        out = torch.stack([self._vec(t) for t in batch]) if batch else torch.zeros(0, self.dim)
+        if not convert_to_tensor:
+            out = out.numpy()
+        return out[0] if single else out
+
+
+@pytest.fixture(scope="session")
+def engine(tmp_path_factory):
+    """RecommendationEngine over the bundled CSVs, with the hashing encoder in place of the SentenceTransformer."""
+    import core.recommendation_engine as engine_module
+    import core.utils.market_trend_analyzer as trend_module
+
+    patch = pytest.MonkeyPatch()
+    patch.setenv("HF_HUB_OFFLINE", "1")
+    patch.setattr(engine_module, "SentenceTransformer", lambda *a, **k: HashingEncoder())
+    patch.setattr(trend_module, "SentenceTransformer", lambda *a, **k: HashingEncoder())
+    try:
+        yield engine_module.RecommendationEngine(
+            models_dir=str(tmp_path_factory.mktemp("models")),
+            courses_path=str(ml_root / "data" / "processed" / "all_courses_master.csv"),
+            show_progress=False,
+        )
+    finally:
+        patch.undo()
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.logic.ats_matcher import ATSMatcher
+
+JOBS = pd.DataFrame({
+    "title": ["Data Scientist", "Backend Engineer", "Data Engineer", "Office Assistant"],
+    "extracted_skills": ["Python, SQL, Statistics", "Python, Docker", ["SQL", "Spark"], None],
+})
+# One axis per job so semantic similarity is easy to read off
+JOB_EMBS = np.eye(4, dtype=np.float32)
+
+
+def test_match_matrix_scores_skill_coverage_for_every_pair():
+    matcher = ATSMatcher(JOBS, None)
+    result = matcher.match_matrix([["python", "SQL"], ["Spark"], []])
+    assert result["scores"].shape == (3, 4)
+    np.testing.assert_allclose(result["coverage"], [
+        [2 / 3, 1 / 2, 1 / 2, 0.0],
+        [0.0, 0.0, 1 / 2, 0.0],
+        [0.0, 0.0, 0.0, 0.0],
+    ], rtol=1e-6)
+    # Without embeddings the total is the coverage alone
+    np.testing.assert_array_equal(result["scores"], result["coverage"])
+    assert not result["semantic"].any()
+
+
+def test_match_matrix_blends_in_semantic_similarity_over_a_job_subset():
+    matcher = ATSMatcher(JOBS, JOB_EMBS)
+    resume_embs = np.array([[0.0, 0.0, 3.0, 0.0]], dtype=np.float32)
+    result = matcher.match_matrix([["SQL"]], resume_embs, job_ids=matcher.select({"title": "data"}))
+    assert result["job_ids"].tolist() == [0, 2]
+    np.testing.assert_allclose(result["semantic"], [[0.0, 1.0]], atol=1e-6)
+    expected = ATSMatcher.SKILL_WEIGHT * np.array([1 / 3, 1 / 2]) + ATSMatcher.EMBEDDING_WEIGHT * np.array([0.0, 1.0])
+    np.testing.assert_allclose(result["scores"][0], expected, rtol=1e-6)
+
+
+def test_rank_matrix_orders_top_k_with_matched_and_missing_skills():
+    matcher = ATSMatcher(JOBS, None)
+    skills = [["Python", "SQL"], ["Spark"]]
+    ranked = matcher.rank_matrix(skills, matcher.match_matrix(skills), top_k=2)
+    assert [m["title"] for m in ranked[0]] == ["Data Scientist", "Backend Engineer"]
+    assert ranked[0][0] == {
+        "job_index": 0, "title": "Data Scientist", "score": 66.7, "skill_coverage": 0.667,
+        "semantic_similarity": 0.0, "matched_skills": ["Python", "SQL"], "missing_skills": ["Statistics"],
+    }
+    assert ranked[1][0]["title"] == "Data Engineer"
+    assert ranked[1][0]["missing_skills"] == ["SQL"]
+
+
+def test_rank_matrix_caps_top_k_at_the_jobs_considered():
+    matcher = ATSMatcher(JOBS, None)
+    result = matcher.match_matrix([["Python"]], job_ids=matcher.select({"title": "engineer"}))
+    assert [m["job_index"] for m in matcher.rank_matrix([["Python"]], result, top_k=10)[0]] == [1, 2]
+    empty = matcher.match_matrix([["Python"]], job_ids=matcher.select({"title": "nurse"}))
+    assert matcher.rank_matrix([["Python"]], empty, top_k=10) == [[]]
+
+
+def test_ats_match_refuses_a_matrix_past_the_cell_limit(engine):
+    jobs = len(engine._get_ats_matcher())
+    with pytest.raises(ValueError, match="filters"):
+        engine.ats_match([["Python"], ["SQL"]], include_matrix=True, max_matrix_cells=2 * jobs - 1)
+    # The ranking alone is not bounded by it
+    result = engine.ats_match([["Python"], ["SQL"]], top_k=3, max_matrix_cells=1)
+    assert result["jobs_considered"] == jobs and "matrix" not in result
+    assert all(len(matches) == min(3, jobs) for matches in result["matches"])
@@ -0,0 +1,59 @@
+import numpy as np
+
+from core.logic.bundle_cache import BundleCache
+
+VECTOR = {"extracted_intent_skills": ["Python", "SQL"], "experience_years": 3, "domain": "IT"}
+
+
+def test_fingerprint_ignores_formatting_but_not_content():
+    cache = BundleCache()
+    key = cache.fingerprint(VECTOR, "Data Scientist", "dashboard")
+    same = {"domain": "IT", "experience_years": np.int64(3), "extracted_intent_skills": ["Python", "SQL"],
+            "intent_embedding": [0.1, 0.2]}
+    assert cache.fingerprint(same, "Data  Scientist", "dashboard") == key
+    assert cache.fingerprint({**VECTOR, "experience_years": 3.0}, "Data Scientist", "dashboard") == key
+    # Skill order feeds the query, so it is part of the key
+    assert cache.fingerprint({**VECTOR, "extracted_intent_skills": ["SQL", "Python"]}, "Data Scientist", "dashboard") != key
+    assert cache.fingerprint(VECTOR, "Data Scientist", "courses") != key
+
+
+def test_memory_tier_is_lru_and_returns_private_copies():
+    cache = BundleCache(max_entries=2)
+    cache.put("a", {"jobs": [1]})
+    cache.put("b", {"jobs": [2]})
+    cache.get("a")["jobs"].append(99)
+    cache.put("c", {"jobs": [3]})
+    # "a" was used after "b", so "b" is the one evicted
+    assert cache.get("a") == {"jobs": [1]}
+    assert cache.get("b") is None
+    assert cache.stats()["entries"] == 2
+
+
+def test_disk_tier_is_shared_across_instances(tmp_path):
+    path = tmp_path / "bundles.sqlite"
+    writer = BundleCache(disk_path=path)
+    writer.invalidate("v1")
+    writer.put("k", {"career_snapshot": {"target_role": "Data Scientist"}})
+
+    reader = BundleCache(disk_path=path)
+    reader.invalidate("v1")
+    assert reader.get("k") == {"career_snapshot": {"target_role": "Data Scientist"}}
+    assert reader.get("k") is not None
+    stats = reader.stats()
+    assert stats["disk_hits"] == 1 and stats["hits"] == 2
+
+
+def test_dataset_version_change_invalidates_both_tiers(tmp_path):
+    path = tmp_path / "bundles.sqlite"
+    cache = BundleCache(disk_path=path)
+    cache.invalidate("v1")
+    key = cache.fingerprint(VECTOR, "Data Scientist")
+    cache.put(key, {"jobs": []})
+
+    cache.invalidate("v2")
+    assert cache.get(key) is None
+    assert cache.fingerprint(VECTOR, "Data Scientist") != key
+    # A worker still on v1 finds nothing on disk either
+    stale = BundleCache(disk_path=path)
+    stale.invalidate("v1")
+    assert stale.get(key) is None
@@ -0,0 +1,132 @@
+import threading
+import time
+
+import pytest
+
+from core.logic.bundle_executor import BundleExecutor
+
+
+def _executor(max_workers=2, **sections):
+    ex = BundleExecutor(max_workers=max_workers)
+    for name, (fn, deps) in sections.items():
+        ex.section(name, fn, deps=deps)
+    return ex
+
+
+def test_runs_in_dependency_order_and_reports_timings():
+    seen = []
+    ex = _executor(
+        a=(lambda ctx, r: seen.append("a") or 1, ()),
+        b=(lambda ctx, r: seen.append("b") or r["a"] + 1, ("a",)),
+        c=(lambda ctx, r: r["a"] + r["b"], ("a", "b")),
+    )
+    results, timings, degraded = ex.run({})
+    assert results == {"a": 1, "b": 2, "c": 3}
+    assert seen == ["a", "b"]
+    assert set(timings) == {"a", "b", "c", "total"}
+    assert degraded == []
+
+
+def test_plan_pulls_in_dependencies_and_reuse_skips_work():
+    calls = []
+    ex = _executor(
+        a=(lambda ctx, r: calls.append("a") or 1, ()),
+        b=(lambda ctx, r: r["a"] * 10, ("a",)),
+        c=(lambda ctx, r: "unused", ()),
+    )
+    assert ex.plan(["b"]) == ["a", "b"]
+    assert ex.dependents(["a"]) == ["a", "b"]
+    results, _, _ = ex.run({}, wanted=["b"], reuse={"a": 5})
+    assert results == {"a": 5, "b": 50}
+    assert calls == []
+
+
+def test_unknown_dependency_is_rejected():
+    ex = BundleExecutor()
+    with pytest.raises(ValueError):
+        ex.section("b", lambda ctx, r: None, deps=["a"])
+
+
+def test_section_errors_propagate_and_stop_the_run():
+    started = []
+
+    def boom(ctx, r):
+        raise RuntimeError("boom")
+
+    ex = _executor(bad=(boom, ()), later=(lambda ctx, r: started.append("later"), ("bad",)))
+    with pytest.raises(RuntimeError):
+        ex.run({})
+    assert started == []
+
+
+def test_deadline_degrades_slow_and_downstream_sections():
+    release = threading.Event()
+    ex = _executor(
+        fast=(lambda ctx, r: "ok", ()),
+        slow=(lambda ctx, r: release.wait(2) and "late", ()),
+        after=(lambda ctx, r: "after", ("slow",)),
+    )
+    results, _, degraded = ex.run(
+        {}, deadline=time.perf_counter() + 0.1, fallback=lambda name, ctx, r: f"fallback:{name}"
+    )
+    release.set()
+    assert results["fast"] == "ok"
+    assert results["slow"] == "fallback:slow"
+    assert results["after"] == "fallback:after"
+    assert sorted(degraded) == ["after", "slow"]
+
+
+def test_nothing_is_started_for_a_bundle_past_its_deadline():
+    started = []
+    ex = _executor(a=(lambda ctx, r: started.append("a"), ()))
+    results, _, degraded = ex.run({}, deadline=time.perf_counter() - 1, fallback=lambda name, ctx, r: None)
+    assert started == []
+    assert degraded == ["a"]
+
+
+def test_abandoned_sections_give_their_slot_back():
+    release = threading.Event()
+    ex = _executor(max_workers=1, slow=(lambda ctx, r: release.wait(5), ()))
+    other = _executor(max_workers=1, quick=(lambda ctx, r: "done", ()))
+    # Share one pool and slot budget, as all bundle requests do
+    other._slots, other._pool = ex._slots, ex.pool
+
+    _, _, degraded = ex.run({}, deadline=time.perf_counter() + 0.05, fallback=lambda name, ctx, r: None)
+    assert degraded == ["slow"]
+    assert ex.stats()["orphaned_running"] == 1
+
+    # The only slot is free again even though the abandoned section is still running
+    results, _, degraded = other.run({}, deadline=time.perf_counter() + 1)
+    assert results == {"quick": "done"} and degraded == []
+
+    release.set()
+    for _ in range(100):
+        if ex.stats()["orphaned_running"] == 0:
+            break
+        time.sleep(0.01)
+    assert ex.stats()["orphaned_running"] == 0
+    assert ex._slots.acquire(blocking=False)
+
+
+def test_listener_error_abandons_the_rest_of_the_run():
+    release = threading.Event()
+    started = []
+
+    class Gone(Exception):
+        pass
+
+    def listener(name, results):
+        if name == "fast":
+            raise Gone()
+
+    ex = _executor(
+        max_workers=1,
+        fast=(lambda ctx, r: "ok", ()),
+        slow=(lambda ctx, r: release.wait(5), ("fast",)),
+        later=(lambda ctx, r: started.append("later"), ("slow",)),
+    )
+    with pytest.raises(Gone):
+        ex.run({}, on_section=listener)
+    release.set()
+    assert started == []
+    assert ex._slots.acquire(blocking=False)
@@ -0,0 +1,67 @@
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+import torch
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from generate_model_artifacts import _collect_skill_labels, build_course_skill_matrix
+
+
+class TableModel:
+    """Encoder returning preset vectors for the skill labels."""
+
+    def __init__(self, vectors):
+        self.vectors = vectors
+
+    def encode(self, texts, convert_to_tensor=True, show_progress_bar=False):
+        return torch.stack([self.vectors[t] for t in texts])
+
+
+def _dense_reference(course_embs, skill_embs, labels, titles, top_k, min_score):
+    course = torch.nn.functional.normalize(course_embs, dim=1)
+    skill = torch.nn.functional.normalize(skill_embs, dim=1)
+    vals, idx = torch.topk(course @ skill.T, k=top_k, dim=1)
+    return [(titles[i], labels[j], v) for i in range(len(titles))
+            for v, j in zip(vals[i].tolist(), idx[i].tolist()) if v >= min_score]
+
+
+def test_blockwise_top_k_matches_the_dense_computation(tmp_path):
+    torch.manual_seed(0)
+    labels = [f"skill {i}" for i in range(40)]
+    skill_embs = torch.randn(len(labels), 8)
+    course_embs = torch.randn(23, 8)
+    titles = [f"course {i}" for i in range(23)]
+    out = tmp_path / "course_skill_matrix.csv"
+
+    # A budget of 640 bytes holds 4 similarity rows of 40 floats: 6 blocks, the last one partial
+    written = build_course_skill_matrix(TableModel(dict(zip(labels, skill_embs))), course_embs, titles, labels, out,
+                                        top_k=3, min_score=0.1, memory_budget_mb=640 / (1024 * 1024))
+
+    got = pd.read_csv(out)
+    expected = _dense_reference(course_embs, skill_embs, labels, titles, top_k=3, min_score=0.1)
+    assert list(got.columns) == ["course_title", "skill_label", "relevance_score"]
+    assert written == len(got) == len(expected)
+    assert list(zip(got["course_title"], got["skill_label"])) == [(t, s) for t, s, _ in expected]
+    assert got["relevance_score"].tolist() == pytest.approx([v for _, _, v in expected], abs=1e-5)
+    assert not out.with_suffix(".csv.tmp").exists()
+
+
+def test_top_k_is_capped_by_the_vocabulary(tmp_path):
+    labels = ["python", "sql"]
+    model = TableModel({"python": torch.tensor([1.0, 0.0]), "sql": torch.tensor([0.0, 1.0])})
+    out = tmp_path / "matrix.csv"
+    build_course_skill_matrix(model, torch.tensor([[1.0, 0.2]]), ["Intro"], labels, out, top_k=5, min_score=0.0)
+    assert pd.read_csv(out)["skill_label"].tolist() == ["python", "sql"]
+
+
+def test_skill_vocabulary_falls_back_to_job_postings(tmp_path):
+    jobs = tmp_path / "jobs.csv"
+    pd.DataFrame({"extracted_skills": ["Python, SQL", "python, Docker, x"]}).to_csv(jobs, index=False)
+    assert _collect_skill_labels(tmp_path / "esco", jobs, tmp_path / "missing.csv") == ["Python", "SQL", "Docker"]
+
+    (tmp_path / "esco").mkdir()
+    pd.DataFrame({"preferredLabel": ["manage budgets", None, "Manage Budgets"]}).to_csv(tmp_path / "esco" / "skills_en.csv", index=False)
+    assert _collect_skill_labels(tmp_path / "esco", jobs, tmp_path / "missing.csv") == ["manage budgets"]
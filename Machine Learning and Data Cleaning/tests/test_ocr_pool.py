@@ -0,0 +1,83 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import fitz
+import pytest
+
+from core.logic.ocr_pool import OCRPageTimeout, OCRPool
+
+TEXT = "Experienced data analyst with Python, SQL and Tableau across retail and banking projects."
+
+
+def _pdf(tmp_path, pages):
+    """PDF whose pages carry the given text layer ("" = a scanned page with no text)."""
+    doc = fitz.open()
+    for text in pages:
+        page = doc.new_page()
+        if text:
+            page.insert_text((72, 72), text, fontsize=8)
+    path = tmp_path / "cv.pdf"
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+
+def _pool(ocr_fn, max_workers=2, **kwargs):
+    pool = OCRPool(max_workers=max_workers, ocr_fn=ocr_fn, available=True, **kwargs)
+    # Threads stand in for the worker processes
+    pool._executor = ThreadPoolExecutor(max_workers)
+    return pool
+
+
+def test_only_pages_without_a_text_layer_are_ocrd(tmp_path):
+    calls = []
+
+    def ocr(path, page_index, dpi, timeout_s):
+        calls.append((page_index, timeout_s))
+        return f"ocr page {page_index}"
+
+    pool = _pool(ocr, page_timeout_s=12)
+    text = pool.ocr_document(_pdf(tmp_path, [TEXT, "", TEXT]))
+    assert text.count("Tableau") == 2
+    assert text.index("Tableau") < text.index("ocr page 1") < text.rindex("Tableau")
+    # The page timeout is handed to the worker, which kills tesseract there
+    assert calls == [(1, 12)]
+    stats = pool.stats()
+    assert stats["pages_text_layer"] == 2 and stats["pages_ocr"] == 1 and stats["queue_depth"] == 0
+
+
+def test_worker_side_timeout_counts_and_leaves_the_page_empty(tmp_path):
+    def ocr(path, page_index, dpi, timeout_s):
+        if page_index == 0:
+            raise OCRPageTimeout("Tesseract process timeout")
+        return "second"
+
+    pool = _pool(ocr)
+    assert pool.ocr_document(_pdf(tmp_path, ["", ""])) == "\nsecond"
+    assert pool.stats()["page_timeouts"] == 1
+
+
+def test_backstop_is_measured_from_submission_and_allows_for_queued_pages():
+    pool = OCRPool(max_workers=2, page_timeout_s=1.0, page_grace_s=0.5, available=True)
+    assert pool.page_deadline(100.0, 0) == pytest.approx(101.5)
+    assert pool.page_deadline(100.0, 1) == pytest.approx(101.5)
+    # Third page in line waits for a worker to finish one of the first two
+    assert pool.page_deadline(100.0, 2) == pytest.approx(103.0)
+
+
+def test_backstop_abandons_a_hung_page_without_holding_up_the_rest(tmp_path):
+    release = threading.Event()
+
+    def ocr(path, page_index, dpi, timeout_s):
+        if page_index == 0:
+            release.wait(5)  # ignores its timeout, like a wedged worker
+        return f"page {page_index}"
+
+    pool = _pool(ocr, page_timeout_s=0.1, page_grace_s=0.05)
+    started = time.monotonic()
+    text = pool.ocr_document(_pdf(tmp_path, ["", ""]))
+    release.set()
+    assert text == "\npage 1"
+    assert time.monotonic() - started < 1
+    assert pool.stats()["page_timeouts"] == 1
@@ -0,0 +1,56 @@
+import os
+import time
+
+from core.logic.resume_cache import ResumeCache
+
+PDF = b"%PDF-1.4 resume bytes"
+
+
+def test_entries_are_keyed_by_content_and_merged_field_by_field(tmp_path):
+    path = tmp_path / "cv.pdf"
+    path.write_bytes(PDF)
+    digest = ResumeCache.digest_bytes(PDF)
+    assert ResumeCache.digest_file(path, chunk_size=4) == digest
+
+    cache = ResumeCache()
+    assert cache.get(digest) is None
+    cache.update(digest, text="Python developer")
+    cache.update(digest, skills=["python"])
+    entry = cache.get(digest)
+    assert entry == {"text": "Python developer", "skills": ["python"]}
+    # Callers get copies
+    entry["skills"].append("sql")
+    assert cache.get(digest)["skills"] == ["python"]
+    assert cache.stats() == {"entries": 1, "hits": 2, "misses": 1, "hit_rate": 0.667}
+
+
+def test_memory_tier_is_lru():
+    cache = ResumeCache(max_entries=2)
+    cache.update("a" * 64, text="a")
+    cache.update("b" * 64, text="b")
+    cache.get("a" * 64)
+    cache.update("c" * 64, text="c")
+    assert cache.get("b" * 64) is None
+    assert cache.get("a" * 64) == {"text": "a"}
+
+
+def test_disk_tier_survives_a_restart(tmp_path):
+    digest = ResumeCache.digest_bytes(PDF)
+    ResumeCache(disk_dir=tmp_path).update(digest, ocr_text="scanned text")
+    assert ResumeCache(disk_dir=tmp_path).get(digest) == {"ocr_text": "scanned text"}
+
+
+def test_disk_tier_evicts_least_recently_used_files(tmp_path):
+    cache = ResumeCache(max_entries=1, disk_dir=tmp_path, max_disk_bytes=2500)
+    old, used, new = ("0" * 64, "1" * 64, "2" * 64)
+    cache.update(old, text="x" * 1000)
+    cache.update(used, text="y" * 1000)
+    # Backdate both, then read `used` so its mtime is touched
+    for digest in (old, used):
+        past = time.time() - 60
+        os.utime(cache._path(digest), (past, past))
+    assert ResumeCache(disk_dir=tmp_path).get(used) is not None
+
+    cache.update(new, text="z" * 1000)
+    assert not cache._path(old).exists()
+    assert cache._path(used).exists() and cache._path(new).exists()
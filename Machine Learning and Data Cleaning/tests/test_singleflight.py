@@ -0,0 +1,95 @@
+import threading
+import time
+
+import pytest
+
+from core.logic.singleflight import SingleFlight
+
+
+def _concurrently(n, fn):
+    out = [None] * n
+    barrier = threading.Barrier(n)
+
+    def call(i):
+        barrier.wait()
+        out[i] = fn()
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return out
+
+
+def test_concurrent_callers_share_one_execution():
+    sf = SingleFlight()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.1)
+        return {"value": 42}
+
+    results = _concurrently(5, lambda: sf.do(("bundle", "k"), compute))
+    assert len(calls) == 1
+    assert [shared for _, shared in results].count(False) == 1
+    assert all(value == {"value": 42} for value, _ in results)
+    # Waiters get private copies
+    assert len({id(value) for value, _ in results}) == 5
+    assert sf.stats()["bundle"] == {"executions": 1, "coalesced": 4, "in_flight": 0}
+
+
+def test_distinct_keys_do_not_coalesce():
+    sf = SingleFlight()
+    calls = []
+
+    def compute(key):
+        calls.append(key)
+        time.sleep(0.05)
+        return key
+
+    keys = iter([("bundle", "k", 1000), ("bundle", "k", 5000)])
+    lock = threading.Lock()
+
+    def call():
+        with lock:
+            key = next(keys)
+        return sf.do(key, lambda: compute(key))
+
+    results = _concurrently(2, call)
+    assert len(calls) == 2
+    assert not any(shared for _, shared in results)
+
+
+def test_leader_errors_reach_every_waiter_and_clear_the_key():
+    sf = SingleFlight()
+
+    def boom():
+        time.sleep(0.05)
+        raise RuntimeError("boom")
+
+    errors = []
+
+    def call():
+        try:
+            sf.do(("bundle", "err"), boom)
+        except RuntimeError as e:
+            errors.append(e)
+
+    _concurrently(3, call)
+    assert len(errors) == 3
+    assert sf.do(("bundle", "err"), lambda: "recovered") == ("recovered", False)
+
+
+def test_bundle_flights_are_keyed_by_deadline(engine, monkeypatch):
+    keys = []
+    real_do = engine.singleflight.do
+    monkeypatch.setattr(engine.singleflight, "do", lambda key, fn, **kw: keys.append(key) or real_do(key, fn, **kw))
+    av = {"extracted_intent_skills": ["Python"], "domain": "IT", "status_level": 2}
+    for deadline_ms in (60000, None):
+        engine.bundle_cache.invalidate(engine.bundle_cache.dataset_version)
+        engine.get_recommendations_from_assessment(dict(av), "Data Analyst", deadline_ms=deadline_ms)
+    bundle_keys = [k for k in keys if k[0] == "bundle"]
+    assert bundle_keys[0][1] == bundle_keys[1][1]
+    assert bundle_keys[0] != bundle_keys[1]
@@ -0,0 +1,55 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+import torch
+
+ml_root = Path(__file__).resolve().parent.parent
+sys.path.append(str(ml_root))
+
+from core.logic.skill_canonicalizer import SkillCanonicalizer
+
+
+class SlowModel:
+    """One-hot label embeddings; encoding is slow enough for threads to overlap."""
+
+    def __init__(self, labels):
+        self.labels = [l.lower() for l in labels]
+        self.calls = 0
+
+    def encode(self, texts, convert_to_tensor=True, show_progress_bar=False):
+        self.calls += 1
+        time.sleep(0.05)
+        out = torch.zeros(len(texts), len(self.labels))
+        for i, text in enumerate(texts):
+            for j, label in enumerate(self.labels):
+                if label in str(text).lower():
+                    out[i, j] = 1.0
+        return out + 1e-3
+
+
+LABELS = ["Python", "Machine Learning", "Project Management"]
+
+
+def test_label_embeddings_are_built_once_under_concurrency():
+    model = SlowModel(LABELS)
+    canon = SkillCanonicalizer(model, extra_labels=LABELS)
+    threads = [threading.Thread(target=canon._ensure_embeddings) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert model.calls == 1
+    assert canon.embeddings.shape == (len(LABELS), len(LABELS))
+
+
+def test_semantic_hits_are_cached_and_flushed(tmp_path):
+    model = SlowModel(LABELS)
+    canon = SkillCanonicalizer(model, extra_labels=LABELS, models_path=tmp_path, save_every=100)
+    assert canon.resolve("applied machine learning") == "skill:machine-learning"
+    assert canon.resolve("Python") == "skill:python"
+    canon.save()
+
+    reloaded = SkillCanonicalizer(SlowModel(LABELS), extra_labels=LABELS, models_path=tmp_path)
+    assert reloaded.cache["appliedmachinelearning"] == "skill:machine-learning"
@@ -0,0 +1,58 @@
+import pandas as pd
+
+from core.logic.transferability import RoleTransferabilityMatrix, normalize_role
+from tests.conftest import HashingEncoder
+
+JOBS = pd.DataFrame({
+    "title": ["Data Scientist", "Data Scientist (Remote)", "Data Analyst", "Backend Engineer", "Nurse"],
+    "extracted_skills": [
+        "python, machine learning, sql",
+        "python, statistics",
+        "sql, excel, statistics, python",
+        "python, django, sql, docker",
+        "patient care, triage",
+    ],
+})
+
+
+def _matrix(**kwargs):
+    return RoleTransferabilityMatrix.build(JOBS, HashingEncoder(), **kwargs)
+
+
+def test_roles_are_aggregated_on_the_normalized_title():
+    m = _matrix()
+    assert normalize_role("Data Scientist (Remote)") == "data scientist"
+    assert m.roles == ["backend engineer", "data analyst", "data scientist", "nurse"]
+    assert m.role_skills[m.role_index["data scientist"]] == ["machine learning", "python", "sql", "statistics"]
+
+
+def test_pair_scores_skill_overlap():
+    m = _matrix()
+    pair = m.pair("Data Scientist", "Data Analyst")
+    # {python, sql, statistics} shared out of 5 distinct skills
+    assert pair["jaccard"] == 0.6
+    assert pair["transferable_skills"] == ["python", "sql", "statistics"]
+    assert pair["missing_skills"] == ["excel"]
+    assert m.pair("Data Scientist", "Astronaut") is None
+
+
+def test_row_ranks_neighbours_and_keeps_top_k():
+    m = _matrix(top_k=2)
+    row = m.row("data scientist", top_n=5)
+    assert row[0]["title"] == "Data Analyst"
+    assert [r["score"] for r in row] == sorted((r["score"] for r in row), reverse=True)
+    assert all(len(m.jaccard.getrow(i).indices) <= 2 for i in range(len(m)))
+    # No skill in common: never a Jaccard neighbour
+    assert "Nurse" not in [r["title"] for r in m.row("Data Analyst") if r["jaccard"] > 0]
+
+
+def test_saved_matrix_is_reused_only_for_the_same_data_release(tmp_path):
+    m = _matrix()
+    path = m.save(tmp_path / "transferability.pkl")
+    loaded = RoleTransferabilityMatrix.load(path, expected_version=RoleTransferabilityMatrix.fingerprint(JOBS))
+    assert loaded is not None and loaded.roles == m.roles
+    assert loaded.pair("Data Scientist", "Data Analyst") == m.pair("Data Scientist", "Data Analyst")
+
+    changed = JOBS.assign(extracted_skills=JOBS["extracted_skills"].str.replace("sql", "postgres"))
+    assert RoleTransferabilityMatrix.load(path, expected_version=RoleTransferabilityMatrix.fingerprint(changed)) is None
+    assert RoleTransferabilityMatrix.load(tmp_path / "missing.pkl") is None
@@ -0,0 +1,44 @@
+import pytest
+import torch
+from sentence_transformers import util
+
+from core.logic.vector_shards import ShardedVectorIndex
+
+KEYS = [("IT", "beginner"), ("IT", "advanced"), ("Health", "beginner"), ("IT", "beginner"), ("Health", "advanced"), ("IT", "advanced")]
+
+
+@pytest.fixture
+def index():
+    torch.manual_seed(0)
+    embeddings = torch.nn.functional.normalize(torch.randn(len(KEYS), 16), dim=1)
+    return embeddings, ShardedVectorIndex(embeddings, KEYS)
+
+
+def test_rows_are_grouped_by_shard_key(index):
+    _, shards = index
+    assert len(shards) == len(KEYS)
+    assert shards.sizes() == {("IT", "beginner"): 2, ("IT", "advanced"): 2, ("Health", "beginner"): 1, ("Health", "advanced"): 1}
+    assert shards.select(lambda key: key[0] == "Health") == [("Health", "beginner"), ("Health", "advanced")]
+    assert sorted(shards.row_ids([("IT", "beginner"), ("missing", "x")]).tolist()) == [0, 3]
+
+
+def test_search_over_all_shards_matches_the_unsharded_search(index):
+    embeddings, shards = index
+    query = embeddings[2] + 0.1 * embeddings[5]
+    expected = util.semantic_search(query, embeddings, top_k=4)[0]
+    hits = shards.search(query, top_k=4)
+    assert [h["corpus_id"] for h in hits] == [h["corpus_id"] for h in expected]
+    assert [h["score"] for h in hits] == pytest.approx([h["score"] for h in expected])
+
+
+def test_search_only_returns_rows_of_the_selected_shards(index):
+    embeddings, shards = index
+    hits = shards.search(embeddings[2], top_k=10, min_score=-1.0, shard_keys=shards.select(lambda key: key[0] == "IT"))
+    assert sorted(h["corpus_id"] for h in hits) == [0, 1, 3, 5]
+    assert all(h["shard"][0] == "IT" for h in hits)
+    assert all(h["score"] >= 0.2 for h in shards.search(embeddings[2], top_k=10, min_score=0.2))
+
+
+def test_one_key_per_row_is_required():
+    with pytest.raises(ValueError):
+        ShardedVectorIndex(torch.zeros(3, 4), KEYS[:2])
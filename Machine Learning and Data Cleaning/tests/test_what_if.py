@@ -0,0 +1,65 @@
+import pytest
+
+from core.logic.bundle_state import diff_bundles
+
+ASSESSMENT = {
+    "extracted_intent_skills": ["Python", "SQL", "Excel"], "domain": "IT", "status_level": 2,
+    "experience_years": 3, "education_level": 4, "highest_education": "Bachelor",
+    "budget_category": "< 50k", "time_commitment": "5-10 hours", "education_preference": "None",
+}
+TARGET = "Data Scientist"
+
+
+def _clear_bundle_cache(engine):
+    engine.bundle_cache.invalidate(engine.bundle_cache.dataset_version)
+
+
+def _fresh(engine, assessment_vector, sections=None):
+    _clear_bundle_cache(engine)
+    return engine.get_recommendations_from_assessment(dict(assessment_vector), TARGET, sections=sections)
+
+
+@pytest.mark.parametrize("changes", [
+    {"time_commitment": "20+ hours"},
+    {"budget_category": "500k+"},
+    {"experience_years": 8},
+    {"education_preference": "MSc"},
+    {"status_level": 1},
+    {"extracted_intent_skills": ["Python", "Machine Learning"]},
+])
+def test_what_if_matches_a_fresh_run(engine, changes):
+    _clear_bundle_cache(engine)
+    engine.get_recommendations_from_assessment(dict(ASSESSMENT), TARGET, session_id="parity")
+    result = engine.what_if("parity", changes)
+    assert diff_bundles(_fresh(engine, {**ASSESSMENT, **changes}), result["bundle"]) == []
+
+
+def test_what_if_recomputes_only_dependent_sections(engine):
+    _clear_bundle_cache(engine)
+    engine.get_recommendations_from_assessment(dict(ASSESSMENT), TARGET, session_id="partial")
+    result = engine.what_if("partial", {"time_commitment": "20+ hours"})
+    assert set(result["recomputed_sections"]) == {"action_roadmap", "ml_diagnostics", "ai_explainability"}
+    assert "course_hits" in result["reused_sections"]
+
+
+def test_what_if_rejects_fields_the_assessment_does_not_carry(engine):
+    engine.get_recommendations_from_assessment(dict(ASSESSMENT), TARGET, session_id="fields")
+    with pytest.raises(ValueError):
+        engine.what_if("fields", {"max_budget": 1000})
+
+
+def test_stored_state_is_isolated_from_the_served_bundle(engine):
+    _clear_bundle_cache(engine)
+    served = engine.get_recommendations_from_assessment(dict(ASSESSMENT), TARGET, session_id="isolated")
+    # The bundle shares lists with the section results and the prelude context; callers may trim it
+    served["recommendations"].clear()
+    served["skill_gap"].clear()
+    result = engine.what_if("isolated", {"time_commitment": "20+ hours"})
+    assert "recommendations" not in result["changed_sections"]
+    assert "skill_gap" not in result["changed_sections"]
+    assert result["bundle"]["recommendations"] and result["bundle"]["skill_gap"]
+
+
+def test_what_if_without_a_prior_run(engine):
+    with pytest.raises(KeyError):
+        engine.what_if("nobody", {"time_commitment": "20+ hours"})
@@ -0,0 +1,98 @@
+"""
+Benchmark for skill extraction: the compiled SkillMatcher in main.py against
+the previous implementation (one word-boundary re.search per SKILL_CANONICAL
+alias). Both are run over the same corpus and must return identical skills
+for every document.
+
+    python bench_skills.py resumes/            # PDF / DOCX files, scanned recursively
+    python bench_skills.py --synthetic 500     # generated resumes when no corpus is at hand
+"""
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+from main import SKILL_CANONICAL, extract_docx, extract_pdf, extract_skills
+
+
+def legacy_extract_skills(text: str) -> list[str]:
+    """extract_skills as it was before SkillMatcher."""
+    lower = text.lower()
+    found_display: set[str] = set()
+    for pattern in sorted(SKILL_CANONICAL, key=len, reverse=True):
+        display = SKILL_CANONICAL[pattern]
+        if display in found_display:
+            continue
+        if re.search(r"\b" + re.escape(pattern) + r"\b", lower):
+            found_display.add(display)
+    return sorted(found_display)
+
+
+def load_corpus(directory: Path) -> list[str]:
+    texts = []
+    for path in sorted(directory.rglob("*")):
+        extract = {".pdf": extract_pdf, ".docx": extract_docx}.get(path.suffix.lower())
+        if extract is None:
+            continue
+        try:
+            texts.append(extract(str(path)))
+        except Exception as e:
+            print(f"[bench] Skipping {path.name}: {e}")
+    return [t for t in texts if t.strip()]
+
+
+def synthetic_corpus(n: int, seed: int = 7) -> list[str]:
+    rng = random.Random(seed)
+    aliases = list(SKILL_CANONICAL)
+    filler = ("developed", "maintained", "services", "team", "using", "with", "and", "projects",
+              "designed", "pipelines", "for", "clients", "university", "experience", "built")
+    texts = []
+    for _ in range(n):
+        words = [rng.choice(filler) for _ in range(rng.randint(300, 900))]
+        for _ in range(rng.randint(5, 30)):
+            words.insert(rng.randrange(len(words)), rng.choice(aliases).upper() if rng.random() < 0.3 else rng.choice(aliases))
+        texts.append(" ".join(words))
+    return texts
+
+
+def _time(fn, texts: list[str], repeat: int) -> tuple[float, list[list[str]]]:
+    best = float("inf")
+    results = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        results = [fn(t) for t in texts]
+        best = min(best, time.perf_counter() - started)
+    return best, results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark compiled vs per-alias skill extraction")
+    parser.add_argument("corpus", type=Path, nargs="?", help="Directory of PDF / DOCX resumes")
+    parser.add_argument("--synthetic", type=int, default=300, help="Generated resumes to use when no corpus is given")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per implementation; the fastest is reported")
+    args = parser.parse_args(argv)
+
+    texts = load_corpus(args.corpus) if args.corpus else synthetic_corpus(args.synthetic)
+    if not texts:
+        print("No resumes with extractable text found.")
+        return 1
+    chars = sum(len(t) for t in texts)
+    print(f"[bench] {len(texts)} resumes, {chars / len(texts):.0f} chars avg, {len(SKILL_CANONICAL)} aliases")
+
+    legacy_s, legacy = _time(legacy_extract_skills, texts, args.repeat)
+    compiled_s, compiled = _time(extract_skills, texts, args.repeat)
+
+    mismatches = [i for i, (a, b) in enumerate(zip(legacy, compiled)) if a != b]
+    for i in mismatches[:5]:
+        print(f"[bench] MISMATCH on resume {i}: legacy={legacy[i]} compiled={compiled[i]}")
+
+    print(f"[bench] per-alias search : {legacy_s * 1000:8.1f} ms  ({legacy_s / len(texts) * 1000:.2f} ms/resume)")
+    print(f"[bench] compiled matcher : {compiled_s * 1000:8.1f} ms  ({compiled_s / len(texts) * 1000:.2f} ms/resume)")
+    print(f"[bench] speedup {legacy_s / compiled_s:.1f}x, {len(texts) - len(mismatches)}/{len(texts)} identical")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
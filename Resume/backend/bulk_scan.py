@@ -0,0 +1,218 @@
+"""
+Bulk resume scanning for career-fair intake.
+
+Scans every PDF / DOCX in a directory tree or a .zip with the same pipeline as
+/scan (extract_pdf / extract_docx -> parse_resume, which runs detect_sections
+and extract_skills -> analyze_resume), fanned out over worker processes.
+Results go to a single columnar file: Parquet when pyarrow is installed,
+CSV otherwise. No per-resume outputs/*.txt reports are written.
+
+Progress is checkpointed in chunks next to the output file
+(<output>.progress/), so an interrupted run picks up where it stopped.
+
+    python bulk_scan.py resumes/ -o intake.parquet --workers 8
+    python bulk_scan.py intake.zip -o intake.csv
+"""
+import argparse
+import csv
+import io
+import os
+import shutil
+import sys
+import time
+import zipfile
+from multiprocessing import Pool
+from pathlib import Path
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+SUPPORTED = (".pdf", ".docx")
+ZIP_SEP = "::"
+LIST_SEP = "; "
+
+FIELDS = [
+    "source", "status", "error", "name", "email", "phone", "links", "sections", "skills",
+    "matched_skills", "missing_skills", "suggestions", "experience_entries", "education_entries",
+    "text_chars", "scan_ms",
+]
+
+
+def list_sources(input_path: Path) -> list[str]:
+    if zipfile.is_zipfile(input_path):
+        with zipfile.ZipFile(input_path) as zf:
+            members = [m for m in zf.namelist() if Path(m).suffix.lower() in SUPPORTED and not m.endswith("/")]
+        return [f"{input_path}{ZIP_SEP}{m}" for m in sorted(members)]
+    return sorted(str(p) for p in input_path.rglob("*") if p.is_file() and p.suffix.lower() in SUPPORTED)
+
+
+def _open_source(source: str):
+    """Path for plain files; an in-memory stream for zip members (both parsers accept either)."""
+    if ZIP_SEP in source:
+        archive, member = source.split(ZIP_SEP, 1)
+        with zipfile.ZipFile(archive) as zf:
+            return io.BytesIO(zf.read(member)), Path(member).suffix.lower()
+    return source, Path(source).suffix.lower()
+
+
+def scan_one(source: str) -> dict:
+    """Worker: one resume -> one output row. Never raises; failures become status=error rows."""
+    from main import analyze_resume, extract_docx, extract_pdf, parse_resume
+
+    started = time.perf_counter()
+    row = {field: "" for field in FIELDS}
+    row.update(source=source, experience_entries=0, education_entries=0, text_chars=0)
+    try:
+        handle, ext = _open_source(source)
+        raw = extract_pdf(handle) if ext == ".pdf" else extract_docx(handle)
+        row["text_chars"] = len(raw)
+        if not raw.strip():
+            row.update(status="empty", error="No extractable text (image-based or corrupted)")
+        else:
+            parsed = parse_resume(raw)
+            analysis = analyze_resume(parsed)
+            info = parsed["personal_info"]
+            row.update(
+                status="ok",
+                name=info["name"],
+                email=info["email"],
+                phone=info["phone"],
+                links=LIST_SEP.join(info["links"]),
+                sections=LIST_SEP.join(k for k, v in parsed.items() if k != "personal_info" and v),
+                skills=LIST_SEP.join(parsed["skills"]),
+                matched_skills=LIST_SEP.join(analysis["matched_skills"]),
+                missing_skills=LIST_SEP.join(analysis["missing_skills"]),
+                suggestions=LIST_SEP.join(analysis["suggestions"]),
+                experience_entries=len(parsed["experience"]),
+                education_entries=len(parsed["education"]),
+            )
+    except Exception as e:
+        row.update(status="error", error=f"{type(e).__name__}: {e}")
+    row["scan_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return row
+
+
+# ── Checkpointed output ──────────────────────────────────────────────
+
+def _write_part(rows: list[dict], path: Path, fmt: str):
+    tmp = path.with_name(path.name + ".tmp")
+    if fmt == "parquet":
+        pq.write_table(pa.Table.from_pylist(rows), tmp)
+    else:
+        with open(tmp, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+    os.replace(tmp, path)
+
+
+def _scanned_sources(parts: list[Path], fmt: str) -> set[str]:
+    """Sources already in checkpoint parts; parts are written atomically, so they are the progress record."""
+    done = set()
+    for part in parts:
+        if fmt == "parquet":
+            done.update(pq.read_table(part, columns=["source"]).column("source").to_pylist())
+        else:
+            with open(part, newline="", encoding="utf-8") as f:
+                done.update(row["source"] for row in csv.DictReader(f))
+    return done
+
+
+def _merge_parts(parts: list[Path], output: Path, fmt: str):
+    tmp = output.with_name(output.name + ".tmp")
+    if fmt == "parquet":
+        writer = None
+        for part in parts:
+            table = pq.read_table(part)
+            if writer is None:
+                writer = pq.ParquetWriter(tmp, table.schema)
+            writer.write_table(table.cast(writer.schema))
+        if writer is None:
+            pq.write_table(pa.Table.from_pylist([], schema=pa.schema([(f, pa.string()) for f in FIELDS])), tmp)
+        else:
+            writer.close()
+    else:
+        with open(tmp, "w", newline="", encoding="utf-8") as out:
+            out.write(",".join(FIELDS) + "\n")
+            for part in parts:
+                with open(part, encoding="utf-8") as f:
+                    next(f)
+                    shutil.copyfileobj(f, out)
+    os.replace(tmp, output)
+
+
+def run(input_path: Path, output: Path, workers: int, chunk_size: int, restart: bool, keep_progress: bool) -> int:
+    fmt = "parquet" if output.suffix.lower() == ".parquet" else "csv"
+    if fmt == "parquet" and not HAS_PYARROW:
+        print("pyarrow is not installed; use a .csv output or `pip install pyarrow`.")
+        return 2
+
+    progress_dir = output.with_name(output.name + ".progress")
+    if restart and progress_dir.exists():
+        shutil.rmtree(progress_dir)
+    progress_dir.mkdir(parents=True, exist_ok=True)
+    done = _scanned_sources(sorted(progress_dir.glob(f"part-*.{fmt}")), fmt)
+
+    sources = list_sources(input_path)
+    pending = [s for s in sources if s not in done]
+    print(f"[bulk_scan] {len(sources)} resumes, {len(sources) - len(pending)} already scanned, "
+          f"{len(pending)} to go on {workers} workers")
+
+    part_index = max((int(p.stem.split("-")[1]) + 1 for p in progress_dir.glob(f"part-*.{fmt}")), default=0)
+    started = time.perf_counter()
+    scanned = errors = 0
+    buffer: list[dict] = []
+
+    def flush():
+        nonlocal part_index
+        if not buffer:
+            return
+        _write_part(buffer, progress_dir / f"part-{part_index:05d}.{fmt}", fmt)
+        part_index += 1
+        buffer.clear()
+
+    with Pool(processes=workers) as pool:
+        for row in pool.imap_unordered(scan_one, pending, chunksize=4):
+            buffer.append(row)
+            scanned += 1
+            errors += row["status"] != "ok"
+            if len(buffer) >= chunk_size:
+                flush()
+                elapsed = time.perf_counter() - started
+                rate = scanned / elapsed
+                eta = (len(pending) - scanned) / rate if rate else 0
+                print(f"[bulk_scan] {scanned}/{len(pending)}  {rate:.1f} resumes/s  "
+                      f"{errors} failed  ETA {eta:.0f}s")
+        flush()
+
+    _merge_parts(sorted(progress_dir.glob(f"part-*.{fmt}")), output, fmt)
+    elapsed = time.perf_counter() - started
+    print(f"[bulk_scan] Scanned {scanned} resumes in {elapsed:.1f}s "
+          f"({scanned / elapsed if elapsed else 0:.1f}/s, {errors} failed/empty) -> {output}")
+    if not keep_progress:
+        shutil.rmtree(progress_dir)
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk resume scanner (directory or .zip of PDF/DOCX files)")
+    parser.add_argument("input", type=Path, help="Directory (scanned recursively) or .zip archive")
+    parser.add_argument("-o", "--output", type=Path, default=Path("bulk_scan.parquet" if HAS_PYARROW else "bulk_scan.csv"),
+                        help="Output file; .parquet (needs pyarrow) or .csv")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--chunk-size", type=int, default=200, help="Resumes per checkpoint")
+    parser.add_argument("--restart", action="store_true", help="Ignore the progress of a previous interrupted run")
+    parser.add_argument("--keep-progress", action="store_true", help="Keep checkpoint parts after merging")
+    args = parser.parse_args(argv)
+
+    if not args.input.exists():
+        parser.error(f"{args.input} does not exist")
+    return run(args.input, args.output, max(1, args.workers), max(1, args.chunk_size), args.restart, args.keep_progress)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,7 @@
 from fastapi import FastAPI, UploadFile, File, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse
-import os, re, tempfile, shutil
+import os, re, tempfile
 from pathlib import Path
 
 import pdfplumber
@@ -17,12 +17,15 @@ app.add_middleware(
 )
 
 OUTPUT_DIR = Path("./outputs")
+MAX_UPLOAD_BYTES = int(float(os.getenv("MAX_UPLOAD_MB", "10")) * 1024 * 1024)
+# Uploads up to this size stay in memory; larger ones spill to a temp file
+SPOOL_BYTES = 4 * 1024 * 1024
 OUTPUT_DIR.mkdir(exist_ok=True)
 
 
 # Extracting Text
 
-def extract_pdf(path: str) -> str:
+def extract_pdf(path) -> str:
     text = ""
     with pdfplumber.open(path) as pdf:
         for page in pdf.pages:
@@ -32,7 +35,7 @@ def extract_pdf(path: str) -> str:
     return text.strip()
 
 
-def extract_docx(path: str) -> str:
+def extract_docx(path) -> str:
     doc = Document(path)
     lines = [p.text.strip() for p in doc.paragraphs if p.text.strip()]
     for table in doc.tables:
@@ -198,22 +201,77 @@ def extract_name(lines: list[str]) -> str:
 
 # Skill Extraction & Normalization
 
+class SkillMatcher:
+    """
+    All SKILL_CANONICAL aliases compiled once into a single trie-shaped regex, so the text
+    is scanned in one pass instead of once per alias. The scan is a zero-width lookahead,
+    so it tries every position like the per-alias searches did; at each position it takes
+    the longest alias, and the aliases contained in that one (e.g. "react" in
+    "react native") are credited through a precomputed table. Results are identical to
+    searching each alias separately with word boundaries.
+    """
+
+    def __init__(self, canonical: dict[str, str]):
+        self.canonical = canonical
+        self.pattern = re.compile(r"(?=\b(" + self._trie(canonical) + r")\b)")
+        # alias -> display names of every alias that also matches wherever it matches
+        self.implied: dict[str, frozenset[str]] = {
+            alias: frozenset(display for other, display in canonical.items() if self._contains(alias, other))
+            for alias in canonical
+        }
+
+    @staticmethod
+    def _contains(outer: str, inner: str) -> bool:
+        """Whether \\b inner \\b matches inside a \\b outer \\b match, whatever surrounds it."""
+        # Pad outer so its own edges are word boundaries, as they are wherever it matched
+        padded = ("_" if not re.match(r"\w", outer[0]) else " ") + outer + ("_" if not re.match(r"\w", outer[-1]) else " ")
+
+        def boundary(i: int) -> bool:
+            return bool(re.match(r"\w", padded[i - 1])) != bool(re.match(r"\w", padded[i]))
+
+        return any(
+            padded.startswith(inner, i) and boundary(i) and boundary(i + len(inner))
+            for i in range(1, len(outer) - len(inner) + 2)
+        )
+
+    @staticmethod
+    def _trie(words) -> str:
+        trie: dict = {}
+        for word in words:
+            node = trie
+            for ch in word:
+                node = node.setdefault(ch, {})
+            node[""] = {}
+
+        def build(node: dict) -> str:
+            alternatives = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+            if not alternatives:
+                return ""
+            body = alternatives[0] if len(alternatives) == 1 else "(?:" + "|".join(alternatives) + ")"
+            # Optional continuation: greedy, so the longest alias wins and backtracking finds shorter ones
+            return "(?:" + body + ")?" if "" in node else body
+
+        return build(trie)
+
+    def match(self, lower: str) -> set[str]:
+        found: set[str] = set()
+        seen: set[str] = set()
+        for m in self.pattern.finditer(lower):
+            alias = m.group(1)
+            if alias not in seen:
+                seen.add(alias)
+                found |= self.implied[alias]
+        return found
+
+
+SKILL_MATCHER = SkillMatcher(SKILL_CANONICAL)
+
+
 def extract_skills(text: str) -> list[str]:
 
     # Matching skills from SKILL_CANONICAL against the text. Returns deduplicated, display-name list.
     
-    lower = text.lower()
-    found_display: set[str] = set()
-
-    # Sort patterns longest-first to give multi-word patterns priority
-    for pattern in sorted(SKILL_CANONICAL, key=len, reverse=True):
-        display = SKILL_CANONICAL[pattern]
-        if display in found_display:
-            continue 
-        if re.search(r"\b" + re.escape(pattern) + r"\b", lower):
-            found_display.add(display)
-
-    return sorted(found_display)
+    return sorted(SKILL_MATCHER.match(text.lower()))
 
 
 def rank_skills(skills: list[str]) -> list[str]:
@@ -522,6 +580,26 @@ def format_txt(data: dict, analysis: dict, filename: str) -> str:
 
 # API Endpoints
 
+async def read_upload(file: UploadFile) -> tempfile.SpooledTemporaryFile:
+
+    # Streaming the upload into a memory buffer, enforcing the size limit while reading.
+    # Both pdfplumber and python-docx read straight from the returned stream.
+
+    buffer = tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES)
+    size = 0
+    while chunk := await file.read(64 * 1024):
+        size += len(chunk)
+        if size > MAX_UPLOAD_BYTES:
+            buffer.close()
+            raise HTTPException(
+                status_code=413,
+                detail=f"File too large. Maximum size is {MAX_UPLOAD_BYTES // (1024 * 1024)}MB.",
+            )
+        buffer.write(chunk)
+    buffer.seek(0)
+    return buffer
+
+
 @app.post("/scan")
 async def scan_resume(file: UploadFile = File(...)):
     filename = file.filename or "resume"
@@ -533,16 +611,13 @@ async def scan_resume(file: UploadFile = File(...)):
             detail="Unsupported file type. Please upload a PDF or DOCX file.",
         )
 
-    with tempfile.NamedTemporaryFile(delete=False, suffix=ext) as tmp:
-        shutil.copyfileobj(file.file, tmp)
-        tmp_path = tmp.name
-
+    stream = await read_upload(file)
     try:
-        raw = extract_pdf(tmp_path) if ext == ".pdf" else extract_docx(tmp_path)
+        raw = extract_pdf(stream) if ext == ".pdf" else extract_docx(stream)
     except Exception as e:
         raise HTTPException(status_code=422, detail=f"Failed to read file: {str(e)}")
     finally:
-        os.unlink(tmp_path)
+        stream.close()
 
     if not raw.strip():
         raise HTTPException(
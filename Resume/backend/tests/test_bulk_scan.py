@@ -0,0 +1,124 @@
+import csv
+import sys
+import zipfile
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import bulk_scan
+
+
+class InlinePool:
+    """multiprocessing.Pool stand-in that scans in the test process."""
+
+    def __init__(self, processes=None):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def imap_unordered(self, fn, items, chunksize=1):
+        return (fn(item) for item in items)
+
+
+@pytest.fixture
+def scans(monkeypatch):
+    """Fake scan_one: records the sources it is given; raises KeyboardInterrupt on the source in `interrupt`."""
+    state = {"seen": [], "interrupt": None}
+
+    def scan_one(source):
+        if source == state["interrupt"]:
+            raise KeyboardInterrupt
+        state["seen"].append(source)
+        row = {field: "" for field in bulk_scan.FIELDS}
+        row.update(source=source, status="ok", name=Path(source).stem, experience_entries=0, education_entries=0,
+                   text_chars=10, scan_ms=1.0)
+        return row
+
+    monkeypatch.setattr(bulk_scan, "Pool", InlinePool)
+    monkeypatch.setattr(bulk_scan, "scan_one", scan_one)
+    return state
+
+
+def _resumes(tmp_path, n):
+    folder = tmp_path / "resumes"
+    (folder / "nested").mkdir(parents=True)
+    for i in range(n):
+        (folder / ("nested" if i % 2 else "") / f"cv{i:02d}.pdf").write_bytes(b"%PDF")
+    (folder / "notes.txt").write_text("not a resume")
+    return folder
+
+
+def _read_csv(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def test_sources_come_from_a_directory_tree_or_a_zip(tmp_path):
+    folder = _resumes(tmp_path, 3)
+    assert [Path(s).name for s in bulk_scan.list_sources(folder)] == ["cv00.pdf", "cv02.pdf", "cv01.pdf"]
+
+    archive = tmp_path / "intake.zip"
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("a/cv.docx", b"docx bytes")
+        zf.writestr("readme.md", b"skip")
+    sources = bulk_scan.list_sources(archive)
+    assert sources == [f"{archive}{bulk_scan.ZIP_SEP}a/cv.docx"]
+    handle, ext = bulk_scan._open_source(sources[0])
+    assert ext == ".docx" and handle.read() == b"docx bytes"
+
+
+def test_interrupted_run_resumes_without_rescanning(tmp_path, scans):
+    folder = _resumes(tmp_path, 7)
+    output = tmp_path / "intake.csv"
+    sources = bulk_scan.list_sources(folder)
+
+    scans["interrupt"] = sources[5]
+    with pytest.raises(KeyboardInterrupt):
+        bulk_scan.run(folder, output, workers=1, chunk_size=2, restart=False, keep_progress=False)
+    # Two full checkpoint parts survived; the fifth row was still buffered
+    assert len(list(output.with_name("intake.csv.progress").glob("part-*.csv"))) == 2
+    assert not output.exists()
+
+    scans["interrupt"], scans["seen"] = None, []
+    assert bulk_scan.run(folder, output, workers=1, chunk_size=2, restart=False, keep_progress=False) == 0
+    assert scans["seen"] == sources[4:]
+    rows = _read_csv(output)
+    assert sorted(r["source"] for r in rows) == sorted(sources)
+    assert list(rows[0]) == bulk_scan.FIELDS
+    assert not output.with_name("intake.csv.progress").exists()
+
+
+def test_restart_discards_previous_progress(tmp_path, scans):
+    folder = _resumes(tmp_path, 3)
+    output = tmp_path / "intake.csv"
+    bulk_scan.run(folder, output, workers=1, chunk_size=2, restart=False, keep_progress=True)
+    scans["seen"] = []
+    bulk_scan.run(folder, output, workers=1, chunk_size=2, restart=True, keep_progress=False)
+    assert len(scans["seen"]) == 3
+    assert len(_read_csv(output)) == 3
+
+
+def test_parquet_parts_are_merged_into_one_table(tmp_path, scans):
+    pq = pytest.importorskip("pyarrow.parquet")
+    folder = _resumes(tmp_path, 5)
+    output = tmp_path / "intake.parquet"
+    assert bulk_scan.run(folder, output, workers=1, chunk_size=2, restart=False, keep_progress=False) == 0
+    table = pq.read_table(output)
+    assert table.num_rows == 5
+    assert sorted(table.column("source").to_pylist()) == sorted(bulk_scan.list_sources(folder))
+
+
+def test_scan_one_turns_failures_into_rows(tmp_path):
+    pytest.importorskip("pdfplumber")
+    broken = tmp_path / "broken.pdf"
+    broken.write_bytes(b"not a pdf")
+    row = bulk_scan.scan_one(str(broken))
+    assert row["source"] == str(broken)
+    assert row["status"] in ("error", "empty") and row["error"]
+    assert set(row) == set(bulk_scan.FIELDS)
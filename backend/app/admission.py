@@ -0,0 +1,184 @@
+"""
+Admission control for the CPU-heavy endpoints.
+
+Each endpoint class (assessment bundles, what-if edits, resume parsing,
+/api/recommend) gets its own concurrency pool with a bounded wait queue, so they
+stop competing without limit for the same cores and SentenceTransformer. Pools
+match exact method + path pairs, so only the routes doing the heavy work are
+admitted through them; cheap neighbours (batch submission, batch / job status
+polling) never queue behind, or get rejected by, a full pool.
+
+A request that finds the queue full is rejected at once with 429; one that
+waits longer than the queue timeout gets 503. Both carry Retry-After. Admitted
+responses report their queue wait in an X-Queue-Wait-Ms header.
+
+Implemented as pure ASGI middleware: the slot is held until the response body
+has been fully sent, which also covers StreamingResponse (SSE) endpoints.
+"""
+import asyncio
+import json
+import math
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class AdmissionPool:
+    """Concurrency limit + bounded wait queue for one endpoint class."""
+
+    def __init__(self, name: str, routes: List[Tuple[str, str]], max_concurrent: int, max_queue: int, queue_timeout: float):
+        self.name = name
+        self.routes = {(method.upper(), path.rstrip("/")) for method, path in routes}
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.in_flight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+        self.total_service_ms = 0.0
+        self.completed = 0
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        # Created lazily so it binds to the server's running event loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        return self._semaphore
+
+    def matches(self, method: str, path: str) -> bool:
+        return (method.upper(), path.rstrip("/")) in self.routes
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely free: average service time x queue depth / pool size."""
+        avg_service_s = (self.total_service_ms / self.completed / 1000) if self.completed else 2.0
+        return max(1, min(60, math.ceil(avg_service_s * (self.waiting + 1) / self.max_concurrent)))
+
+    async def acquire(self) -> Tuple[Optional[int], float]:
+        """Returns (rejection status or None, wait_ms)."""
+        # Counters change synchronously (no await in between), so this check is exact even in a burst
+        if self.in_flight + self.waiting >= self.max_concurrent + self.max_queue:
+            self.rejected_queue_full += 1
+            return 429, 0.0
+
+        started = time.perf_counter()
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self.semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected_timeout += 1
+            return 503, (time.perf_counter() - started) * 1000
+        finally:
+            self.waiting -= 1
+
+        wait_ms = (time.perf_counter() - started) * 1000
+        self.in_flight += 1
+        self.admitted += 1
+        self.total_wait_ms += wait_ms
+        self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+        return None, wait_ms
+
+    def release(self, service_ms: float):
+        self.in_flight -= 1
+        self.completed += 1
+        self.total_service_ms += service_ms
+        self.semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_timeout": self.rejected_timeout,
+            "avg_wait_ms": round(self.total_wait_ms / self.admitted, 1) if self.admitted else 0.0,
+            "max_wait_ms": round(self.max_wait_ms, 1),
+            "avg_service_ms": round(self.total_service_ms / self.completed, 1) if self.completed else 0.0,
+        }
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, str(default)))
+
+
+def default_pools() -> List[AdmissionPool]:
+    """Endpoint classes; sizes are overridable via ADMISSION_<CLASS>_CONCURRENCY / _QUEUE."""
+    timeout = float(os.getenv("ADMISSION_QUEUE_TIMEOUT_S", "10"))
+    return [
+        AdmissionPool("assessment", [("POST", "/api/skill-assessment"), ("POST", "/api/skill-assessment/stream")],
+                      _env_int("ADMISSION_ASSESSMENT_CONCURRENCY", 4), _env_int("ADMISSION_ASSESSMENT_QUEUE", 16), timeout),
+        # Mostly incremental, but an edit to a prelude field is a full recompute
+        AdmissionPool("what_if", [("POST", "/api/skill-assessment/what-if")],
+                      _env_int("ADMISSION_WHAT_IF_CONCURRENCY", 4), _env_int("ADMISSION_WHAT_IF_QUEUE", 16), timeout),
+        AdmissionPool("resume", [("POST", "/api/resume/upload"), ("POST", "/api/resume-scan"), ("POST", "/api/resume/ats-match")],
+                      _env_int("ADMISSION_RESUME_CONCURRENCY", 2), _env_int("ADMISSION_RESUME_QUEUE", 8), timeout),
+        AdmissionPool("recommend", [("POST", "/api/recommend")],
+                      _env_int("ADMISSION_RECOMMEND_CONCURRENCY", 4), _env_int("ADMISSION_RECOMMEND_QUEUE", 16), timeout),
+    ]
+
+
+class AdmissionController:
+    def __init__(self, pools: Optional[List[AdmissionPool]] = None):
+        self.pools = pools if pools is not None else default_pools()
+
+    def pool_for(self, method: str, path: str) -> Optional[AdmissionPool]:
+        for pool in self.pools:
+            if pool.matches(method, path):
+                return pool
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        return {pool.name: pool.stats() for pool in self.pools}
+
+
+class AdmissionMiddleware:
+    """ASGI middleware applying an AdmissionController to matching HTTP requests."""
+
+    def __init__(self, app, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        pool = self.controller.pool_for(scope.get("method", ""), scope.get("path", "")) if scope["type"] == "http" else None
+        if pool is None:
+            await self.app(scope, receive, send)
+            return
+
+        status, wait_ms = await pool.acquire()
+        if status is not None:
+            await self._reject(send, pool, status)
+            return
+
+        async def send_with_wait(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-queue-wait-ms", f"{wait_ms:.1f}".encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_wait)
+        finally:
+            pool.release((time.perf_counter() - started) * 1000)
+
+    async def _reject(self, send, pool: AdmissionPool, status: int):
+        reason = "queue full" if status == 429 else "timed out waiting for capacity"
+        retry_after = pool.retry_after()
+        body = json.dumps({"detail": f"Server busy ({pool.name}: {reason}). Retry after {retry_after}s."}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -28,12 +28,30 @@ COURSES_CSV = os.path.join(ML_ROOT, "processed", "all_courses_master.csv")
 
 from fastapi.middleware.cors import CORSMiddleware
 from app.routers.users import router as auth_router
+from app.admission import AdmissionController, AdmissionMiddleware
+from app.uploads import UploadLimitMiddleware
+from app.serialization import FastJSONResponse
+from app import mongo
+from starlette.middleware.gzip import GZipMiddleware
+
+try:
+    from brotli_asgi import BrotliMiddleware
+    HAS_BROTLI = True
+except ImportError:
+    HAS_BROTLI = False
 
 app = FastAPI(
     title="SDGP Career & Course Recommendation API",
     version="0.3.0",
+    default_response_class=FastJSONResponse,
 )
 
+# Admission control for the heavy endpoints (registered before CORS so rejections still carry CORS headers)
+admission = AdmissionController()
+app.add_middleware(AdmissionMiddleware, controller=admission)
+# Oversized uploads are cut off while they are received, before they queue for a slot
+app.add_middleware(UploadLimitMiddleware)
+
 # ✅ SINGLE CORS CONFIG
 app.add_middleware(
     CORSMiddleware,
@@ -48,6 +66,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large bundle responses (brotli when available, gzip otherwise); SSE streams are left alone
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+if HAS_BROTLI:
+    app.add_middleware(
+        BrotliMiddleware, minimum_size=COMPRESSION_MIN_BYTES, gzip_fallback=True,
+        excluded_handlers=[r"/api/skill-assessment/stream"],
+    )
+else:
+    app.add_middleware(GZipMiddleware, minimum_size=COMPRESSION_MIN_BYTES)
+
 # --- Load engine ---
 try:
     print("Initializing PyTorch engine from MongoDB...")
@@ -61,8 +89,33 @@ except Exception as e:
 @app.get("/status")
 def status():
     if engine is None:
-        return {"engine_loaded": False, "error": startup_error}
-    return {"engine_loaded": True}
+        return {"engine_loaded": False, "error": startup_error, "admission": admission.stats(), "mongo": mongo.stats()}
+    return {
+        "engine_loaded": True,
+        "bundle_cache": engine.bundle_cache.stats(),
+        "section_degradation": engine.degradation_stats,
+        "bundle_executor": engine.bundle_executor.stats(),
+        "singleflight": engine.singleflight.stats(),
+        "resume_cache": engine.resume_cache.stats(),
+        "ocr_pool": engine.ocr_pool.stats(),
+        "admission": admission.stats(),
+        "resume_jobs": _resume_job_stats(),
+        "mongo": mongo.stats(),
+        "chat_cache": _chat_cache_stats(),
+    }
+
+def _resume_job_stats():
+    # Imported lazily: the resume router imports this module
+    from app.routers.resume_api import RESUME_JOBS
+    return RESUME_JOBS.stats()
+
+def _chat_cache_stats():
+    from app.routers.chatbot import chat_service
+    return chat_service.cache.stats() if chat_service is not None and chat_service.cache is not None else None
+
+@app.on_event("shutdown")
+async def close_mongo():
+    await mongo.close()
 
 @app.get("/api/market-trends")
 def get_market_trends(domain: str = None):
@@ -0,0 +1,168 @@
+"""
+Shared MongoDB access.
+
+One pooled client per process instead of a MongoClient per router (or per
+request). Sync routes and services use `get_db()`; async routes use
+`get_async_db()`, which is non-blocking so a slow query no longer stalls the
+event loop for every WebSocket and chat request.
+
+The async client is pymongo's native AsyncMongoClient (pymongo >= 4.13),
+falling back to motor when only that is installed. Both clients share the
+pool settings below and report every command to a listener that keeps
+per-collection latency, exposed on /status.
+
+    MONGO_MAX_POOL_SIZE (50)   MONGO_MIN_POOL_SIZE (0)
+    MONGO_SERVER_SELECTION_TIMEOUT_MS (5000)   MONGO_CONNECT_TIMEOUT_MS (5000)
+    MONGO_SOCKET_TIMEOUT_MS (unset = none)     MONGO_MAX_IDLE_TIME_MS (unset = none)
+"""
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+from pymongo import MongoClient, monitoring
+
+try:
+    from pymongo import AsyncMongoClient
+    HAS_ASYNC_MONGO = True
+except ImportError:
+    try:
+        from motor.motor_asyncio import AsyncIOMotorClient as AsyncMongoClient
+        HAS_ASYNC_MONGO = True
+    except ImportError:
+        HAS_ASYNC_MONGO = False
+
+DEFAULT_URI = "mongodb://localhost:27017"
+DEFAULT_DATABASE = "pathfinder_plus"
+
+
+def _env_int(name: str, default: Optional[int]) -> Optional[int]:
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+
+def client_options() -> Dict[str, Any]:
+    options = {
+        "maxPoolSize": _env_int("MONGO_MAX_POOL_SIZE", 50),
+        "minPoolSize": _env_int("MONGO_MIN_POOL_SIZE", 0),
+        "serverSelectionTimeoutMS": _env_int("MONGO_SERVER_SELECTION_TIMEOUT_MS", 5000),
+        "connectTimeoutMS": _env_int("MONGO_CONNECT_TIMEOUT_MS", 5000),
+        "socketTimeoutMS": _env_int("MONGO_SOCKET_TIMEOUT_MS", None),
+        "maxIdleTimeMS": _env_int("MONGO_MAX_IDLE_TIME_MS", None),
+    }
+    return {k: v for k, v in options.items() if v is not None}
+
+
+class QueryMetrics(monitoring.CommandListener):
+    """Per-collection command latency: count, failures, mean / p95 / max over a recent window."""
+
+    WINDOW = 512
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inflight: Dict[Any, str] = {}
+        self._stats: Dict[str, Dict[str, Any]] = {}
+
+    @staticmethod
+    def _collection(event) -> str:
+        target = event.command.get(event.command_name)
+        # find / insert / aggregate / ... name their collection; getMore names it separately
+        if event.command_name == "getMore":
+            target = event.command.get("collection")
+        return f"{event.database_name}.{target}" if isinstance(target, str) else f"{event.database_name}.$cmd"
+
+    def started(self, event):
+        with self._lock:
+            self._inflight[(event.connection_id, event.request_id)] = self._collection(event)
+
+    def _record(self, event, failed: bool):
+        with self._lock:
+            name = self._inflight.pop((event.connection_id, event.request_id), None)
+            if name is None:
+                return
+            ms = event.duration_micros / 1000
+            stats = self._stats.setdefault(name, {"count": 0, "failures": 0, "total_ms": 0.0, "max_ms": 0.0,
+                                                  "recent": deque(maxlen=self.WINDOW)})
+            stats["count"] += 1
+            stats["failures"] += failed
+            stats["total_ms"] += ms
+            stats["max_ms"] = max(stats["max_ms"], ms)
+            stats["recent"].append(ms)
+
+    def succeeded(self, event):
+        self._record(event, failed=False)
+
+    def failed(self, event):
+        self._record(event, failed=True)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            out = {}
+            for name, stats in sorted(self._stats.items()):
+                recent = sorted(stats["recent"])
+                out[name] = {
+                    "count": stats["count"],
+                    "failures": stats["failures"],
+                    "avg_ms": round(stats["total_ms"] / stats["count"], 2),
+                    "p95_ms": round(recent[min(len(recent) - 1, int(len(recent) * 0.95))], 2),
+                    "max_ms": round(stats["max_ms"], 2),
+                }
+            return out
+
+
+METRICS = QueryMetrics()
+
+_lock = threading.Lock()
+_clients: Dict[str, Any] = {}
+_pid = os.getpid()
+
+
+def _client(kind: str):
+    global _pid
+    with _lock:
+        # Pools must not cross a fork (e.g. pre-forked server workers)
+        if os.getpid() != _pid:
+            _clients.clear()
+            _pid = os.getpid()
+        if kind not in _clients:
+            cls = MongoClient if kind == "sync" else AsyncMongoClient
+            _clients[kind] = cls(os.getenv("MONGO_URI", DEFAULT_URI), event_listeners=[METRICS], **client_options())
+        return _clients[kind]
+
+
+def get_client() -> MongoClient:
+    return _client("sync")
+
+
+def get_db(name: Optional[str] = None):
+    return get_client()[name or os.getenv("DATABASE_NAME", DEFAULT_DATABASE)]
+
+
+def get_async_client():
+    if not HAS_ASYNC_MONGO:
+        raise RuntimeError("No async MongoDB driver available (pymongo >= 4.13 or motor)")
+    return _client("async")
+
+
+def get_async_db(name: Optional[str] = None):
+    return get_async_client()[name or os.getenv("DATABASE_NAME", DEFAULT_DATABASE)]
+
+
+def stats() -> Dict[str, Any]:
+    return {
+        "clients": sorted(_clients),
+        "async_driver": AsyncMongoClient.__module__.split(".")[0] if HAS_ASYNC_MONGO else None,
+        "pool": client_options(),
+        "collections": METRICS.snapshot(),
+    }
+
+
+async def close():
+    with _lock:
+        clients = dict(_clients)
+        _clients.clear()
+    for kind, client in clients.items():
+        result = client.close()
+        if kind == "async" and hasattr(result, "__await__"):
+            await result
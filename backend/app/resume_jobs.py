@@ -0,0 +1,281 @@
+"""
+Background job queue for resume processing.
+
+/resume/upload-async stores the upload and returns a job id at once; a small
+in-process worker pool runs the parse → OCR → extraction → profiling pipeline
+and records per-stage status in a SQLite job table, which clients poll via
+/resume/jobs/{id}. The table survives restarts: jobs that were queued or
+running when the process died are re-queued on startup while their upload is
+still on disk.
+
+A claimed job records its owner (host:pid) and a lease that a heartbeat thread
+keeps extending while the job runs, so recovery only takes over jobs whose
+owner stopped renewing them, never ones still running in another process.
+Every claim counts as an attempt, so a job that keeps killing its worker is
+failed after max_attempts instead of being re-queued forever.
+
+Failed jobs are retried up to max_attempts. The job timeout is cooperative:
+it is checked between stages (and between OCR pages), since a thread cannot be
+interrupted mid-call; a timed-out job is not retried.
+"""
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+from .serialization import dumps_text
+from .uploads import BufferedUpload
+
+STAGES = ("parse", "ocr", "extraction", "profiling")
+TERMINAL_STATUSES = ("completed", "failed", "timed_out")
+
+
+class JobTimeout(Exception):
+    pass
+
+
+class JobContext:
+    """Per-run stage tracker handed to the job handler. Without a queue it only enforces the deadline."""
+
+    def __init__(self, timeout_s: Optional[float] = None, on_update: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.deadline = time.monotonic() + timeout_s if timeout_s else None
+        self.on_update = on_update
+        self.stages: Dict[str, Dict[str, Any]] = {name: {"status": "pending"} for name in STAGES}
+
+    def check_deadline(self):
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise JobTimeout("Resume job exceeded its time limit")
+
+    def _update(self, name: str, **fields):
+        self.stages[name] = {**self.stages.get(name, {}), **fields}
+        if self.on_update:
+            self.on_update(self.stages)
+
+    @contextmanager
+    def stage(self, name: str):
+        self.check_deadline()
+        started = time.perf_counter()
+        self._update(name, status="running")
+        try:
+            yield
+        except BaseException as e:
+            self._update(name, status="failed", error=str(e), ms=round((time.perf_counter() - started) * 1000, 1))
+            raise
+        self._update(name, status="done", ms=round((time.perf_counter() - started) * 1000, 1))
+
+    def skip(self, name: str, reason: str):
+        self._update(name, status="skipped", reason=reason)
+
+    def annotate(self, name: str, **fields):
+        self._update(name, **fields)
+
+
+class ResumeJobQueue:
+    """SQLite-backed job table + ThreadPoolExecutor workers. handler(job, ctx) returns the job result dict."""
+
+    def __init__(self, db_path: str, upload_dir: str, handler: Callable[[Dict[str, Any], JobContext], Dict[str, Any]],
+                 workers: int = 2, max_attempts: int = 2, timeout_s: float = 180, retry_delay_s: float = 2.0,
+                 ttl_s: float = 86400, lease_s: float = 30):
+        self.db_path = db_path
+        self.upload_dir = upload_dir
+        self.handler = handler
+        self.max_attempts = max_attempts
+        self.timeout_s = timeout_s
+        self.retry_delay_s = retry_delay_s
+        self.ttl_s = ttl_s
+        self.workers = workers
+        self.lease_s = lease_s
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="resume-job")
+        self._lock = threading.Lock()
+        self._pending = 0
+        os.makedirs(upload_dir, exist_ok=True)
+        self._execute(
+            "CREATE TABLE IF NOT EXISTS resume_jobs ("
+            "id TEXT PRIMARY KEY, status TEXT, stages TEXT, attempts INTEGER, filename TEXT, file_path TEXT, "
+            "email TEXT, error TEXT, result TEXT, created REAL, started REAL, finished REAL, "
+            "owner TEXT, lease_until REAL)"
+        )
+        # Tables created before leases existed
+        columns = {row["name"] for row in self._execute("PRAGMA table_info(resume_jobs)", fetch=True)}
+        for column, kind in (("owner", "TEXT"), ("lease_until", "REAL")):
+            if column not in columns:
+                self._execute(f"ALTER TABLE resume_jobs ADD COLUMN {column} {kind}")
+        self._stop = threading.Event()
+        self._heartbeat = threading.Thread(target=self._renew_leases, name="resume-job-heartbeat", daemon=True)
+        self._heartbeat.start()
+        self._recover()
+
+    # ── Storage ──────────────────────────────────────────────────────
+
+    def _execute(self, sql: str, params: tuple = (), fetch: bool = False) -> List[sqlite3.Row]:
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                cursor = conn.execute(sql, params)
+                return cursor.fetchall() if fetch else []
+        finally:
+            conn.close()
+
+    def _update(self, sql: str, params: tuple = ()) -> int:
+        """Runs a conditional UPDATE; the row count tells whether this process won the transition."""
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            with conn:
+                return conn.execute(sql, params).rowcount
+        finally:
+            conn.close()
+
+    def _set(self, job_id: str, **fields):
+        columns = ", ".join(f"{k} = ?" for k in fields)
+        self._execute(f"UPDATE resume_jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+
+    def _release(self, job_id: str, **fields) -> bool:
+        """Sets fields and drops the lease, unless another process has since taken the job over."""
+        fields.update(owner=None, lease_until=None)
+        columns = ", ".join(f"{k} = ?" for k in fields)
+        return bool(self._update(f"UPDATE resume_jobs SET {columns} WHERE id = ? AND owner = ?",
+                                 (*fields.values(), job_id, self.owner)))
+
+    def _claim(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Atomically moves a queued job to running under this owner's lease, so a job is never run twice."""
+        now = time.time()
+        claimed = self._update(
+            "UPDATE resume_jobs SET status = 'running', attempts = attempts + 1, started = ?, error = NULL, "
+            "owner = ?, lease_until = ? WHERE id = ? AND status = 'queued'",
+            (now, self.owner, now + self.lease_s, job_id),
+        )
+        return self.get(job_id) if claimed else None
+
+    def _renew_leases(self):
+        """Heartbeat: extends the lease of every job this process is running."""
+        while not self._stop.wait(self.lease_s / 3):
+            try:
+                self._update(
+                    "UPDATE resume_jobs SET lease_until = ? WHERE owner = ? AND status = 'running'",
+                    (time.time() + self.lease_s, self.owner),
+                )
+            except sqlite3.Error as e:
+                print(f"[ResumeJobs] Lease renewal failed: {e}")
+
+    def close(self):
+        """Stops the heartbeat and the workers; unfinished jobs are recovered once their lease expires."""
+        self._stop.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        rows = self._execute("SELECT * FROM resume_jobs WHERE id = ?", (job_id,), fetch=True)
+        if not rows:
+            return None
+        job = dict(rows[0])
+        job["stages"] = json.loads(job["stages"] or "{}")
+        return job
+
+    # ── Lifecycle ────────────────────────────────────────────────────
+
+    def submit(self, upload: BufferedUpload, filename: str, suffix: str, email: Optional[str] = None) -> str:
+        self._purge_expired()
+        job_id = uuid.uuid4().hex
+        file_path = os.path.join(self.upload_dir, job_id + suffix)
+        upload.save(file_path)
+        stages = {name: {"status": "pending"} for name in STAGES}
+        self._execute(
+            "INSERT INTO resume_jobs (id, status, stages, attempts, filename, file_path, email, created) "
+            "VALUES (?, 'queued', ?, 0, ?, ?, ?, ?)",
+            (job_id, json.dumps(stages), filename, file_path, email, time.time()),
+        )
+        self._enqueue(job_id)
+        return job_id
+
+    def _enqueue(self, job_id: str, delay_s: float = 0.0):
+        with self._lock:
+            self._pending += 1
+        if delay_s:
+            timer = threading.Timer(delay_s, self._executor.submit, args=(self._run, job_id))
+            timer.daemon = True
+            timer.start()
+        else:
+            self._executor.submit(self._run, job_id)
+
+    def _run(self, job_id: str):
+        with self._lock:
+            self._pending -= 1
+        job = self._claim(job_id)
+        if job is None:
+            return
+
+        attempts = job["attempts"]
+        ctx = JobContext(self.timeout_s, on_update=lambda stages: self._set(job_id, stages=json.dumps(stages)))
+        try:
+            result = self.handler(job, ctx)
+        except JobTimeout as e:
+            self._finish(job, "timed_out", error=str(e))
+        except Exception as e:
+            print(f"[ResumeJobs] Job {job_id} attempt {attempts}/{self.max_attempts} failed: {e}")
+            if attempts < self.max_attempts:
+                if self._release(job_id, status="queued", error=str(e)):
+                    self._enqueue(job_id, delay_s=self.retry_delay_s * attempts)
+            else:
+                self._finish(job, "failed", error=str(e))
+        else:
+            self._finish(job, "completed", result=dumps_text(result))
+
+    def _finish(self, job: Dict[str, Any], status: str, error: Optional[str] = None, result: Optional[str] = None):
+        if self._release(job["id"], status=status, error=error, result=result, finished=time.time()):
+            self._remove_upload(job["file_path"])
+
+    @staticmethod
+    def _remove_upload(file_path: Optional[str]):
+        if file_path and os.path.exists(file_path):
+            try:
+                os.remove(file_path)
+            except OSError:
+                pass
+
+    def _recover(self):
+        """
+        Re-queues queued jobs and running jobs whose lease has expired (their owner died); a job that
+        has used up its attempts or whose upload is gone is failed. Live leases are left alone.
+        """
+        now = time.time()
+        rows = self._execute(
+            "SELECT id, file_path, attempts FROM resume_jobs WHERE status = 'queued' "
+            "OR (status = 'running' AND (lease_until IS NULL OR lease_until < ?))", (now,), fetch=True,
+        )
+        # Each transition re-checks the lease, so a job claimed meanwhile by another process is not touched
+        unowned = "WHERE id = ? AND (status = 'queued' OR (status = 'running' AND (lease_until IS NULL OR lease_until < ?)))"
+        recovered = 0
+        for row in rows:
+            if not (row["file_path"] and os.path.exists(row["file_path"])):
+                error = "Upload lost during restart"
+            elif row["attempts"] >= self.max_attempts:
+                error = f"Interrupted after {row['attempts']} attempt(s)"
+            else:
+                error = None
+            if error is not None:
+                if self._update(f"UPDATE resume_jobs SET status = 'failed', error = ?, finished = ?, owner = NULL, "
+                                f"lease_until = NULL {unowned}", (error, now, row["id"], now)):
+                    self._remove_upload(row["file_path"])
+            elif self._update(f"UPDATE resume_jobs SET status = 'queued', owner = NULL, lease_until = NULL {unowned}",
+                              (row["id"], now)):
+                self._enqueue(row["id"])
+                recovered += 1
+        if rows:
+            print(f"[ResumeJobs] Recovered {recovered} of {len(rows)} unfinished job(s)")
+
+    def _purge_expired(self):
+        cutoff = time.time() - self.ttl_s
+        self._execute("DELETE FROM resume_jobs WHERE finished IS NOT NULL AND finished < ?", (cutoff,))
+
+    def stats(self) -> Dict[str, Any]:
+        rows = self._execute("SELECT status, COUNT(*) AS n FROM resume_jobs GROUP BY status", fetch=True)
+        with self._lock:
+            pending = self._pending
+        return {"workers": self.workers, "queue_depth": pending, "jobs": {row["status"]: row["n"] for row in rows}}
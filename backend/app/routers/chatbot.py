@@ -1,10 +1,11 @@
 from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 from typing import List, Optional, Dict, Any
-import os, time
+import os, threading, time
 from dotenv import load_dotenv
-from pymongo import MongoClient
 import sys
+from ..mongo import get_db
 
 # Crucially load the Master .env immediately before Mongo bindings
 load_dotenv(os.path.join(os.path.abspath(os.path.dirname(__file__)), "..", "..", ".env"))
@@ -19,16 +20,46 @@ if GEMINI_ROOT not in sys.path:
 
 try:
     from chat_service import ChatService
+    from retrieval import HybridRetriever
+    from semantic_cache import SemanticCache
 except Exception as e:
     ChatService = None
     print(f"Failed to load ChatService: {e}")
 
-# Securely initialize MongoDB connection using standard .env
-client = MongoClient(os.getenv("MONGO_URI", "mongodb://localhost:27017"))
-db = client[os.getenv("DATABASE_NAME", "pathfinder_plus")]
+# Shared pooled MongoDB client (app/mongo.py), configured from the .env loaded above
+db = get_db()
+
+from app.main import engine
+
+_retriever = None
+_retriever_lock = threading.Lock()
+
+def engine_retriever():
+    """Chat RAG index over the engine's datasets and embeddings, rebuilt after each data release."""
+    global _retriever
+    with _retriever_lock:
+        if _retriever is None or _retriever.version != engine.dataset_version:
+            _retriever = HybridRetriever.from_engine(engine)
+        return _retriever
+
+def engine_chat_cache():
+    """Semantic answer cache embedding questions with the engine's encoder; cleared on each data release."""
+    from chat_service import CACHE_ENABLED, CACHE_THRESHOLD, CACHE_TTL_S
+    if not CACHE_ENABLED:
+        return None
+    return SemanticCache(
+        encode=lambda text: engine.model.encode(text, convert_to_numpy=True, show_progress_bar=False),
+        threshold=CACHE_THRESHOLD,
+        ttl_s=CACHE_TTL_S,
+        version=lambda: engine.dataset_version,
+    )
 
 if ChatService:
-    chat_service = ChatService(db=db)
+    # Without the engine, ChatService indexes the Mongo collections itself (BM25 only) and caches exact repeats
+    if engine is not None:
+        chat_service = ChatService(db=db, retriever=engine_retriever, cache=engine_chat_cache())
+    else:
+        chat_service = ChatService(db=db)
 else:
     chat_service = None
 
@@ -36,6 +67,8 @@ class ChatRequest(BaseModel):
     user_id: str
     message: str
     history: Optional[List[Dict[str, Any]]] = []
+    # Coarse asker profile ({"status", "education", "target_role"}); cached answers are only shared within one
+    profile: Optional[Dict[str, Any]] = None
 
 # Rate Limit Logic
 user_last_request: Dict[str, float] = {}   
@@ -70,10 +103,13 @@ async def chat_with_ui(chat_req: ChatRequest, request: Request):
     user_last_request[chat_req.user_id] = current_time
 
     try:
-        reply = chat_service.get_reply(
+        # ChatService does blocking Mongo lookups and Gemini calls; keep them off the event loop
+        reply = await run_in_threadpool(
+            chat_service.get_reply,
             user_id=chat_req.user_id,
             user_message=chat_req.message,
-            chat_history=chat_req.history
+            chat_history=chat_req.history,
+            profile=chat_req.profile,
         )
         return {"reply": reply}
     except Exception as e:
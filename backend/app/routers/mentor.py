@@ -17,6 +17,9 @@ from sqlalchemy.orm import declarative_base, sessionmaker, Session
 # App + Storage
 # ---------------------------
 from fastapi import APIRouter
+from starlette.concurrency import run_in_threadpool
+from ..uploads import read_upload
+from ..mongo import get_async_db, get_db as get_mongo_db
 router = APIRouter()
 
 
@@ -52,7 +55,6 @@ def get_db():
 # ---------------------------
 # MongoDB (Mentors Data)
 # ---------------------------
-from pymongo import MongoClient
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -65,14 +67,17 @@ cloudinary.config(
   secure=True
 )
 
+# Shared pooled client (app/mongo.py); async handlers use the non-blocking one via _async_mentors()
 try:
-    mongo_client = MongoClient(os.getenv("MONGO_URI", "mongodb://localhost:27017"))
-    mongo_db = mongo_client[os.getenv("DATABASE_NAME", "pathfinder_plus")]
+    mongo_db = get_mongo_db()
     mentors_collection = mongo_db["mentors"]
 except Exception as e:
     print(f"MongoDB init error: {e}")
     mentors_collection = None
 
+def _async_mentors():
+    return get_async_db()["mentors"]
+
 # ---------------------------
 # Models
 # ---------------------------
@@ -235,12 +240,12 @@ def create_user(data: UserCreate, db: Session = Depends(get_db)):
 
 # Mentors
 @router.get("/mentors")
-def list_mentors():
+async def list_mentors():
     if mentors_collection is None: 
         raise HTTPException(500, "MongoDB collection is not configured.")
         
     try:
-        mentors = list(mentors_collection.find())
+        mentors = await _async_mentors().find().to_list(None)
     except Exception as e:
         raise HTTPException(500, f"Database connection error: {str(e)}")
     
@@ -279,7 +284,7 @@ def create_mentor(data: MentorCreate, me: User = Depends(get_me)):
     return {"mentor_id": str(result.inserted_id)}
 
 @router.post("/mentor/login")
-def login_mentor(data: MentorLoginIn):
+async def login_mentor(data: MentorLoginIn):
     if data.password != "admin123":
         raise HTTPException(401, "Invalid credentials")
         
@@ -294,7 +299,7 @@ def login_mentor(data: MentorLoginIn):
     ]}
     
     if mentors_collection is not None:
-        mentor = mentors_collection.find_one(query)
+        mentor = await _async_mentors().find_one(query)
         if mentor:
             return {
                 "token": f"simulated-jwt-{str(mentor['_id'])}",
@@ -310,41 +315,29 @@ def login_mentor(data: MentorLoginIn):
 @router.post("/upload")
 async def upload_file(file: UploadFile = File(...)):
     MAX_FILE_SIZE = 8 * 1024 * 1024 # 8MB
-    file.file.seek(0, 2)
-    file_size = file.file.tell()
-    file.file.seek(0)
-    
-    if file_size > MAX_FILE_SIZE:
-        raise HTTPException(status_code=413, detail="File too large. Maximum size is 8MB.")
+    # Streamed into memory with the size limit enforced while reading; no temp file round-trip
+    upload = await read_upload(file, max_bytes=MAX_FILE_SIZE)
         
     try:
-        import tempfile
-        import shutil
-        import os
-        
-        # Save to a temporary file locally with the correct filename to preserve the extension during Cloudinary upload
-        temp_dir = tempfile.mkdtemp()
-        temp_file_path = os.path.join(temp_dir, file.filename)
-        with open(temp_file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-            
-        try:
-            # Upload buffer directly to Cloudinary Bucket
-            result = cloudinary.uploader.upload(
-                temp_file_path, 
+        with upload.open() as stream:
+            # Upload buffer directly to Cloudinary Bucket; filename keeps the extension for use_filename
+            result = await run_in_threadpool(
+                cloudinary.uploader.upload,
+                stream, 
+                filename=file.filename,
                 resource_type="auto", # auto-detects images, pdfs, videos, etc
                 use_filename=True,
                 folder="pathfinder_chat_attachments"
             )
             
-            # Return CDN URL matching the frontend expectation
-            return {"url": result["secure_url"]}
-        finally:
-            shutil.rmtree(temp_dir)
+        # Return CDN URL matching the frontend expectation
+        return {"url": result["secure_url"]}
             
     except Exception as e:
         print(f"Cloudinary Upload Failed: {e}")
         raise HTTPException(status_code=500, detail="Failed to upload file to cloud storage.")
+    finally:
+        upload.close()
 
 # Assessment + Suggestions (your “Suggested Mentors based on Skill Assessment” page)
 @router.post("/assessments", response_model=AssessmentCreateOut)
@@ -508,42 +501,30 @@ def clear_chat_history(mentor_id: str, db: Session = Depends(get_db)):
     return {"status": "cleared"}
 
 @router.post("/chat/upload")
-def upload_chat_file(file: UploadFile = File(...)):
+async def upload_chat_file(file: UploadFile = File(...)):
     """Securely uploads a file (PDF/Image) to Cloudinary to be attached in the chat."""
     MAX_FILE_SIZE = 8 * 1024 * 1024 # 8MB
-    file.file.seek(0, 2)
-    file_size = file.file.tell()
-    file.file.seek(0)
-    
-    if file_size > MAX_FILE_SIZE:
-        raise HTTPException(status_code=413, detail="File too large. Maximum size is 8MB.")
+    upload = await read_upload(file, max_bytes=MAX_FILE_SIZE)
         
     try:
         import cloudinary.uploader
-        import tempfile
-        import shutil
-        import os
         
-        # Save to a temporary file locally with the correct filename to preserve the extension during Cloudinary upload
-        temp_dir = tempfile.mkdtemp()
-        temp_file_path = os.path.join(temp_dir, file.filename)
-        with open(temp_file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-            
-        try:
-            result = cloudinary.uploader.upload(
-                temp_file_path, 
+        with upload.open() as stream:
+            result = await run_in_threadpool(
+                cloudinary.uploader.upload,
+                stream, 
+                filename=file.filename,
                 resource_type="auto",
                 use_filename=True,
                 folder="pathfinder_chat_attachments"
             )
-            return {"url": result["secure_url"], "filename": file.filename}
-        finally:
-            shutil.rmtree(temp_dir)
+        return {"url": result["secure_url"], "filename": file.filename}
             
     except Exception as e:
         print(f"Cloudinary Upload Failed: {e}")
         raise HTTPException(status_code=500, detail="Failed to upload file to cloud storage.")
+    finally:
+        upload.close()
 
 #  WEBSOCKET CONNECTION MANAGER
 class ConnectionManager:
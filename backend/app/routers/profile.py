@@ -4,7 +4,7 @@ from ..database import get_db
 from ..models import UserProfile, User
 import sys
 import os
-import json
+from ..serialization import RawJSONResponse, dumps_stored, load_legacy_object, splice_raw, stored_raw
 
 # Bind the specialized Python Pipeline engines
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "Machine Learning and Data Cleaning")))
@@ -52,18 +52,22 @@ def get_profile_status(db: Session = Depends(get_db), email: str = Depends(get_c
     if not getattr(profile, 'skills_extracted', False): missing.append("skills")
     if not getattr(profile, 'job_matches_generated', False): missing.append("job_matches")
     
-    last_bundle = {}
-    if getattr(profile, 'last_bundle', None):
-        try:
-            last_bundle = json.loads(profile.last_bundle)
-        except:
-            last_bundle = {}
+    # The bundle is stored serialized and validated; splice it into the response as-is, without parsing it
+    stored = getattr(profile, 'last_bundle', None)
+    last_bundle = stored_raw(stored)
+    if last_bundle is None and stored:
+        # Row from before stored values were marked: parse it once and store it marked for later reads
+        legacy = load_legacy_object(stored)
+        if legacy is not None:
+            profile.last_bundle = dumps_stored(legacy)
+            db.commit()
+            last_bundle = stored_raw(profile.last_bundle)
 
-    return {
+    envelope = {
         "success": True,
         "completion_percentage": completion,
         "missing_components": missing,
         "message": message,
         "state": getattr(profile, 'state', "NEW"),
-        "cached_results": last_bundle
     }
+    return RawJSONResponse(splice_raw(envelope, "cached_results", last_bundle or b"{}"))
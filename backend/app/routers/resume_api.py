@@ -1,16 +1,20 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Header
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Header, Query
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from ..database import get_db
+from ..database import get_db, SessionLocal
 from ..models import UserProfile, User
-import json
-import io
+from ..resume_jobs import JobContext, ResumeJobQueue, TERMINAL_STATUSES
+from ..serialization import FastJSONResponse, RawJSONResponse, dumps_stored, splice_raw
+from ..uploads import BufferedUpload, read_upload
+import asyncio
 import os as system_os
 import sys
-import shutil
 import tempfile
-import fitz
 import re
+import time
 import traceback
+from pydantic import BaseModel, Field
+from typing import Any, Callable, Dict, List, Optional
 from ..auth import verify_token
 from app.main import engine
 from core.mentor_engine import MentorEngine
@@ -19,64 +23,149 @@ router = APIRouter()
 
 sys.path.append(system_os.path.abspath(system_os.path.join(system_os.path.dirname(__file__), "..", "..", "..", "Machine Learning and Data Cleaning")))
 
-@router.post("/resume/upload")
-async def upload_resume(file: UploadFile = File(...), db: Session = Depends(get_db), authorization: str = Header(None)):
-    if engine is None:
-        raise HTTPException(status_code=500, detail="PyTorch engine not loaded.")
+IMAGE_SUFFIXES = (".jpg", ".jpeg", ".png", ".avif", ".webp")
+# Below this much text layer a PDF is treated as scanned and OCR'd
+OCR_MIN_TEXT_CHARS = 50
+
+
+def _suffix(filename: Optional[str]) -> str:
+    ext = system_os.path.splitext(filename or "")[1].lower()
+    return ext if ext in IMAGE_SUFFIXES else ".pdf"
+
+
+def _resolve_email(authorization: Optional[str]) -> Optional[str]:
+    if not (authorization and authorization.startswith("Bearer ")):
+        return None
+    try:
+        payload = verify_token(authorization.split(" ")[1])
+        return payload.get("sub") if isinstance(payload, dict) else None
+    except Exception:
+        return None
+
+
+def _extract_text(upload: BufferedUpload) -> str:
+    """Text layer of a PDF (images have none); in-memory uploads are parsed from their bytes."""
+    if _suffix(upload.filename) in IMAGE_SUFFIXES:
+        return ""
+    try:
+        return engine.extract_resume_text(upload.getvalue() if upload.in_memory else upload.path, upload.digest)
+    except Exception as e:
+        print(f"Error parsing PDF: {e}")
+        return ""
+
+
+def _classify_resume(resume_text: str):
+    """Strong Semantic RegEx Extraction for Academic & Experience Baselines -> (education_level, status, experience)"""
+    education_level = "school_leaver"
+    
+    msc_pattern = r'\b(m\.?sc|master\'s|masters of|ph\.?d|doctorate|mba|m\.?a|mphil)\b'
+    bsc_pattern = r'\b(b\.?sc|bachelor\'s|bachelors of|b\.?a|bba|undergrad|undergraduate|b\.?tech|b\.?eng)\b'
+    diploma_pattern = r'\b(diploma|hnd|higher national|pgd|post graduate diploma)\b'
+    al_pattern = r'\b(a/l|advanced level|gce advanced|g\.c\.e\.? a/l)\b'
+    
+    if re.search(msc_pattern, resume_text):
+        education_level = "msc_phd"
+    elif re.search(bsc_pattern, resume_text):
+        education_level = "bsc"
+    elif re.search(diploma_pattern, resume_text):
+        education_level = "diploma"
+    elif re.search(al_pattern, resume_text):
+        education_level = "al"
         
-    tmp_path = None
+    status = "Working Professional"
+    experience = "3-5 years"
+    
+    student_pattern = r'\b(student|undergrad|undergraduate|intern|internship|trainee)\b'
+    junior_pattern = r'\b(junior|associate|entry level|graduate trainee)\b'
+    mid_senior_pattern = r'\b(senior|lead|manager|principal|director|head of)\b'
+    
+    if re.search(student_pattern, resume_text):
+        status = "University Student"
+        experience = "0 (None)"
+    elif re.search(junior_pattern, resume_text):
+        experience = "1-2 years"
+    elif re.search(mid_senior_pattern, resume_text) and not re.search(student_pattern, resume_text):
+        experience = "6-10 years"
+    return education_level, status, experience
+
+
+def _override_target(resume_text: str, target: str) -> str:
+    # Override SBERT Target Role Hallucinations using strict NLP mappings
+    if re.search(r'\b(machine learning|deep learning|data science|ai|artificial intelligence|data analyst|data engineer)\b', resume_text):
+        target = "Data Scientist"
+    elif re.search(r'\b(software engineer|developer|full stack|frontend|backend|programmer|angular|react|java|python|c\+\+)\b', resume_text):
+        target = "Software Engineer"
+    elif re.search(r'\b(cyber|security|penetration|infosec|ethical hacker)\b', resume_text):
+        target = "Cyber Security Expert"
+    elif re.search(r'\b(ui|ux|design|designer|figma|adobe)\b', resume_text):
+        target = "UI/UX Designer"
+    return target
+
+
+def _persist_resume_bundle(db: Session, email: Optional[str], bundle: Dict[str, Any]):
+    """EVENT DRIVEN DB PERSISTENCE of the finished bundle onto the user's profile."""
+    if not email:
+        return
     try:
-        # Save uploaded file to a temporary location
-        fd, tmp_path = tempfile.mkstemp(suffix=".pdf")
-        with system_os.fdopen(fd, 'wb') as out_file:
-            shutil.copyfileobj(file.file, out_file)
-            
+        user_record = db.query(User).filter(User.email == email).first()
+        if user_record:
+            u_profile = db.query(UserProfile).filter(UserProfile.user_id == user_record.id).first()
+            if not u_profile:
+                u_profile = UserProfile(user_id=user_record.id)
+                db.add(u_profile)
+            u_profile.cv_uploaded = True
+            u_profile.skills_extracted = True
+            u_profile.job_matches_generated = True
+            u_profile.state = "MATCHED"
+            u_profile.last_bundle = dumps_stored(bundle)
+            db.commit()
+    except Exception as db_e:
+        print(f"Failed to persist state: {db_e}")
+
+
+def _process_resume(upload: BufferedUpload, ctx: JobContext, persist: Callable[[Dict[str, Any]], None]) -> Dict[str, Any]:
+    """
+    The resume pipeline, shared by the inline and the queued upload:
+    parse (PDF text layer, read once) → OCR (scanned PDFs / images) → extraction → profiling.
+    Every parse product is cached by the upload's SHA-256, so re-uploads skip straight to profiling.
+    """
+    filename, digest = upload.filename, upload.digest
+    with ctx.stage("parse"):
+        cached = engine.resume_cache.get(digest) or {}
+        ctx.annotate("parse", cache_hit="text" in cached, in_memory=upload.in_memory)
+        resume_text = _extract_text(upload)
+
+    source = "text"
+    if len(resume_text.strip()) >= OCR_MIN_TEXT_CHARS:
+        ctx.skip("ocr", "text layer present")
+    elif "ocr_text" in cached:
+        ctx.skip("ocr", "cached")
+        resume_text, source = cached["ocr_text"], "ocr"
+    elif not engine.ocr_pool.available:
+        ctx.skip("ocr", "OCR libraries (PIL/pytesseract) not installed")
+    else:
+        with ctx.stage("ocr"):
+            # Pages are OCR'd in parallel in the engine's process pool (which needs a path); the job deadline is checked per page
+            with upload.as_path(_suffix(filename)) as path:
+                resume_text, source = engine.ocr_resume(path, digest, on_page=ctx.check_deadline), "ocr"
+
+    with ctx.stage("extraction"):
+        resume_text = resume_text.lower()
+        extracted_skills = engine.extract_resume_skills(resume_text, digest, source) if resume_text.strip() else []
+        if cached.get("sections_from") == source:
+            education_level, status, experience = (cached["sections"][k] for k in ("education_level", "status", "experience"))
+        else:
+            education_level, status, experience = _classify_resume(resume_text)
+            engine.resume_cache.update(digest, sections_from=source, sections={
+                "education_level": education_level, "status": status, "experience": experience,
+            })
+
+    with ctx.stage("profiling"):
         # Natively extract SBERT intent profiles and textual skills
-        print(f"[Engine] Parsing Resume via Auto-Profile: {file.filename}")
-        profile = engine.auto_profile(tmp_path)
-        
-        # Strong Semantic RegEx Extraction for Academic & Experience Baselines
-        resume_text = ""
-        try:
-            with fitz.open(tmp_path) as doc:
-                for page in doc:
-                    resume_text += page.get_text().lower()
-        except:
-            pass
-            
-        education_level = "school_leaver"
-        
-        msc_pattern = r'\b(m\.?sc|master\'s|masters of|ph\.?d|doctorate|mba|m\.?a|mphil)\b'
-        bsc_pattern = r'\b(b\.?sc|bachelor\'s|bachelors of|b\.?a|bba|undergrad|undergraduate|b\.?tech|b\.?eng)\b'
-        diploma_pattern = r'\b(diploma|hnd|higher national|pgd|post graduate diploma)\b'
-        al_pattern = r'\b(a/l|advanced level|gce advanced|g\.c\.e\.? a/l)\b'
-        
-        if re.search(msc_pattern, resume_text):
-            education_level = "msc_phd"
-        elif re.search(bsc_pattern, resume_text):
-            education_level = "bsc"
-        elif re.search(diploma_pattern, resume_text):
-            education_level = "diploma"
-        elif re.search(al_pattern, resume_text):
-            education_level = "al"
-            
-        status = "Working Professional"
-        experience = "3-5 years"
-        
-        student_pattern = r'\b(student|undergrad|undergraduate|intern|internship|trainee)\b'
-        junior_pattern = r'\b(junior|associate|entry level|graduate trainee)\b'
-        mid_senior_pattern = r'\b(senior|lead|manager|principal|director|head of)\b'
-        
-        if re.search(student_pattern, resume_text):
-            status = "University Student"
-            experience = "0 (None)"
-        elif re.search(junior_pattern, resume_text):
-            experience = "1-2 years"
-        elif re.search(mid_senior_pattern, resume_text) and not re.search(student_pattern, resume_text):
-            experience = "6-10 years"
-        
+        print(f"[Engine] Parsing Resume via Auto-Profile: {filename}")
+        profile = engine.auto_profile_from_skills(extracted_skills)
+
         # Build a highly contextual assessment payload
-        extracted_skills = profile.get("extracted_skills", [])
         answers_for_engine = {
             "status": status, 
             "education": education_level,
@@ -90,17 +179,7 @@ async def upload_resume(file: UploadFile = File(...), db: Session = Depends(get_
         assessment_vector = engine.process_comprehensive_assessment(answers_for_engine)
         assessment_vector["extracted_intent_skills"] = list(set(assessment_vector.get("extracted_intent_skills", []) + extracted_skills))
         
-        target = profile.get("suggested_target", "General Professional")
-        
-        # Override SBERT Target Role Hallucinations using strict NLP mappings
-        if re.search(r'\b(machine learning|deep learning|data science|ai|artificial intelligence|data analyst|data engineer)\b', resume_text):
-            target = "Data Scientist"
-        elif re.search(r'\b(software engineer|developer|full stack|frontend|backend|programmer|angular|react|java|python|c\+\+)\b', resume_text):
-            target = "Software Engineer"
-        elif re.search(r'\b(cyber|security|penetration|infosec|ethical hacker)\b', resume_text):
-            target = "Cyber Security Expert"
-        elif re.search(r'\b(ui|ux|design|designer|figma|adobe)\b', resume_text):
-            target = "UI/UX Designer"
+        target = _override_target(resume_text, profile.get("suggested_target", "General Professional"))
 
         bundle = engine.get_recommendations_from_assessment(assessment_vector, target_job=target)
         
@@ -117,40 +196,131 @@ async def upload_resume(file: UploadFile = File(...), db: Session = Depends(get_
             
         # --- EVENT DRIVEN DB PERSISTENCE ---
         bundle["mentor_recommendation"] = MentorEngine.recommend_mentor(target)
+        persist(bundle)
+
+    return {
+        "success": True,
+        "filename": filename,
+        "bundle": bundle,
+        "career": target,
+        "description": dynamic_description,
+        "skills": extracted_skills[:5]
+    }
+
+
+def _run_resume_job(job: Dict[str, Any], ctx: JobContext) -> Dict[str, Any]:
+    if engine is None:
+        raise RuntimeError("PyTorch engine not loaded.")
+    db = SessionLocal()
+    try:
+        upload = BufferedUpload.from_path(job["file_path"], job["filename"])
+        return _process_resume(upload, ctx, lambda bundle: _persist_resume_bundle(db, job["email"], bundle))
+    finally:
+        db.close()
+
+
+RESUME_JOBS = ResumeJobQueue(
+    db_path=system_os.getenv("RESUME_JOBS_DB", system_os.path.join(system_os.path.dirname(__file__), "..", "..", "resume_jobs.db")),
+    upload_dir=system_os.getenv("RESUME_JOBS_DIR", system_os.path.join(tempfile.gettempdir(), "pathfinder_resume_jobs")),
+    handler=_run_resume_job,
+    workers=int(system_os.getenv("RESUME_JOB_WORKERS", "2")),
+    max_attempts=int(system_os.getenv("RESUME_JOB_ATTEMPTS", "2")),
+    timeout_s=float(system_os.getenv("RESUME_JOB_TIMEOUT_S", "180")),
+)
+
+
+@router.post("/resume/upload")
+async def upload_resume(file: UploadFile = File(...), db: Session = Depends(get_db), authorization: str = Header(None)):
+    if engine is None:
+        raise HTTPException(status_code=500, detail="PyTorch engine not loaded.")
         
-        if authorization and authorization.startswith("Bearer "):
-            try:
-                token = authorization.split(" ")[1]
-                email = verify_token(token)
-                if email:
-                    user_record = db.query(User).filter(User.email == email).first()
-                    if user_record:
-                        u_profile = db.query(UserProfile).filter(UserProfile.user_id == user_record.id).first()
-                        if not u_profile:
-                            u_profile = UserProfile(user_id=user_record.id)
-                            db.add(u_profile)
-                        u_profile.cv_uploaded = True
-                        u_profile.skills_extracted = True
-                        u_profile.job_matches_generated = True
-                        u_profile.state = "MATCHED"
-                        u_profile.last_bundle = json.dumps(bundle)
-                        db.commit()
-            except Exception as db_e:
-                print(f"Failed to persist state: {db_e}")
-
-        return {
-            "success": True,
-            "filename": file.filename,
-            "bundle": bundle,
-            "career": target,
-            "description": dynamic_description,
-            "skills": extracted_skills[:5]
-        }
+    # Streamed into memory (spilling to disk only for large files), size-limited and hashed as it is read
+    upload = await read_upload(file)
+    try:
+        email = _resolve_email(authorization)
+        # The pipeline is blocking; keep it off the event loop
+        result = await run_in_threadpool(
+            _process_resume, upload, JobContext(),
+            lambda bundle: _persist_resume_bundle(db, email, bundle),
+        )
+        return FastJSONResponse(result)
         
     except Exception as e:
         traceback.print_exc()
         print(f"CRITICAL PyTorch Engine Integration Error: {e}")
         return {"error": str(e), "bundle": {"error": str(e)}}
     finally:
-        if tmp_path and system_os.path.exists(tmp_path):
-            system_os.remove(tmp_path)
+        upload.close()
+
+
+# Bounds on one ATS call (larger screens are split by the client) -> 422 above them
+ATS_MAX_RESUMES = int(system_os.getenv("ATS_MAX_RESUMES", "100"))
+ATS_MAX_TOP_K = int(system_os.getenv("ATS_MAX_TOP_K", "50"))
+# include_matrix past this many resumes x jobs cells is refused with 400; filters narrow the jobs
+ATS_MAX_MATRIX_CELLS = int(system_os.getenv("ATS_MAX_MATRIX_CELLS", "200000"))
+
+
+class ATSMatchData(BaseModel):
+    resumes: List[List[str]] = Field(..., max_length=ATS_MAX_RESUMES)  # extracted skills of each parsed resume
+    top_k: int = Field(10, le=ATS_MAX_TOP_K)
+    filters: Dict[str, str] = {}  # {jobs_df column: substring}, e.g. {"title": "engineer"}
+    include_matrix: bool = False
+
+
+@router.post("/resume/ats-match")
+def ats_match(data: ATSMatchData):
+    """
+    Ranks live job postings for one or more parsed resumes by skill coverage and embedding
+    similarity, with matched / missing skills per job. include_matrix adds the full
+    resumes x jobs score matrix (batch screening).
+    """
+    if engine is None:
+        raise HTTPException(status_code=500, detail="PyTorch engine not loaded.")
+    if not data.resumes:
+        raise HTTPException(status_code=400, detail="No resumes to match")
+    try:
+        result = engine.ats_match(data.resumes, top_k=max(1, data.top_k), filters=data.filters,
+                                  include_matrix=data.include_matrix, max_matrix_cells=ATS_MAX_MATRIX_CELLS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return FastJSONResponse({"success": True, **result})
+
+
+@router.post("/resume/upload-async", status_code=202)
+async def upload_resume_async(file: UploadFile = File(...), authorization: str = Header(None)):
+    """
+    Queues the resume for background processing and returns a job id at once.
+    Poll GET /resume/jobs/{job_id} (optionally with ?wait=<seconds> to block until it finishes).
+    """
+    if engine is None:
+        raise HTTPException(status_code=500, detail="PyTorch engine not loaded.")
+    with await read_upload(file) as upload:
+        job_id = await run_in_threadpool(RESUME_JOBS.submit, upload, file.filename, _suffix(file.filename), _resolve_email(authorization))
+    return {"job_id": job_id, "status": "queued", "status_url": f"/api/resume/jobs/{job_id}"}
+
+
+@router.get("/resume/jobs/{job_id}")
+async def resume_job_status(job_id: str, wait: float = Query(0, ge=0, le=60, description="Long-poll: seconds to wait for the job to finish")):
+    job = await run_in_threadpool(RESUME_JOBS.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown resume job")
+    loop = asyncio.get_running_loop()
+    give_up = loop.time() + wait
+    while job["status"] not in TERMINAL_STATUSES and loop.time() < give_up:
+        await asyncio.sleep(0.5)
+        job = await run_in_threadpool(RESUME_JOBS.get, job_id)
+
+    envelope = {
+        "job_id": job_id,
+        "status": job["status"],
+        "filename": job["filename"],
+        "attempts": job["attempts"],
+        "stages": job["stages"],
+        "error": job["error"],
+    }
+    if job["started"]:
+        envelope["elapsed_s"] = round((job["finished"] or time.time()) - job["started"], 2)
+    if job["status"] == "completed" and job["result"]:
+        # The result is stored serialized; splice it in rather than parse + re-serialize
+        return RawJSONResponse(splice_raw(envelope, "result", job["result"].encode("utf-8")))
+    return FastJSONResponse(envelope)
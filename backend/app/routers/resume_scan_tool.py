@@ -49,10 +49,20 @@ async def process_standalone_resume_scan(file: UploadFile = File(...), mode: str
                 analysis_offline = analyze_resume(parsed_offline)
                 preview_string = format_txt(parsed_offline, analysis_offline, file.filename)
                 system_os.remove(tmp_path)
+
+                # Match against live postings, not just the scanner's fixed REQUIRED_SKILLS list
+                job_matches = []
+                try:
+                    from app.main import engine
+                    if engine is not None:
+                        job_matches = engine.ats_match([parsed_offline.get("skills", [])], top_k=10)["matches"][0]
+                except Exception as match_e:
+                    print(f"ATS job matching failed: {match_e}")
                 
                 return {
                     "parsed": parsed_offline,
                     "analysis": analysis_offline,
+                    "job_matches": job_matches,
                     "filename": file.filename,
                     "preview": preview_string
                 }
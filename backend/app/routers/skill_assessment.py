@@ -1,12 +1,19 @@
-from fastapi import APIRouter, HTTPException, Depends, Header
+from fastapi import APIRouter, HTTPException, Depends, Header, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from ..database import get_db
+from ..database import get_db, SessionLocal
 from ..models import UserProfile, User
+from ..serialization import FastJSONResponse, dumps_stored, dumps_text
+import asyncio
 import json
 import os
 import sys
-from pydantic import BaseModel
-from typing import Dict, Any
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pydantic import BaseModel, Field
+from typing import Callable, Dict, Any, List, Optional
 
 router = APIRouter()
 
@@ -40,60 +47,166 @@ class QuizData(BaseModel):
     q11_conflict: str = ""
     q12_motivate: str = ""
 
+
+# Largest class list one batch may carry (larger lists are split by the client) -> 422 above it
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "200"))
+
+
+class BatchQuizData(BaseModel):
+    # One entry per student / trainee in the class list
+    items: List[QuizData] = Field(..., max_length=BATCH_MAX_ITEMS)
+    sections: Optional[str] = None
+
+class WhatIfData(BaseModel):
+    # Edited answers: quiz fields (upskilling_budget, weekly_availability) or
+    # assessment vector fields (education_preference, experience_years, ...)
+    changes: Dict[str, Any] = {}
+
+# Request-scoped budget for bundle sections; overridable per request with X-Deadline-Ms (0 disables)
+DEFAULT_DEADLINE_MS = int(os.getenv("ASSESSMENT_DEADLINE_MS", "20000"))
+
+# Cohort batches run one at a time; finished jobs are kept for an hour for polling, by their submitter only
+BATCH_EXECUTOR = ThreadPoolExecutor(max_workers=int(os.getenv("BATCH_WORKERS", "1")), thread_name_prefix="batch")
+# Queued + running jobs; new batches are refused with 429 beyond this, which also bounds the executor queue
+BATCH_MAX_PENDING = int(os.getenv("BATCH_MAX_PENDING", "4"))
+BATCH_JOB_TTL_S = 3600
+BATCH_JOBS: Dict[str, Dict[str, Any]] = {}
+BATCH_JOBS_LOCK = threading.Lock()
+
+# Quiz answer -> assessment vector field it is normalized into
+WHAT_IF_QUIZ_FIELDS = {
+    "upskilling_budget": "budget_category",
+    "weekly_availability": "time_commitment",
+}
+
 from app.main import engine
 
+
+def _build_assessment_vector(data: QuizData) -> Dict[str, Any]:
+    """Runs the quiz answers through the engine's assessment processor."""
+    # Concatenate all behavioral responses into a rich context string for the NLP engine
+    rich_behavioral_profile = f"""
+    Problem Solving: {data.q1_problem}
+    Adaptability: {data.q2_adapt}
+    Teamwork: {data.q3_team}
+    Stress Management: {data.q4_stress}
+    Learning Style: {data.q5_learn}
+    Leadership: {data.q6_lead}
+    Communication: {data.q7_comm}
+    Risk Tolerance: {data.q8_risk}
+    Feedback: {data.q9_feedback}
+    Planning: {data.q10_plan}
+    Conflict: {data.q11_conflict}
+    Motivation: {data.q12_motivate}
+    """
+    
+    # Format answers strictly to match what process_comprehensive_assessment expects
+    answers_for_engine = {
+        "status": data.role,
+        "total_experience": data.experience_years,
+        "responsibility_level": data.responsibility_level,
+        "q7": data.q1_problem,
+        "q10": data.q2_adapt,
+        "career_background": rich_behavioral_profile,
+        "interests": f"{data.q12_motivate} and {data.q6_lead}",
+        "budget_range": data.upskilling_budget,
+        "weekly_time": data.weekly_availability,
+        "education_type": data.education
+    }
+    
+    # Let the PyTorch Engine process the NLP responses
+    assessment_vector = engine.process_comprehensive_assessment(answers_for_engine)
+    
+    # Force the engine to also acknowledge the exact Interactive Skills clicked in the UI
+    existing_skills = assessment_vector.get("extracted_intent_skills", [])
+    explicit_skills = data.skills if isinstance(data.skills, list) else []
+    assessment_vector["extracted_intent_skills"] = list(set(existing_skills + explicit_skills))
+    return assessment_vector
+
+
+def _attach_mentor(bundle: Dict[str, Any], target_job: str) -> Dict[str, Any]:
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..", "Machine Learning and Data Cleaning")))
+    from core.mentor_engine import MentorEngine
+    
+    bundle["mentor_recommendation"] = MentorEngine.recommend_mentor(target_job)
+    return bundle
+
+
+def _token_email(authorization: Optional[str]) -> Optional[str]:
+    """Email of the signed-in user (the token's "sub"), None without a valid bearer token."""
+    if not (authorization and authorization.startswith("Bearer ")):
+        return None
+    try:
+        from ..auth import verify_token
+        payload = verify_token(authorization.split(" ")[1])
+    except Exception:
+        return None
+    email = payload.get("sub") if isinstance(payload, dict) else None
+    return email if isinstance(email, str) and email else None
+
+
+def _persist_bundle(db: Session, authorization: str, bundle: Dict[str, Any]):
+    """EVENT DRIVEN DB PERSISTENCE of the finished bundle onto the user's profile."""
+    email = _token_email(authorization)
+    if not email:
+        return
+    try:
+        user_record = db.query(User).filter(User.email == email).first()
+        if user_record:
+            u_profile = db.query(UserProfile).filter(UserProfile.user_id == user_record.id).first()
+            if not u_profile:
+                u_profile = UserProfile(user_id=user_record.id)
+                db.add(u_profile)
+            u_profile.quiz_completed = True
+            u_profile.skills_extracted = True
+            u_profile.job_matches_generated = True
+            u_profile.state = "MATCHED"
+            u_profile.last_bundle = dumps_stored(bundle)
+            db.commit()
+    except Exception as db_e:
+        print(f"Failed to persist state: {db_e}")
+
+
+def _target_job(data: QuizData) -> str:
+    return data.target_role if data.target_role else f"{data.domain} Professional"
+
+
+def _deadline_ms(header_value: Optional[str]) -> Optional[int]:
+    try:
+        value = int(header_value) if header_value else DEFAULT_DEADLINE_MS
+    except ValueError:
+        value = DEFAULT_DEADLINE_MS
+    return value if value > 0 else None
+
+
 @router.post("/skill-assessment")
-def save_quiz(data: QuizData, db: Session = Depends(get_db), authorization: str = Header(None)):
-    target_job = data.target_role if data.target_role else f"{data.domain} Professional"
-    courses_payload = ["Advanced Specialization", "Foundations Course", "Professional Certificate"]
+def save_quiz(
+    data: QuizData,
+    db: Session = Depends(get_db),
+    authorization: str = Header(None),
+    x_deadline_ms: Optional[str] = Header(None),
+    sections: Optional[str] = Query(None, description="Bundle preset (chatbot, dashboard, courses) or comma-separated bundle keys"),
+):
+    if engine is not None:
+        try:
+            engine.resolve_bundle_keys(sections)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    target_job = _target_job(data)
+    explicit_skills = data.skills if isinstance(data.skills, list) else []
     bundle = {}
-    jobs_payload = []
-    
+
     if engine is not None:
         try:
-            # Concatenate all behavioral responses into a rich context string for the NLP engine
-            rich_behavioral_profile = f"""
-            Problem Solving: {data.q1_problem}
-            Adaptability: {data.q2_adapt}
-            Teamwork: {data.q3_team}
-            Stress Management: {data.q4_stress}
-            Learning Style: {data.q5_learn}
-            Leadership: {data.q6_lead}
-            Communication: {data.q7_comm}
-            Risk Tolerance: {data.q8_risk}
-            Feedback: {data.q9_feedback}
-            Planning: {data.q10_plan}
-            Conflict: {data.q11_conflict}
-            Motivation: {data.q12_motivate}
-            """
-            
-            # Format answers strictly to match what process_comprehensive_assessment expects
-            answers_for_engine = {
-                "status": data.role,
-                "total_experience": data.experience_years,
-                "responsibility_level": data.responsibility_level,
-                "q7": data.q1_problem,
-                "q10": data.q2_adapt,
-                "career_background": rich_behavioral_profile,
-                "interests": f"{data.q12_motivate} and {data.q6_lead}",
-                "budget_range": data.upskilling_budget,
-                "weekly_time": data.weekly_availability,
-                "education_type": data.education
-            }
-            
-            # Let the PyTorch Engine process the NLP responses
-            assessment_vector = engine.process_comprehensive_assessment(answers_for_engine)
-            
-            # Force the engine to also acknowledge the exact Interactive Skills clicked in the UI
-            existing_skills = assessment_vector.get("extracted_intent_skills", [])
-            explicit_skills = data.skills if isinstance(data.skills, list) else []
-            assessment_vector["extracted_intent_skills"] = list(set(existing_skills + explicit_skills))
+            assessment_vector = _build_assessment_vector(data)
             
             # Generate the final Bundle
-            bundle = engine.get_recommendations_from_assessment(assessment_vector, target_job=target_job)
-            
-            courses_payload = []
-            jobs_payload = []
+            bundle = engine.get_recommendations_from_assessment(
+                assessment_vector, target_job=target_job, sections=sections,
+                session_id=_token_email(authorization),
+                deadline_ms=_deadline_ms(x_deadline_ms)
+            )
                     
         except Exception as e:
             print(f"CRITICAL PyTorch Engine Integration Error: {e}")
@@ -102,35 +215,14 @@ def save_quiz(data: QuizData, db: Session = Depends(get_db), authorization: str
     # Static Career Description (no Gemini dependency)
     dynamic_description = f"Based on your profile, your generated data vectors strongly align with leadership roles natively inside {data.domain} targeting {target_job} trajectories."
 
-    # --- EVENT DRIVEN DB PERSISTENCE ---
-    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..", "Machine Learning and Data Cleaning")))
-    from core.mentor_engine import MentorEngine
-    
-    bundle["mentor_recommendation"] = MentorEngine.recommend_mentor(target_job)
-    
-    if authorization and authorization.startswith("Bearer "):
-        try:
-            token = authorization.split(" ")[1]
-            from ..auth import verify_token
-            email = verify_token(token)
-            if email:
-                user_record = db.query(User).filter(User.email == email).first()
-                if user_record:
-                    u_profile = db.query(UserProfile).filter(UserProfile.user_id == user_record.id).first()
-                    if not u_profile:
-                        u_profile = UserProfile(user_id=user_record.id)
-                        db.add(u_profile)
-                    u_profile.quiz_completed = True
-                    u_profile.skills_extracted = True
-                    u_profile.job_matches_generated = True
-                    u_profile.state = "MATCHED"
-                    u_profile.last_bundle = json.dumps(bundle)
-                    db.commit()
-        except Exception as db_e:
-            print(f"Failed to persist state: {db_e}")
-
-    # Return Output for Frontend Result Screen
-    return {
+    _attach_mentor(bundle, target_job)
+
+    # Lite bundles are screen-specific and degraded ones incomplete; only a full bundle replaces the stored one
+    if sections in (None, "", "full") and not bundle.get("degraded_sections"):
+        _persist_bundle(db, authorization, bundle)
+
+    # Return Output for Frontend Result Screen (returned as a response so the bundle skips jsonable_encoder)
+    return FastJSONResponse({
         "success": True,
         "career": target_job,
         "description": dynamic_description,
@@ -138,4 +230,216 @@ def save_quiz(data: QuizData, db: Session = Depends(get_db), authorization: str
         "courses": bundle.get("skill_gap_courses", []),
         "jobs": bundle.get("job_opportunities", []),
         "bundle": bundle
-    }
\ No newline at end of file
+    })
+
+
+class _StreamAbandoned(Exception):
+    """The SSE client went away; stops the engine run from inside its on_section callback."""
+
+
+def _sse(event: str, payload: Any) -> str:
+    return f"event: {event}\ndata: {dumps_text(payload)}\n\n"
+
+
+@router.post("/skill-assessment/stream")
+def stream_quiz(data: QuizData, authorization: str = Header(None), x_deadline_ms: Optional[str] = Header(None)):
+    """
+    Server-sent-events variant of /skill-assessment.
+    Emits `profile` first, then one event per bundle key as soon as it is computed,
+    and finally `bundle` with the complete result (persisted to UserProfile.last_bundle).
+    If the client disconnects, the engine run is abandoned and nothing is persisted.
+    """
+    if engine is None:
+        raise HTTPException(status_code=503, detail="Recommendation engine not loaded")
+
+    target_job = _target_job(data)
+    done = object()
+
+    def produce(emit: Callable[[Any], None], cancelled: threading.Event):
+        def on_section(key, value):
+            # Raised into the engine, which abandons the sections still in flight
+            if cancelled.is_set():
+                raise _StreamAbandoned()
+            emit((key, value))
+
+        try:
+            assessment_vector = _build_assessment_vector(data)
+            emit(("profile", {
+                "career": target_job,
+                "domain": assessment_vector.get("domain"),
+                "skills": assessment_vector.get("extracted_intent_skills", [])[:10],
+                "description": f"Based on your profile, your generated data vectors strongly align with leadership roles natively inside {data.domain} targeting {target_job} trajectories.",
+            }))
+            if cancelled.is_set():
+                return
+            bundle = engine.get_recommendations_from_assessment(
+                assessment_vector, target_job=target_job,
+                on_section=on_section,
+                session_id=_token_email(authorization),
+                deadline_ms=_deadline_ms(x_deadline_ms)
+            )
+            _attach_mentor(bundle, target_job)
+            if not bundle.get("degraded_sections") and not cancelled.is_set():
+                db = SessionLocal()
+                try:
+                    _persist_bundle(db, authorization, bundle)
+                finally:
+                    db.close()
+            emit(("bundle", bundle))
+        except _StreamAbandoned:
+            pass
+        except Exception as e:
+            print(f"CRITICAL PyTorch Engine Integration Error: {e}")
+            emit(("error", {"error": str(e)}))
+        finally:
+            emit(done)
+
+    async def event_stream():
+        loop = asyncio.get_running_loop()
+        events: "asyncio.Queue" = asyncio.Queue()
+        cancelled = threading.Event()
+
+        def emit(item):
+            if not cancelled.is_set():
+                loop.call_soon_threadsafe(events.put_nowait, item)
+
+        threading.Thread(target=produce, args=(emit, cancelled), daemon=True).start()
+        try:
+            while True:
+                item = await events.get()
+                if item is done:
+                    break
+                yield _sse(*item)
+        finally:
+            # Runs on completion and when the client disconnects (the generator is cancelled / closed)
+            cancelled.set()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/skill-assessment/what-if")
+def what_if(data: WhatIfData, db: Session = Depends(get_db), authorization: str = Header(None)):
+    """
+    Re-runs the signed-in user's last assessment with a few answers changed, recomputing only
+    the affected sections. Returns the bundle keys that changed and their new values.
+    """
+    if engine is None:
+        raise HTTPException(status_code=503, detail="Recommendation engine not loaded")
+    # What-if state is keyed by the verified account, never by anything the client sends
+    session_id = _token_email(authorization)
+    if not session_id:
+        raise HTTPException(status_code=401, detail="Missing or invalid authentication token")
+
+    changes = {WHAT_IF_QUIZ_FIELDS.get(k, k): v for k, v in data.changes.items()}
+    try:
+        result = engine.what_if(session_id, changes)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        print(f"CRITICAL PyTorch Engine Integration Error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    bundle = result["bundle"]
+    # Lite bundles are screen-specific; only a full bundle replaces the stored one
+    if result["full_bundle"]:
+        _attach_mentor(bundle, bundle["career_snapshot"]["target_role"])
+        _persist_bundle(db, authorization, bundle)
+
+    return {
+        "success": True,
+        "changed_sections": result["changed_sections"],
+        "changes": {k: bundle[k] for k in result["changed_sections"] if k in bundle},
+        "recomputed_sections": result["recomputed_sections"],
+        "section_timings": bundle.get("section_timings", {}),
+    }
+
+
+def _run_batch(job: Dict[str, Any], data: BatchQuizData):
+    job["status"] = "running"
+    job["started"] = time.time()
+    try:
+        items = []
+        for quiz in data.items:
+            items.append({"assessment_vector": _build_assessment_vector(quiz), "target_job": _target_job(quiz)})
+            job["profiled"] = len(items)
+
+        bundles = engine.get_recommendations_batch(
+            items, sections=data.sections, progress=lambda done, total: job.update(done=done)
+        )
+        results = []
+        for quiz, item, bundle in zip(data.items, items, bundles):
+            _attach_mentor(bundle, item["target_job"])
+            results.append({"name": quiz.name, "email": quiz.email, "career": item["target_job"], "bundle": bundle})
+        job["results"] = results
+        job["status"] = "completed"
+    except Exception as e:
+        print(f"CRITICAL PyTorch Engine Integration Error (batch {job['job_id']}): {e}")
+        job["error"] = str(e)
+        job["status"] = "failed"
+    finally:
+        job["finished"] = time.time()
+
+
+@router.post("/skill-assessment/batch", status_code=202)
+def submit_batch(data: BatchQuizData, authorization: str = Header(None)):
+    """
+    Cohort processing for class lists: queues one job for up to BATCH_MAX_ITEMS assessments,
+    which the engine encodes and searches in batch. Poll GET /skill-assessment/batch/{job_id}
+    (as the same user) for progress.
+    """
+    if engine is None:
+        raise HTTPException(status_code=503, detail="Recommendation engine not loaded")
+    # Results carry every student's name and email; only the submitter may read them back
+    owner = _token_email(authorization)
+    if not owner:
+        raise HTTPException(status_code=401, detail="Missing or invalid authentication token")
+    if not data.items:
+        raise HTTPException(status_code=400, detail="No assessments in batch")
+    try:
+        engine.resolve_bundle_keys(data.sections)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    now = time.time()
+    job_id = uuid.uuid4().hex
+    job = {
+        "job_id": job_id, "owner": owner, "status": "queued", "total": len(data.items), "profiled": 0, "done": 0,
+        "results": None, "error": None, "created": now, "started": None, "finished": None,
+    }
+    with BATCH_JOBS_LOCK:
+        for old_id in [k for k, j in BATCH_JOBS.items() if j["finished"] and now - j["finished"] > BATCH_JOB_TTL_S]:
+            del BATCH_JOBS[old_id]
+        if sum(1 for j in BATCH_JOBS.values() if j["status"] in ("queued", "running")) >= BATCH_MAX_PENDING:
+            raise HTTPException(status_code=429, detail="Too many batch jobs in progress; retry later",
+                                headers={"Retry-After": "30"})
+        BATCH_JOBS[job_id] = job
+    BATCH_EXECUTOR.submit(_run_batch, job, data)
+    return {"job_id": job_id, "status": "queued", "total": job["total"], "status_url": f"/api/skill-assessment/batch/{job_id}"}
+
+
+@router.get("/skill-assessment/batch/{job_id}")
+def batch_status(job_id: str, authorization: str = Header(None)):
+    owner = _token_email(authorization)
+    if not owner:
+        raise HTTPException(status_code=401, detail="Missing or invalid authentication token")
+    job = BATCH_JOBS.get(job_id)
+    # Someone else's job is reported as unknown rather than forbidden
+    if job is None or job["owner"] != owner:
+        raise HTTPException(status_code=404, detail="Unknown batch job")
+    response = {
+        "job_id": job_id,
+        "status": job["status"],
+        "progress": {"profiled": job["profiled"], "done": job["done"], "total": job["total"]},
+        "error": job["error"],
+    }
+    if job["started"]:
+        response["elapsed_s"] = round((job["finished"] or time.time()) - job["started"], 2)
+    if job["status"] == "completed":
+        response["results"] = job["results"]
+    return FastJSONResponse(response)
@@ -0,0 +1,98 @@
+"""
+Fast JSON serialization for the large bundle responses.
+
+orjson when installed (several times faster than stdlib json on the nested
+bundle dicts, and numpy-aware), stdlib json otherwise. Bundles are stored on
+the profile already serialized, so they can be spliced into a response as raw
+bytes instead of being parsed and re-serialized on every read. dumps_stored
+marks what it writes with STORED_JSON_MARK: a marked value was checked to be a
+complete JSON object when it was written, so readers splice it without parsing.
+"""
+import json
+from typing import Any, Dict, Optional
+
+from fastapi.responses import JSONResponse, Response
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+def _default(obj: Any):
+    # numpy scalars / tensors that slipped into a bundle, sets, Paths, ...
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    return str(obj)
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    if HAS_ORJSON:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def dumps_text(obj: Any) -> str:
+    """Serialized form stored in text columns such as UserProfile.last_bundle."""
+    return dumps_bytes(obj).decode("utf-8")
+
+
+def loads(data: Any) -> Any:
+    return orjson.loads(data) if HAS_ORJSON else json.loads(data)
+
+
+STORED_JSON_MARK = "json1:"
+
+
+def dumps_stored(obj: Dict[str, Any]) -> str:
+    """Marked form stored in text columns such as UserProfile.last_bundle; see stored_raw()."""
+    if not isinstance(obj, dict):
+        raise TypeError(f"Only JSON objects are stored, not {type(obj).__name__}")
+    if HAS_ORJSON:
+        # orjson only ever emits valid JSON (NaN / Infinity become null)
+        return STORED_JSON_MARK + dumps_text(obj)
+    # stdlib json writes NaN / Infinity, which are not JSON; null them the way orjson does
+    cleaned = json.loads(dumps_text(obj), parse_constant=lambda constant: None)
+    return STORED_JSON_MARK + json.dumps(cleaned, ensure_ascii=False, separators=(",", ":"), allow_nan=False)
+
+
+def stored_raw(text: Optional[str]) -> Optional[bytes]:
+    """JSON object bytes of a value written by dumps_stored, without parsing it; None for unmarked values."""
+    if text and text.startswith(STORED_JSON_MARK):
+        return text[len(STORED_JSON_MARK):].encode("utf-8")
+    return None
+
+
+def load_legacy_object(text: Optional[str]) -> Optional[Dict[str, Any]]:
+    """
+    Parses an unmarked value written before dumps_stored (plain json.dumps output, possibly with NaN).
+    None when it is not a complete JSON object, e.g. a truncated row.
+    """
+    try:
+        value = json.loads(text or "")
+    except ValueError:
+        return None
+    return value if isinstance(value, dict) else None
+
+
+def splice_raw(envelope: Dict[str, Any], key: str, raw: bytes) -> bytes:
+    """Serializes `envelope` with `key` set to the already-serialized JSON value `raw`, without parsing it."""
+    body = dumps_bytes(envelope)
+    separator = b"," if envelope else b""
+    return body[:-1] + separator + dumps_bytes(key) + b":" + raw + b"}"
+
+
+class FastJSONResponse(JSONResponse):
+    """Default response class: JSONResponse rendered through dumps_bytes."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps_bytes(content)
+
+
+class RawJSONResponse(Response):
+    """For bodies that are already serialized JSON bytes."""
+
+    media_type = "application/json"
@@ -0,0 +1,205 @@
+"""
+Streaming upload buffer.
+
+Reads an UploadFile in chunks into memory, spilling to a temporary file only
+once it grows past a threshold, and computes the SHA-256 on the fly, so the
+resume cache can be keyed without a second pass over the bytes.
+
+Starlette parses (and spools) the whole multipart form before a route runs,
+so a size check in the route only sees an upload once it has been received.
+UploadLimitMiddleware therefore caps multipart bodies as they arrive: a
+declared Content-Length over the limit gets 413 before any of the body is
+read, a chunked body as soon as it crosses it. read_upload then enforces each
+route's own (possibly smaller) per-file limit.
+
+Parsers get the bytes as an in-memory stream; a real path is only materialized
+for consumers that need one (the OCR process pool) via `as_path()`.
+"""
+import hashlib
+import io
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, Optional
+
+from fastapi import HTTPException, UploadFile
+
+UPLOAD_MAX_BYTES = int(float(os.getenv("UPLOAD_MAX_MB", "10")) * 1024 * 1024)
+UPLOAD_SPOOL_BYTES = int(float(os.getenv("UPLOAD_SPOOL_MB", "4")) * 1024 * 1024)
+CHUNK_BYTES = 64 * 1024
+# Multipart boundaries, part headers and small form fields on top of the file itself
+FORM_OVERHEAD_BYTES = 64 * 1024
+
+
+def _too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(status_code=413, detail=f"File too large. Maximum size is {max_bytes // (1024 * 1024)}MB.")
+
+
+class BufferedUpload:
+    """Upload bytes + digest; in memory below spool_bytes, in a temp file above it."""
+
+    def __init__(self, filename: Optional[str] = None, spool_bytes: int = UPLOAD_SPOOL_BYTES):
+        self.filename = filename or ""
+        self.spool_bytes = spool_bytes
+        self.size = 0
+        self.path: Optional[str] = None
+        self._sha = hashlib.sha256()
+        self._digest: Optional[str] = None
+        self._buffer: Optional[io.BytesIO] = io.BytesIO()
+        self._spill: Optional[BinaryIO] = None
+        self._owns_path = False
+
+    @classmethod
+    def from_path(cls, path: str, filename: Optional[str] = None) -> "BufferedUpload":
+        """Wraps a file already on disk (e.g. a queued job's upload); the file is hashed, not copied."""
+        upload = cls(filename or os.path.basename(path))
+        upload._buffer = None
+        upload.path = path
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                upload._sha.update(chunk)
+                upload.size += len(chunk)
+        return upload
+
+    def write(self, chunk: bytes):
+        self._sha.update(chunk)
+        self.size += len(chunk)
+        if self._buffer is not None and self._buffer.tell() + len(chunk) > self.spool_bytes:
+            fd, self.path = tempfile.mkstemp(prefix="upload_", suffix=os.path.splitext(self.filename)[1].lower())
+            self._owns_path = True
+            self._spill = os.fdopen(fd, "wb")
+            self._spill.write(self._buffer.getbuffer())
+            self._buffer = None
+        (self._spill or self._buffer).write(chunk)
+
+    def finish(self):
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+        self._digest = self._sha.hexdigest()
+
+    @property
+    def digest(self) -> str:
+        return self._digest or self._sha.hexdigest()
+
+    @property
+    def in_memory(self) -> bool:
+        return self._buffer is not None
+
+    def getvalue(self) -> bytes:
+        if self._buffer is not None:
+            return self._buffer.getvalue()
+        with open(self.path, "rb") as f:
+            return f.read()
+
+    def open(self) -> BinaryIO:
+        """A fresh readable stream over the upload (pdfplumber, python-docx, fitz, Cloudinary accept it)."""
+        if self._buffer is not None:
+            return io.BytesIO(self._buffer.getbuffer())
+        return open(self.path, "rb")
+
+    def save(self, path: str):
+        with self.open() as src, open(path, "wb") as dst:
+            while chunk := src.read(1 << 20):
+                dst.write(chunk)
+
+    @contextmanager
+    def as_path(self, suffix: str = "") -> Iterator[str]:
+        """A filesystem path for the upload: the spill file when there is one, else a short-lived temp copy."""
+        if self.path is not None:
+            yield self.path
+            return
+        fd, path = tempfile.mkstemp(prefix="upload_", suffix=suffix)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(self._buffer.getbuffer())
+            yield path
+        finally:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def close(self):
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+        if self._owns_path and self.path:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+            self._owns_path = False
+        self._buffer = None
+
+    def __enter__(self) -> "BufferedUpload":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+async def read_upload(file: UploadFile, max_bytes: int = UPLOAD_MAX_BYTES,
+                      spool_bytes: int = UPLOAD_SPOOL_BYTES, allow_empty: bool = False) -> BufferedUpload:
+    """
+    Streams `file` into a BufferedUpload. Raises 413 once more than max_bytes have been read
+    and 400 for an empty upload; the caller owns (and must close) the returned buffer.
+    """
+    upload = BufferedUpload(file.filename, spool_bytes)
+    try:
+        while chunk := await file.read(CHUNK_BYTES):
+            if upload.size + len(chunk) > max_bytes:
+                raise _too_large(max_bytes)
+            upload.write(chunk)
+        if not upload.size and not allow_empty:
+            raise HTTPException(status_code=400, detail="Empty upload")
+        upload.finish()
+        return upload
+    except BaseException:
+        upload.close()
+        raise
+
+
+class UploadLimitMiddleware:
+    """ASGI middleware capping multipart/form-data request bodies at max_bytes while they are received."""
+
+    def __init__(self, app, max_bytes: int = UPLOAD_MAX_BYTES, overhead_bytes: int = FORM_OVERHEAD_BYTES):
+        self.app = app
+        self.max_bytes = max_bytes
+        self.limit = max_bytes + overhead_bytes
+
+    async def __call__(self, scope, receive, send):
+        headers = dict(scope.get("headers", [])) if scope["type"] == "http" else {}
+        if not headers.get(b"content-type", b"").startswith(b"multipart/form-data"):
+            await self.app(scope, receive, send)
+            return
+
+        declared = headers.get(b"content-length")
+        if declared is not None and declared.isdigit() and int(declared) > self.limit:
+            await self._reject(send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.limit:
+                    # Raised inside the form parser, so the app turns it into the 413 response
+                    raise _too_large(self.max_bytes)
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+    async def _reject(self, send):
+        body = json.dumps({"detail": _too_large(self.max_bytes).detail}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode()),
+                        (b"connection", b"close")],
+        })
+        await send({"type": "http.response.body", "body": body})
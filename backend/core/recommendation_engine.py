@@ -3,11 +3,15 @@ import numpy as np
 import sys
 import json
 import re
+import time
+import threading
+import hashlib
 import torch
 import fitz
 from sentence_transformers import SentenceTransformer, util
 from pathlib import Path
 import traceback
+import atexit
 from typing import List, Dict, Any, Optional
 from pymongo import MongoClient
 from dotenv import load_dotenv
@@ -1852,14 +1856,82 @@ try:
     from .logic.analytics import Analytics
     from .logic.recommenders import Recommender
     from .logic.action_plan import ActionPlanGenerator
+    from .logic.transferability import RoleTransferabilityMatrix
+    from .logic.skill_index import SkillCourseIndex
+    from .logic.skill_canonicalizer import SkillCanonicalizer, compact_key
+    from .logic.vector_shards import ShardedVectorIndex
+    from .logic.bundle_executor import BundleExecutor
+    from .logic.bundle_cache import BundleCache
+    from .logic.bundle_state import BundleStateStore, diff_bundles
+    from .logic.singleflight import SingleFlight
+    from .logic.resume_cache import ResumeCache
+    from .logic.ocr_pool import OCRPool
+    from .logic.ats_matcher import ATSMatcher
 except (ImportError, ValueError):
     from logic.rule_engine import RuleEngine
     from logic.analytics import Analytics
     from logic.recommenders import Recommender
     from logic.action_plan import ActionPlanGenerator
+    from logic.transferability import RoleTransferabilityMatrix
+    from logic.skill_index import SkillCourseIndex
+    from logic.skill_canonicalizer import SkillCanonicalizer, compact_key
+    from logic.vector_shards import ShardedVectorIndex
+    from logic.bundle_executor import BundleExecutor
+    from logic.bundle_cache import BundleCache
+    from logic.bundle_state import BundleStateStore, diff_bundles
+    from logic.singleflight import SingleFlight
+    from logic.resume_cache import ResumeCache
+    from logic.ocr_pool import OCRPool
+    from logic.ats_matcher import ATSMatcher
 
 
 class RecommendationEngine:
+    # Bundle key -> sections it is built from (legacy keys without sections come from the shared prelude)
+    BUNDLE_KEY_SECTIONS = {
+        "career_snapshot": ["readiness", "action_roadmap", "skill_intelligence"],
+        "career_path_recommendation": ["career_path_recommendation"],
+        "skill_intelligence": ["skill_intelligence"],
+        "skill_gap_insights": ["skill_intelligence"],
+        "recommended_education": ["courses"],
+        "skill_gap_courses": ["courses"],
+        "gap_closing_courses": ["gap_closing_courses"],
+        "job_opportunities": ["jobs"],
+        "salary_intelligence": ["salary_intelligence"],
+        "market_demand": ["market_demand"],
+        "mentor_recommendations": ["mentor_recommendations"],
+        "action_roadmap": ["action_roadmap"],
+        "ai_explainability": ["ai_explainability"],
+        "status": [],
+        "mapped_occupation": [],
+        "skill_gap": [],
+        "recommendations": ["courses"],
+        "caveats": ["skill_intelligence"],
+        "ml_diagnostics": ["ml_diagnostics"],
+    }
+
+    # Lite bundles for screens that only need a few fields
+    BUNDLE_PRESETS = {
+        "full": None,
+        "chatbot": ["recommendations", "job_opportunities", "skill_gap", "mapped_occupation"],
+        "dashboard": ["career_snapshot", "skill_gap_insights", "recommended_education", "skill_gap_courses", "recommendations"],
+        "courses": ["recommended_education", "skill_gap_courses", "gap_closing_courses", "recommendations"],
+    }
+
+    # What-if edits: assessment vector field -> sections that read it directly (dependents are added by the executor)
+    WHAT_IF_FIELD_SECTIONS = {
+        "education_preference": ["courses"],
+        "time_commitment": ["action_roadmap", "ml_diagnostics"],
+        "budget_category": ["ml_diagnostics"],
+        "experience_years": ["readiness", "action_roadmap", "ml_diagnostics"],
+        "normalized_soft_skills": [],
+    }
+    # Assessment vector fields the shared prelude reads; editing one forces a full recompute
+    WHAT_IF_PRELUDE_FIELDS = ("extracted_intent_skills", "domain", "status_level", "education_level",
+                              "highest_education", "responsibility_band")
+
+    # Sections whose last computed value (per target role + domain) may stand in when a request runs out of time
+    LAST_GOOD_SECTIONS = ("alternate_paths", "salary_intelligence", "market_demand")
+
     def __init__(self, jobs_path=None, courses_path=None, esco_dir=None, models_dir=None, force_refresh=False, show_progress=True, from_mongo=False):
         # Global Root Detection (Relative to core/)
         self.ml_root = Path(__file__).resolve().parent.parent
@@ -1882,6 +1954,14 @@ class RecommendationEngine:
         self._trend_cache = {}
         self.onet_taxonomy = []
         self.onet_map = {}
+        self.transferability = None
+        self.course_skill_df = pd.DataFrame(columns=["course_title", "skill_label", "relevance_score"])
+        self.skill_index = None
+        self.skill_canonicalizer = None
+        self._skill_alias_flush_registered = False
+        self.course_shards = None
+        self.academic_shards = None
+        self.job_shards = None
 
         # ── Phase 10: Modular Logic Initialisation (Broken to Parts) ──
         self.rule_engine = RuleEngine()
@@ -1889,6 +1969,43 @@ class RecommendationEngine:
         self.recommender = Recommender(self)
         self.action_plan_gen = ActionPlanGenerator()
 
+        # Dependency-aware, concurrent bundle section execution
+        self.bundle_executor = BundleExecutor(max_workers=int(os.getenv("BUNDLE_WORKERS", "4")))
+        self._register_bundle_sections()
+
+        # Fingerprint-keyed assessment bundle cache (invalidated on every data load)
+        self.dataset_version = ""
+        self.bundle_cache = BundleCache(
+            max_entries=int(os.getenv("BUNDLE_CACHE_SIZE", "256")),
+            disk_path=os.getenv("BUNDLE_CACHE_DB") or None
+        )
+        # SHA-256 keyed cache of parsed resumes (text, OCR output, sections, skills)
+        self.resume_cache = ResumeCache(
+            max_entries=int(os.getenv("RESUME_CACHE_SIZE", "128")),
+            disk_dir=os.getenv("RESUME_CACHE_DIR") or None,
+            max_disk_bytes=int(os.getenv("RESUME_CACHE_MAX_MB", "256")) * 1024 * 1024
+        )
+        # Process pool for OCR of scanned resumes (capped so it cannot starve the recommendation endpoints)
+        self.ocr_pool = OCRPool(
+            max_workers=int(os.getenv("OCR_WORKERS", "0")) or None,
+            dpi=int(os.getenv("OCR_DPI", "200")),
+            page_timeout_s=float(os.getenv("OCR_PAGE_TIMEOUT_S", "30")),
+            max_concurrent_jobs=int(os.getenv("OCR_MAX_JOBS", "2"))
+        )
+        # Resume x jobs ATS matrices (built on first use per dataset version)
+        self._ats_matcher = None
+        self._ats_lock = threading.Lock()
+        # Coalesces identical concurrent computations (trends, alternate paths, bundles)
+        self.singleflight = SingleFlight()
+
+        # Last bundle run per session, for incremental what-if recomputes
+        self.bundle_states = BundleStateStore(max_entries=int(os.getenv("BUNDLE_STATE_SIZE", "128")))
+
+        # Deadline degradation: last good section values and per-section fallback counters
+        self._section_last_good = {}
+        self._degradation_lock = threading.Lock()
+        self.degradation_stats = {"bundles": 0, "degraded_bundles": 0, "sections": {}}
+
         # Shortcuts for backward compatibility or internal use
         self.domain_clusters = self.rule_engine.DOMAIN_CLUSTERS
         self.edu_levels = self.rule_engine.EDU_LEVELS
@@ -1965,6 +2082,7 @@ class RecommendationEngine:
                 self.onet_taxonomy = cache_data.get("onet", [])
                 self.esco_occ = cache_data.get("esco_occ", pd.DataFrame(columns=["preferredLabel", "conceptUri"]))
                 self.esco_skills = cache_data.get("esco_skills", pd.DataFrame(columns=["preferredLabel", "conceptUri"]))
+                self.course_skill_df = cache_data.get("skill_matrix", pd.DataFrame(columns=["course_title", "skill_label", "relevance_score"]))
                 self.occ_skill_rel = pd.DataFrame(columns=["occupationUri", "skillUri", "relationType"])
                 self.broader_occ = pd.DataFrame(columns=["conceptUri", "broaderUri"])
                 
@@ -2003,6 +2121,7 @@ class RecommendationEngine:
             # Load Courses
             self.courses_df = pd.DataFrame(list(db.courses.find({}, {'_id': 0})))
             self.academic_df = pd.DataFrame(list(db.courses_academic.find({}, {'_id': 0})))
+            self.course_skill_df = pd.DataFrame(list(db.course_skill_matrix.find({}, {'_id': 0})))
 
             # Standardization Helper for Courses
             for df in [self.courses_df, self.academic_df]:
@@ -2084,7 +2203,8 @@ class RecommendationEngine:
                     "questions": self.assessment_questions,
                     "onet": self.onet_taxonomy,
                     "esco_occ": self.esco_occ,
-                    "esco_skills": self.esco_skills
+                    "esco_skills": self.esco_skills,
+                    "skill_matrix": self.course_skill_df
                 }
                 with open(cache_path, "wb") as f:
                     pickle.dump(cache_data, f)
@@ -2099,6 +2219,7 @@ class RecommendationEngine:
             self.jobs_df = pd.DataFrame()
             self.courses_df = pd.DataFrame(columns=["course_title", "provider", "category", "description"])
             self.academic_df = pd.DataFrame(columns=["course_title", "provider", "category", "description"])
+            self.course_skill_df = pd.DataFrame(columns=["course_title", "skill_label", "relevance_score"])
             self.mentors_data = []
             self.career_progressions_df = pd.DataFrame()
             self.salary_mapping = {"roles": {}, "sectors": {}}
@@ -2118,6 +2239,7 @@ class RecommendationEngine:
             self.jobs_df = pd.DataFrame()
             self.courses_df = pd.DataFrame()
             self.academic_df = pd.DataFrame()
+            self.course_skill_df = pd.DataFrame(columns=["course_title", "skill_label", "relevance_score"])
             self.mentors_data = []
             self.career_progressions_df = pd.DataFrame()
             self.salary_mapping = {"roles": {}, "sectors": {}}
@@ -2178,6 +2300,14 @@ class RecommendationEngine:
         if self.academic_df.empty:
             if self.show_progress: print("Note: No academic courses found in standalone file or unified dataset.")
 
+        # 3. Course x Skill Matrix (feeds the inverted skill -> course index)
+        skill_matrix_path = Path(courses_path).parent / "course_skill_matrix.csv"
+        if skill_matrix_path.exists():
+            self.course_skill_df = pd.read_csv(skill_matrix_path)
+            if self.show_progress: print(f"Loaded {len(self.course_skill_df)} course-skill links ({skill_matrix_path.name}).")
+        else:
+            self.course_skill_df = pd.DataFrame(columns=["course_title", "skill_label", "relevance_score"])
+
         # 1. Primary High-Fidelity Config (Calibrated LKR)
         # RELATIVE PATH from this file (core/recommendation_engine.py)
         # Path is ../data/config/salary_config.json
@@ -2312,6 +2442,8 @@ class RecommendationEngine:
         
         # Remove duplicates and extremely short terms (e.g. "it", "at") to avoid noisy matching
         self.market_skills = list(set([s for s in self.market_skills if isinstance(s, str) and len(s) > 3]))
+        # Collapse spelling variants ("react.js" / "reactjs") onto one entry
+        self.market_skills = list({compact_key(s): s for s in sorted(self.market_skills)}.values())
             
         #  Initialize Trend Analyzer
         try:
@@ -2327,6 +2459,19 @@ class RecommendationEngine:
         #  Load or Build Embeddings
         self._load_or_build_embeddings(models_path, force_refresh, courses_path)
 
+        #  Domain / Level Partitioned Vector Shards
+        self._build_vector_shards()
+
+        #  Role x Role Transferability Matrix (refreshed per data release)
+        self._load_or_build_transferability(models_path, force_refresh)
+
+        #  Skill Canonicalization + Inverted Skill -> Course Index (from course_skill_matrix)
+        self._build_skill_index(models_path)
+
+        #  Dataset Version (bundles cached against older data are dropped)
+        self.dataset_version = self._compute_dataset_version()
+        self.bundle_cache.invalidate(self.dataset_version)
+
         # ── Load / Train Hybrid ML Layer ──────────────────────────────────────
         # Augments SBERT with structured ML signal (RF + GBM + KNN)
         self.ml_layer = None
@@ -2506,6 +2651,195 @@ class RecommendationEngine:
             self.job_embs = None
             self.job_titles_list = []
 
+    def _compute_dataset_version(self) -> str:
+        """Hash of every dataset a bundle is derived from; changes on any data release."""
+        h = hashlib.sha1(RoleTransferabilityMatrix.fingerprint(self.jobs_df).encode("utf-8"))
+        for df in (self.courses_df, self.academic_df, self.course_skill_df):
+            if df is None or df.empty:
+                h.update(b"\x1d")
+                continue
+            h.update(pd.util.hash_pandas_object(df.astype(str), index=False).values.tobytes())
+        h.update(json.dumps(self.mentors_data, sort_keys=True, default=str).encode("utf-8"))
+        return h.hexdigest()
+
+    def _load_or_build_transferability(self, models_path, force_refresh):
+        """Loads the precomputed role transferability matrix, rebuilding it when the jobs data changed."""
+        matrix_file = models_path / "role_transferability.pkl"
+        version = RoleTransferabilityMatrix.fingerprint(self.jobs_df)
+        if version == "empty":
+            self.transferability = None
+            return
+
+        matrix = None if force_refresh else RoleTransferabilityMatrix.load(matrix_file, expected_version=version)
+        if matrix is not None:
+            if self.show_progress: print(f"Loading pre-computed role transferability matrix from {matrix_file}")
+        else:
+            try:
+                matrix = RoleTransferabilityMatrix.build(self.jobs_df, self.model, show_progress=self.show_progress)
+                matrix.save(matrix_file)
+            except Exception as e:
+                if self.show_progress: print(f"Warning: Transferability matrix build failed: {e}")
+                matrix = None
+        self.transferability = matrix if matrix is not None and len(matrix) > 1 else None
+
+    def _build_skill_index(self, models_path):
+        """Builds the skill canonicalizer and the skill -> ranked courses index over the professional pool."""
+        if self.course_skill_df is None or self.course_skill_df.empty:
+            local_matrix = self.ml_root / "data" / "processed" / "course_skill_matrix.csv"
+            if local_matrix.exists():
+                self.course_skill_df = pd.read_csv(local_matrix)
+
+        extra_labels = self.course_skill_df["skill_label"].dropna().tolist() if "skill_label" in self.course_skill_df.columns else []
+        # A rebuild (data reload) replaces the canonicalizer; flush what the old one resolved first
+        self._save_skill_aliases()
+        if not self._skill_alias_flush_registered:
+            atexit.register(self._save_skill_aliases)
+            self._skill_alias_flush_registered = True
+        try:
+            self.skill_canonicalizer = SkillCanonicalizer(
+                self.model, self.esco_skills, extra_labels,
+                models_path=models_path, show_progress=self.show_progress
+            )
+        except Exception as e:
+            if self.show_progress: print(f"Warning: Skill canonicalizer failed: {e}")
+            self.skill_canonicalizer = None
+
+        skill_key = self.skill_canonicalizer.key if self.skill_canonicalizer is not None else None
+        try:
+            index = SkillCourseIndex(self.course_skill_df, self.courses_df, skill_key=skill_key)
+        except Exception as e:
+            if self.show_progress: print(f"Warning: Skill index build failed: {e}")
+            index = None
+        self.skill_index = index if index is not None and len(index) > 0 else None
+        if self.skill_index is not None and self.show_progress:
+            print(f"Skill -> course index ready ({len(self.skill_index)} skill keys).")
+
+    def _save_skill_aliases(self):
+        if self.skill_canonicalizer is not None:
+            try:
+                self.skill_canonicalizer.save()
+            except Exception as e:
+                if self.show_progress: print(f"Warning: Skill alias cache save failed: {e}")
+
+    def find_gap_closing_courses(self, missing_skills, max_courses=5, segment="Professional", user_level=3, assessment_vector=None):
+        """
+        Deterministic gap closing: greedy set cover over the inverted skill index.
+        Returns the minimal course set covering the gap plus the skills it leaves uncovered
+        (no indexed course teaches them, or max_courses was reached first).
+        """
+        if self.skill_index is None or not missing_skills:
+            return {"courses": [], "uncovered_skills": list(missing_skills or [])}
+
+        av = assessment_vector or {}
+        if self.skill_canonicalizer is not None:
+            self.skill_canonicalizer.resolve_many(list(missing_skills))  # one batched lookup warms the alias cache
+        picks, uncovered = self.skill_index.cover(list(missing_skills), max_courses=max_courses)
+        courses = []
+        for pick in picks:
+            course = self.courses_df.iloc[pick["course_idx"]].to_dict()
+            rec = self._process_one_course(
+                course, pick["strength"], segment, user_level,
+                av.get("location"), av.get("max_budget"), av.get("max_duration"),
+                pick["covers"], assessment_vector=av
+            )
+            if rec is None:
+                continue
+            rec["covers_skills"] = pick["covers"]
+            rec["coverage_strength"] = pick["strength"]
+            courses.append(rec)
+        return {"courses": courses, "uncovered_skills": uncovered}
+
+    def canonicalize_skills(self, skills, allow_semantic=True):
+        """Deduplicated [{raw, id, label}] for raw skill strings (ESCO id where resolvable)."""
+        if self.skill_canonicalizer is None:
+            seen, result = set(), []
+            for s in skills:
+                key = str(s).strip().lower()
+                if key and key not in seen:
+                    seen.add(key)
+                    result.append({"raw": s, "id": None, "label": str(s).strip()})
+            return result
+        return self.skill_canonicalizer.canonicalize(list(skills), allow_semantic=allow_semantic)
+
+    def _build_vector_shards(self):
+        """Partitions course stores by (domain, level) and the job store by domain."""
+        def course_keys(df):
+            durations = df["duration"] if "duration" in df.columns else ["N/A"] * len(df)
+            return [
+                (self._infer_domain(str(title).lower()), self.classify_course_level(str(title), str(dur)))
+                for title, dur in zip(df["course_title"], durations)
+            ]
+
+        stores = [
+            ("course_shards", "course_embs", self.courses_df, course_keys),
+            ("academic_shards", "academic_embs", self.academic_df, course_keys),
+            ("job_shards", "job_embs", self.jobs_df, lambda df: [(self._infer_domain(t), "Job") for t in df["title"].fillna("")]),
+        ]
+        for attr, emb_attr, df, key_fn in stores:
+            embs = getattr(self, emb_attr, None)
+            try:
+                shards = ShardedVectorIndex(embs, key_fn(df)) if embs is not None and df is not None and not df.empty else None
+            except Exception as e:
+                if self.show_progress: print(f"Warning: {attr} build failed ({e}); using the full store.")
+                shards = None
+            setattr(self, attr, shards)
+            if shards is not None and self.show_progress:
+                print(f"[Shards] {emb_attr}: {len(shards.shards)} shards over {len(shards)} rows")
+
+    @staticmethod
+    def _course_passes_rules(course_domain, course_level, user_domain, user_edu_lvl):
+        """Rule Engine invariants for a course: domain isolation + qualification floor."""
+        if user_domain != "General" and course_domain != "General" and course_domain != user_domain:
+            return False
+        lvl = str(course_level).lower()
+        edu_val = 1
+        if "diploma" in lvl: edu_val = 3
+        elif "degree" in lvl or "bachelor" in lvl or "bsc" in lvl: edu_val = 4
+        elif "master" in lvl or "postgraduate" in lvl or "msc" in lvl: edu_val = 5
+        # Professional certifications/short courses are exempt from the qualification floor
+        is_professional = "professional" in lvl or "certification" in lvl
+        return is_professional or edu_val >= user_edu_lvl
+
+    def _search_store(self, query_emb, shards, embs, top_k, min_score, shard_filter=None):
+        """Shard-targeted semantic search, falling back to the whole store when unsharded."""
+        if shards is not None:
+            return shards.search(query_emb, top_k, shards.select(shard_filter), min_score=min_score)
+        hits = util.semantic_search(query_emb, embs, top_k=top_k)[0]
+        return [h for h in hits if h["score"] >= min_score]
+
+    def _search_store_many(self, query_embs, shards, embs, top_k, min_score, shard_filters):
+        """
+        Batched _search_store: one (N x M) cosine matrix product for all queries, then a
+        per-query top-k restricted to the rows of that query's selected shards.
+        """
+        scores = util.cos_sim(query_embs, embs)
+        rows_by_keys = {}
+        out = []
+        for i, shard_filter in enumerate(shard_filters):
+            if shards is not None:
+                keys = tuple(shards.select(shard_filter))
+                if keys not in rows_by_keys:
+                    rows_by_keys[keys] = shards.row_ids(list(keys)).to(scores.device)
+                rows = rows_by_keys[keys]
+            else:
+                rows = torch.arange(scores.shape[1], device=scores.device)
+            k = min(top_k, len(rows))
+            if k == 0:
+                out.append([])
+                continue
+            vals, idx = torch.topk(scores[i, rows], k)
+            out.append([
+                {"corpus_id": int(rows[j]), "score": v}
+                for v, j in zip(vals.tolist(), idx.tolist()) if v >= min_score
+            ])
+        return out
+
+    def get_transferable_roles(self, role_title, top_n=5):
+        """Row lookup into the role transferability matrix (Jaccard + embedding similarity)."""
+        if self.transferability is None:
+            return []
+        return self.transferability.row(role_title, top_n=top_n)
+
     def get_salary_for_role(self, role_title, experience_level="Entry"):
         """Retrieves salary range from config (fuzzy match)"""
         if not hasattr(self, "salary_mapping") or not self.salary_mapping:
@@ -2735,22 +3069,190 @@ class RecommendationEngine:
         # Professionals (> 0 exp or status level 3) should usually bypass internships
         return exp == 0 and status <= 1
 
-    def get_recommendations_from_assessment(self, assessment_vector: Dict[str, Any], target_job: str):
+    def get_recommendations_from_assessment(self, assessment_vector: Dict[str, Any], target_job: str, sections=None, on_section=None,
+                                            session_id=None, deadline_ms=None):
         """
         Phase 7: Production Entry Point (V3 Gold).
-        Returns the definitive 11-Point Dashboard Bundle.
+        Returns the definitive 11-Point Dashboard Bundle, or only the requested
+        `sections` (bundle keys or a BUNDLE_PRESETS name such as "dashboard").
+        With a `session_id` the run is remembered so `what_if` can later apply edits incrementally.
+        With `deadline_ms`, sections not done within the budget are served as placeholders
+        and listed under "degraded_sections".
         """
-        user_skills = assessment_vector.get("extracted_intent_skills", [])
-        
-        # recommend_courses now orchestrates the entire V3 Gold Bundle internally
-        bundle = self.recommend_courses(
-            user_skills=user_skills,
-            target_job=target_job,
-            top_n=8,
-            assessment_vector=assessment_vector
-        )
+        started = time.perf_counter()
+        deadline = started + deadline_ms / 1000 if deadline_ms else None
+        cache_key = self.bundle_cache.fingerprint(assessment_vector, target_job, sections)
+        cached = self.bundle_cache.get(cache_key)
+        if cached is not None:
+            cached["section_timings"] = {"total": round((time.perf_counter() - started) * 1000, 1), "cache_hit": True}
+            return self._serve_shared_bundle(cached, assessment_vector, target_job, sections, on_section, session_id)
+
+        def compute():
+            user_skills = assessment_vector.get("extracted_intent_skills", [])
+
+            # recommend_courses now orchestrates the entire V3 Gold Bundle internally
+            bundle = self.recommend_courses(
+                user_skills=user_skills,
+                target_job=target_job,
+                top_n=8,
+                assessment_vector=assessment_vector,
+                sections=sections,
+                on_section=on_section,
+                session_id=session_id,
+                deadline=deadline
+            )
+            if not bundle.get("degraded_sections"):
+                self.bundle_cache.put(cache_key, bundle)
+            return bundle
+
+        # Identical assessments in flight at the same time are computed once. The budget is part of the
+        # key: a caller with a longer deadline must not be handed a bundle degraded under a shorter one.
+        bundle, shared = self.singleflight.do(("bundle", cache_key, deadline_ms or None), compute)
+        if shared:
+            bundle["section_timings"] = {"total": round((time.perf_counter() - started) * 1000, 1), "coalesced": True}
+            return self._serve_shared_bundle(bundle, assessment_vector, target_job, sections, on_section, session_id)
+        return bundle
+
+    def get_recommendations_batch(self, items: List[Dict[str, Any]], sections=None, progress=None) -> List[Dict[str, Any]]:
+        """
+        Cohort variant of get_recommendations_from_assessment.
+        items: [{"assessment_vector": {...}, "target_job": "..."}]. All queries are encoded in one
+        batched forward pass and searched with one matrix product per embedding store; the
+        per-user section scoring then reuses those candidates. Bundles come back in input order.
+        progress(done, total) is called as each bundle completes.
+        """
+        total = len(items)
+        bundles: List[Optional[Dict[str, Any]]] = [None] * total
+        keys = self.resolve_bundle_keys(sections)
+        wanted = None if keys is None else {s for k in keys for s in self.BUNDLE_KEY_SECTIONS[k]}
+        planned = self.bundle_executor.plan(wanted)
+        done = 0
+
+        # 1. Bundle cache
+        cache_keys, misses = [], []
+        for i, item in enumerate(items):
+            cache_key = self.bundle_cache.fingerprint(item["assessment_vector"], item["target_job"], sections)
+            cache_keys.append(cache_key)
+            cached = self.bundle_cache.get(cache_key)
+            if cached is not None:
+                cached["section_timings"] = {"total": 0.0, "cache_hit": True}
+                bundles[i] = cached
+                done += 1
+                if progress is not None:
+                    progress(done, total)
+            else:
+                misses.append(i)
+        if not misses:
+            return bundles
+
+        # 2. Per-user prelude, then one batched encode of every query
+        started = time.perf_counter()
+        ctxs = {}
+        for i in misses:
+            av = items[i]["assessment_vector"] or {}
+            ctxs[i] = self._prepare_bundle_context(
+                av.get("extracted_intent_skills", []), items[i]["target_job"], "Entry", "Student", None,
+                None, None, None, 8, av, encode=False
+            )
+        query_embs = self.model.encode([ctxs[i]["query"] for i in misses], convert_to_tensor=True, batch_size=64)
+        for row, i in enumerate(misses):
+            ctxs[i]["query_emb"] = query_embs[row]
+
+        # 3. One matrix product per embedding store for the whole cohort
+        reuse = {i: {} for i in misses}
+        miss_ctxs = [ctxs[i] for i in misses]
+        if "course_hits" in planned:
+            filters = [self._course_shard_filter(c) for c in miss_ctxs]
+            pools = [("professional", self.course_shards, self.course_embs)]
+            if getattr(self, "academic_embs", None) is not None:
+                pools.append(("academic", self.academic_shards, self.academic_embs))
+            for i in misses:
+                reuse[i]["course_hits"] = []
+            for pool, shards, embs in pools:
+                hits = self._search_store_many(query_embs, shards, embs, 8 * 10, 0.28, filters)
+                for i, user_hits in zip(misses, hits):
+                    reuse[i]["course_hits"] += [(pool, h["corpus_id"], h["score"]) for h in user_hits]
+        if "job_hits" in planned and getattr(self, "job_embs", None) is not None:
+            hits = self._search_store_many(
+                query_embs, self.job_shards, self.job_embs, 8 + 3, 0.35, [self._job_shard_filter(c) for c in miss_ctxs]
+            )
+            for i, user_hits in zip(misses, hits):
+                reuse[i]["job_hits"] = user_hits
+        if self.show_progress:
+            print(f"[Batch] Encoded + searched {len(misses)} profiles in {round((time.perf_counter() - started) * 1000, 1)}ms")
+
+        # 4. Fan out the per-user scoring sections
+        for i in misses:
+            results, timings, _ = self.bundle_executor.run(ctxs[i], wanted, reuse=reuse[i])
+            bundle = self._assemble_bundle(ctxs[i], results, timings, keys)
+            self.bundle_cache.put(cache_keys[i], bundle)
+            bundles[i] = bundle
+            done += 1
+            if progress is not None:
+                progress(done, total)
+        return bundles
+
+    def _serve_shared_bundle(self, bundle, assessment_vector, target_job, sections, on_section, session_id):
+        """Serves a bundle this call did not compute (cache hit or coalesced): no context is kept for what-if."""
+        if session_id is not None:
+            args = {"user_skills": assessment_vector.get("extracted_intent_skills", []), "target_job": target_job, "top_n": 8}
+            self.bundle_states.put(session_id, args, assessment_vector, self.resolve_bundle_keys(sections), bundle)
+        if on_section is not None:
+            for key, value in bundle.items():
+                if key != "section_timings":
+                    on_section(key, value)
         return bundle
 
+    def what_if(self, session_id: str, changes: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Applies edited assessment vector fields (e.g. {"time_commitment": "20+ hours"}) to the session's
+        last bundle. The result is the bundle a fresh get_recommendations_from_assessment would return for
+        the edited vector, but only sections that read a changed field (and their dependents) are
+        recomputed; the prelude, query embedding and candidate searches are reused.
+        Returns {"bundle", "full_bundle", "changed_sections", "recomputed_sections", "reused_sections"}.
+        """
+        unknown = [k for k in changes if k not in self.WHAT_IF_FIELD_SECTIONS and k not in self.WHAT_IF_PRELUDE_FIELDS]
+        if unknown:
+            raise ValueError(f"Fields cannot be edited with what-if: {unknown}")
+        state = self.bundle_states.get(session_id)
+        if state is None:
+            raise KeyError(f"No bundle state for session '{session_id}'; run an assessment first")
+
+        old_av = state["assessment_vector"]
+        changed_fields = [k for k, v in changes.items() if old_av.get(k) != v]
+        assessment_vector = {**old_av, **changes}
+        args = dict(state["args"])
+
+        if state["ctx"] is None or any(k in self.WHAT_IF_PRELUDE_FIELDS for k in changed_fields):
+            # Prelude inputs changed (or there is no stored context): full recompute
+            args["user_skills"] = assessment_vector.get("extracted_intent_skills", [])
+            bundle = self.recommend_courses(**args, assessment_vector=assessment_vector, sections=state["keys"], session_id=session_id)
+            recomputed = [k for k in bundle["section_timings"] if k != "total"]
+            reused = []
+        else:
+            ctx = dict(state["ctx"], assessment_vector=assessment_vector)
+            planned = list(state["results"])
+            dirty = {s for k in changed_fields for s in self.WHAT_IF_FIELD_SECTIONS[k]}
+            # Placeholders from a deadline-degraded run are never reused
+            dirty |= {d["section"] for d in state["bundle"].get("degraded_sections", [])}
+            recomputed = [s for s in self.bundle_executor.dependents(dirty) if s in planned]
+            reused = [s for s in planned if s not in recomputed]
+            results, timings, _ = self.bundle_executor.run(
+                ctx, planned, reuse={s: state["results"][s] for s in reused}
+            )
+            bundle = self._assemble_bundle(ctx, results, timings, state["keys"])
+            self.bundle_states.put(session_id, args, assessment_vector, state["keys"], bundle, ctx, results)
+
+        if self.show_progress:
+            print(f"[WhatIf] {changed_fields} -> recomputed {recomputed or 'nothing'} in {bundle['section_timings']['total']}ms")
+        return {
+            "bundle": bundle,
+            "full_bundle": state["keys"] is None,
+            "changed_sections": diff_bundles(state["bundle"], bundle),
+            "recomputed_sections": recomputed,
+            "reused_sections": reused,
+        }
+
     def _get_salary_intelligence(self, domain: str, seniority: str) -> Dict[str, Any]:
         """Provides simulated local Paylab salary intelligence based on domain and seniority."""
         salary_matrix = {
@@ -3182,7 +3684,10 @@ class RecommendationEngine:
         """Suggests a target job based on skills extracted from a resume (PDF or Image)"""
         
         #  Extract skills (routes to PDF or OCR)
-        skills = self.parse_resume(resume_path)
+        return self.auto_profile_from_skills(self.parse_resume(resume_path))
+
+    def auto_profile_from_skills(self, skills):
+        """auto_profile for skills that were already extracted (e.g. by a staged resume job)"""
         if not skills:
             return {"extracted_skills": [], "suggested_target": "Unknown"}
 
@@ -3275,15 +3780,91 @@ class RecommendationEngine:
 
         return [str(s) for s in list(set(found_skills))[:15]]
 
+    def extract_resume_text(self, pdf_path, digest=None):
+        """PDF text layer, cached by the file's SHA-256. pdf_path may also be the PDF's bytes (an in-memory upload)"""
+        in_memory = isinstance(pdf_path, (bytes, bytearray))
+        digest = digest or (ResumeCache.digest_bytes(pdf_path) if in_memory else ResumeCache.digest_file(pdf_path))
+        entry = self.resume_cache.get(digest) or {}
+        if "text" in entry:
+            return entry["text"]
+        import fitz
+        text = ""
+        with (fitz.open(stream=pdf_path, filetype="pdf") if in_memory else fitz.open(pdf_path)) as doc:
+            for page in doc:
+                text += page.get_text()
+        self.resume_cache.update(digest, text=text)
+        return text
+
+    def extract_resume_skills(self, resume_text, digest=None, source="text"):
+        """parse_resume_text, cached per file digest, text source (text layer / OCR) and dataset version"""
+        skills_key = f"{self.dataset_version}:{source}"
+        if digest:
+            entry = self.resume_cache.get(digest) or {}
+            if entry.get("skills_key") == skills_key:
+                return entry["skills"]
+        skills = self.parse_resume_text(resume_text)
+        if digest:
+            self.resume_cache.update(digest, skills=skills, skills_key=skills_key)
+        return skills
+
+    def _get_ats_matcher(self):
+        """Job-side ATS matrices, rebuilt lazily after every data (re)load"""
+        with self._ats_lock:
+            if self._ats_matcher is None or self._ats_matcher.version != self.dataset_version:
+                job_embs = self.job_embs.cpu().numpy() if torch.is_tensor(self.job_embs) else self.job_embs
+                self._ats_matcher = ATSMatcher(self.jobs_df, job_embs, self.dataset_version)
+            return self._ats_matcher
+
+    def ats_match(self, resume_skill_lists, top_k=10, filters=None, include_matrix=False, max_matrix_cells=None):
+        """
+        Scores each resume's skills against every posting in jobs_df (or those matching
+        `filters`, {column: substring}): skill coverage + embedding similarity, computed as
+        one matrix product. Returns ranked jobs per resume, and the resumes x jobs matrix on request.
+        A requested matrix larger than max_matrix_cells raises ValueError before any scoring.
+        """
+        matcher = self._get_ats_matcher()
+        job_ids = matcher.select(filters)
+        if include_matrix and max_matrix_cells and len(resume_skill_lists) * len(job_ids) > max_matrix_cells:
+            raise ValueError(
+                f"Match matrix of {len(resume_skill_lists)} resumes x {len(job_ids)} jobs exceeds "
+                f"{max_matrix_cells} cells; narrow the jobs with filters or send fewer resumes"
+            )
+        texts = ["Experienced professional skilled in: " + ", ".join(map(str, skills)) for skills in resume_skill_lists]
+        resume_embs = None
+        if resume_skill_lists and matcher.job_embs is not None:
+            resume_embs = np.asarray(self.model.encode(texts, convert_to_numpy=True, show_progress_bar=False), dtype=np.float32)
+            # No skills, no profile to compare
+            resume_embs[[not skills for skills in resume_skill_lists]] = 0.0
+
+        matrix = matcher.match_matrix(resume_skill_lists, resume_embs, job_ids)
+        result = {"jobs_considered": int(len(job_ids)),
+                  "matches": matcher.rank_matrix(resume_skill_lists, matrix, top_k=top_k)}
+        if include_matrix:
+            result["matrix"] = {
+                "jobs": [{"job_index": int(j), "title": matcher.titles[j]} for j in job_ids],
+                "scores": np.round(matrix["scores"] * 100, 1).tolist(),
+            }
+        return result
+
+    def ocr_resume(self, file_path, digest=None, on_page=None):
+        """OCR text of a scanned PDF / image via the OCR process pool, cached by the file's SHA-256"""
+        digest = digest or ResumeCache.digest_file(file_path)
+        entry = self.resume_cache.get(digest) or {}
+        if "ocr_text" in entry:
+            return entry["ocr_text"]
+        text = self.ocr_pool.ocr_document(str(file_path), on_page=on_page)
+        self.resume_cache.update(digest, ocr_text=text)
+        return text
+
     def parse_resume_pdf(self, pdf_path):
         """Extracts text from PDF and matches skills"""
         try:
-            import fitz
-            doc = fitz.open(pdf_path)
-            text = ""
-            for page in doc:
-                text += page.get_text()
-            return self.parse_resume_text(text)
+            digest = ResumeCache.digest_file(pdf_path)
+            text = self.extract_resume_text(pdf_path, digest)
+            # Scanned PDF: no usable text layer
+            if len(text.strip()) < self.ocr_pool.min_page_chars and self.ocr_pool.available:
+                return self.extract_resume_skills(self.ocr_resume(pdf_path, digest), digest, source="ocr")
+            return self.extract_resume_skills(text, digest)
         except Exception as e:
             print(f"Error parsing PDF: {e}")
             return []
@@ -3360,9 +3941,11 @@ class RecommendationEngine:
                 text += page.get_text()
             
             if len(text.strip()) < 50:
-                print("Note: Image text is sparse. OCR recommended for real product.")
-                # We'd plug in pytesseract here: 
-                # text = pytesseract.image_to_string(Image.open(image_path))
+                if not self.ocr_pool.available:
+                    print("Note: Image text is sparse. OCR recommended for real product.")
+                    return self.parse_resume_text(text)
+                digest = ResumeCache.digest_file(image_path)
+                return self.extract_resume_skills(self.ocr_resume(image_path, digest), digest, source="ocr")
                 
             return self.parse_resume_text(text)
         except Exception as e:
@@ -3531,40 +4114,185 @@ class RecommendationEngine:
         max_budget=None,
         max_duration=None,
         top_n=8,
-        assessment_vector=None
+        assessment_vector=None,
+        sections=None,
+        on_section=None,
+        session_id=None,
+        deadline=None
     ):
+        """
+        Builds the 11-Point Dashboard Bundle. `sections` selects a subset of bundle keys
+        (a list of keys or a BUNDLE_PRESETS name); unrequested sections are never computed.
+        `on_section(key, value)` is called for every bundle key as soon as its sections are done.
+        With a `session_id` the context and section results are kept for `what_if`.
+        `deadline` (a time.perf_counter() timestamp) bounds section work; see _section_fallback.
+        """
+        keys = self.resolve_bundle_keys(sections)
+        wanted = None if keys is None else {s for k in keys for s in self.BUNDLE_KEY_SECTIONS[k]}
+
+        ctx = self._prepare_bundle_context(
+            user_skills, target_job, user_level, segment, preference,
+            location, max_budget, max_duration, top_n, assessment_vector or {}
+        )
+
+        section_listener = None
+        if on_section is not None:
+            pending_keys = list(keys if keys is not None else self.BUNDLE_KEY_SECTIONS)
+            def section_listener(name, results):
+                builders = self._bundle_builders(ctx, results)
+                for key in [k for k in pending_keys if all(s in results for s in self.BUNDLE_KEY_SECTIONS[k])]:
+                    pending_keys.remove(key)
+                    on_section(key, builders[key]())
+            section_listener(None, {})  # keys served by the prelude alone
+
+        fallbacks = {}
+        results, timings, degraded = self.bundle_executor.run(
+            ctx, wanted, on_section=section_listener, deadline=deadline,
+            fallback=lambda name, c, r: self._section_fallback(name, c, r, fallbacks)
+        )
+        if self.show_progress:
+            slowest = sorted(((v, k) for k, v in timings.items() if k != "total"), reverse=True)[:3]
+            print(f"[Bundle] {timings['total']}ms total; slowest: " + ", ".join(f"{k}={v}ms" for v, k in slowest))
+        bundle = self._assemble_bundle(ctx, results, timings, keys)
+        self._record_degradation(ctx, results, degraded, fallbacks)
+        if degraded:
+            bundle["degraded_sections"] = [{"section": name, "fallback": fallbacks.get(name, "pending")} for name in degraded]
+            if self.show_progress:
+                print(f"[Bundle] Deadline hit; degraded: {', '.join(degraded)}")
+        if session_id is not None:
+            args = {
+                "user_skills": user_skills, "target_job": target_job, "user_level": user_level, "segment": segment,
+                "preference": preference, "location": location, "max_budget": max_budget,
+                "max_duration": max_duration, "top_n": top_n,
+            }
+            self.bundle_states.put(session_id, args, assessment_vector, keys, bundle, ctx, results)
+        return bundle
+
+    def _section_fallback(self, name, ctx, results, fallbacks):
+        """
+        Placeholder for a section that missed the request deadline, shaped like its real
+        result so bundle builders and dependent sections keep working.
+        Preference: last good value ("cached") > cheap derivation ("default") > "pending".
+        """
+        target_job = ctx["target_job"]
+        cached = self._section_last_good.get((name, target_job, ctx["user_domain"]))
+        if name == "market_demand" and cached is None:
+            field = results.get("skill_intelligence", {}).get("snapshot_domain") or self._infer_domain(target_job)
+            cached = self._trend_cache.get("IT" if field == "General" else field)
+        if cached is not None:
+            fallbacks[name] = "cached"
+            return cached
+
+        gaps = ctx["compulsory_gap"][:8]
+        defaults = {
+            "skill_intelligence": lambda: {
+                "snapshot_domain": ctx["user_domain"], "current_skills": ctx["user_skills"][:10],
+                "true_gaps": gaps, "skills_to_strengthen": gaps,
+            },
+            "salary_intelligence": lambda: self.get_salary_for_role(target_job),
+        }
+        if name in defaults:
+            fallbacks[name] = "default"
+            return defaults[name]()
+
+        fallbacks[name] = "pending"
+        return {
+            "course_hits": [],
+            "courses": {"academic": [], "skill_gap": [], "recommendations": []},
+            "job_hits": [],
+            "jobs": [],
+            "readiness": {"overall": 0, "stage": "Pending"},
+            "gap_closing_courses": {"courses": [], "uncovered_skills": list(gaps), "status": "pending"},
+            "action_roadmap": {"estimated_weeks": 0, "status": "pending"},
+            "alternate_paths": [],
+            "career_path_recommendation": {"current_role": target_job, "vertical": [], "horizontal": [], "status": "pending"},
+            "market_demand": {"field": ctx["user_domain"], "segments": [], "top_demanded_skills": {}, "recommendation": "Market data is still loading.", "status": "pending"},
+            "mentor_recommendations": [],
+            "ml_diagnostics": {"mode": "pending"},
+            "ai_explainability": ["Some insights are still being computed; refresh to see the full analysis."],
+        }.get(name, {"status": "pending"})
+
+    def _record_degradation(self, ctx, results, degraded, fallbacks):
+        """Updates degradation counters and remembers fresh values of LAST_GOOD_SECTIONS."""
+        with self._degradation_lock:
+            for name in self.LAST_GOOD_SECTIONS:
+                if name in results and name not in degraded:
+                    self._section_last_good[(name, ctx["target_job"], ctx["user_domain"])] = results[name]
+            while len(self._section_last_good) > 512:
+                self._section_last_good.pop(next(iter(self._section_last_good)))
+            self.degradation_stats["bundles"] += 1
+            if degraded:
+                self.degradation_stats["degraded_bundles"] += 1
+            for name in degraded:
+                per_section = self.degradation_stats["sections"].setdefault(name, {})
+                kind = fallbacks.get(name, "pending")
+                per_section[kind] = per_section.get(kind, 0) + 1
+
+    def resolve_bundle_keys(self, sections):
+        """None / "full" -> None (everything); preset name or comma list / list of bundle keys -> ordered key list."""
+        if sections is None:
+            return None
+        if isinstance(sections, str):
+            if sections in self.BUNDLE_PRESETS:
+                return None if self.BUNDLE_PRESETS[sections] is None else list(self.BUNDLE_PRESETS[sections])
+            sections = [s.strip() for s in sections.split(",") if s.strip()]
+        unknown = [s for s in sections if s not in self.BUNDLE_KEY_SECTIONS]
+        if unknown:
+            raise ValueError(f"Unknown bundle sections: {unknown}")
+        return [k for k in self.BUNDLE_KEY_SECTIONS if k in sections]
+
+    # ── Bundle Sections (run by BundleExecutor) ──────────────────────────
+
+    def _register_bundle_sections(self):
+        """Declares every bundle section and the sections it needs."""
+        ex = self.bundle_executor
+        ex.section("course_hits", self._section_course_hits)
+        ex.section("courses", self._section_courses, deps=["course_hits"])
+        ex.section("job_hits", self._section_job_hits)
+        ex.section("jobs", self._section_jobs, deps=["job_hits"])
+        ex.section("readiness", self._section_readiness)
+        ex.section("skill_intelligence", self._section_skill_intelligence, deps=["jobs"])
+        ex.section("gap_closing_courses", self._section_gap_closing, deps=["skill_intelligence"])
+        ex.section("action_roadmap", self._section_action_roadmap, deps=["skill_intelligence"])
+        ex.section("alternate_paths", self._section_alternate_paths)
+        ex.section("career_path_recommendation", self._section_career_path, deps=["skill_intelligence", "alternate_paths"])
+        ex.section("salary_intelligence", self._section_salary, deps=["jobs"])
+        ex.section("market_demand", self._section_market_demand, deps=["skill_intelligence"])
+        ex.section("mentor_recommendations", self._section_mentors)
+        ex.section("ml_diagnostics", self._section_ml_diagnostics)
+        ex.section("ai_explainability", self._section_explainability, deps=["readiness", "action_roadmap", "skill_intelligence"])
+
+    def _prepare_bundle_context(self, user_skills, target_job, user_level, segment, preference,
+                                location, max_budget, max_duration, top_n, assessment_vector, encode=True):
+        """
+        Sequential prelude shared by all sections: skill gap, query embedding and rule-engine inputs.
+        With encode=False the query is left un-encoded (query_emb None) for a batched encode by the caller.
+        """
         # get skills and wanted role
         all_required, mapped_occ = self.get_skills_for_job(target_job)
         
-        # find missing skills
+        # find missing skills (spelling variants of the same skill count as held)
+        user_skills = [c["raw"] for c in self.canonicalize_skills(user_skills)]
         user_skill_set = set(s.lower() for s in user_skills)
+        user_skill_ids = set()
+        if self.skill_canonicalizer is not None:
+            user_skill_ids = {i for i in self.skill_canonicalizer.resolve_many(user_skills) if i}
+            required_ids = self.skill_canonicalizer.resolve_many(list(all_required))
+        else:
+            required_ids = [None] * len(all_required)
         
         # split gaps natively (ESCO dependency removed)
-        compulsory_gap = [s for s in all_required if s.lower() not in user_skill_set]
+        compulsory_gap = [s for s, sid in zip(all_required, required_ids) if s.lower() not in user_skill_set and sid not in user_skill_ids]
         optional_gap = []
         
         skill_gap = compulsory_gap + optional_gap
 
-        # 2. Calculate Signals (Bands & Multi-Signal Score)
-        band = self.estimate_responsibility_band(user_skills)
-        current_score_val = self.calculate_skill_score(user_skills, None, all_required)
-        
-        # 3. Handle Complete Match (Transition to Action Plan later, no early return)
-        is_complete = not skill_gap
-
-        #  Build Query for Courses
-        # Cleaner Query: Filter out verbose ESCO skill names (often full sentences)
-        # This prevents the "cluttering" of the query
-        query_skills = []
-        #  ESCO Mapping & Gap Analysis
-        compulsory_skills = compulsory_gap
-        optional_skills = optional_gap
-
         # Career Banding
         band = self.estimate_responsibility_band(user_skills)
         print(f"DEBUG: Career band = {band}")
 
         #  Semantic Query Construction
+        # Cleaner Query: Filter out verbose ESCO skill names (often full sentences)
         query_skills = []
         for s in compulsory_gap[:4]:
             if len(s) > 40: query_skills.extend(s.split()[:3])
@@ -3579,107 +4307,81 @@ class RecommendationEngine:
         else: # Working Professionals
             query_terms += ["part-time", "online", "evening"]
 
-        #  Career-Stage Keyword Boosting
-        user_edu = str(assessment_vector.get("highest_education", "")).lower() if assessment_vector else ""
-        has_bsc = "bachelor" in user_edu or "degree" in user_edu or "bsc" in user_edu
-        
-        # ── Rule Engine: Stage-Based Level Mapping Strategy ──
-        target_domain = assessment_vector.get("domain", self._infer_domain(target_job))
-        exp_years = float(assessment_vector.get("experience_years", 0))
-        status_level = assessment_vector.get("status_level", 0)
-        
-        # Determine strategy levels
-        strategy_levels = []
-        if segment == "Student": strategy_levels = ["Bachelor", "Diploma"]
-        elif status_level == 3: # Switcher
-            strategy_levels = ["Diploma", "Professional", "Bachelor"]
-        elif exp_years >= 6: # Experienced
-            strategy_levels = ["Postgraduate", "Professional", "Diploma"]
-        elif status_level == 4: # Executive
-            strategy_levels = ["Postgraduate", "Professional"]
-        else:
-            strategy_levels = ["Diploma", "Professional"]
-
         if preference and preference != "None":
             query_terms.append(preference)
                 
         query = " ".join(query_terms)
         print(f"DEBUG: Query = {query}")
         
-        query_emb = self.model.encode(query, convert_to_tensor=True)
-        print(f"DEBUG: query_emb type = {type(query_emb)}")
-
-        #  SEMANTIC SEARCH - Combined Dataset Approach
-        # We want a mix of Vocational (Professional) and Academic (Degrees)
-        all_candidate_recommendations = []
-        
-        # 1. (DELETED: Removed Hardcoded Course Injectors to allow pure Semantics)        # 2. Search Professional Courses (Scale up SBERT search limits to populate UI densely)
-        hits = util.semantic_search(query_emb, self.course_embs, top_k=top_n * 10)[0]
-        for h in hits:
-            if h["score"] < 0.28: continue
-            course = self.courses_df.iloc[h["corpus_id"]]
-            processed = self._process_one_course(course, h["score"], segment, user_level, location, max_budget, max_duration, skill_gap, assessment_vector)
-            all_candidate_recommendations.append(processed)
-
-        # . Search Academic Courses
-        if getattr(self, "academic_embs", None) is not None:
-            acad_hits = util.semantic_search(query_emb, self.academic_embs, top_k=top_n * 10)[0]
-            for h in acad_hits:
-                if h["score"] < 0.28: continue
-                course = self.academic_df.iloc[h["corpus_id"]]
-                processed = self._process_one_course(course, h["score"], segment, user_level, location, max_budget, max_duration, skill_gap, assessment_vector)
-                all_candidate_recommendations.append(processed)
+        query_emb = self.model.encode(query, convert_to_tensor=True) if encode else None
 
         # ─Rule Engine: Domain & Education Invariants ──
         user_domain = assessment_vector.get("domain", self._infer_domain(target_job))
         user_edu_lvl = assessment_vector.get("education_level", 1)
-        
-        filtered_candidates = []
-        for r in all_candidate_recommendations:
-            r_name = str(r.get("course_name", "")).lower()
-            r_lvl_str = str(r.get("level", "Entry")).lower()
-            
-            # invariant 1: Domain Isolation
-            r_domain = self._infer_domain(r_name)
-            if user_domain != "General" and r_domain != "General" and r_domain != user_domain:
-                continue
-                
-            # Invariant 2: Qualification Floor
-            # Map course semantic level to numeric
-            r_edu_val = 1
-            if "diploma" in r_lvl_str: r_edu_val = 3
-            elif "degree" in r_lvl_str or "bachelor" in r_lvl_str or "bsc" in r_lvl_str: r_edu_val = 4
-            elif "master" in r_lvl_str or "postgraduate" in r_lvl_str or "msc" in r_lvl_str: r_edu_val = 5
-            
-            # Do not recommend lower qualification than current
-            # Exception: Professional certifications/short courses are always allowed
-            is_professional = "professional" in r_lvl_str or "certification" in r_lvl_str or r.get("source_file") == "professional"
-            if not is_professional and r_edu_val < user_edu_lvl:
-                continue
-                
-            filtered_candidates.append(r)
+
+        return {
+            "user_skills": user_skills,
+            "target_job": target_job,
+            "user_level": user_level,
+            "segment": segment,
+            "location": location,
+            "max_budget": max_budget,
+            "max_duration": max_duration,
+            "top_n": top_n,
+            "assessment_vector": assessment_vector,
+            "mapped_occ": mapped_occ,
+            "compulsory_gap": compulsory_gap,
+            "skill_gap": skill_gap,
+            "query": query,
+            "query_emb": query_emb,
+            "user_domain": user_domain,
+            "user_edu_lvl": user_edu_lvl,
+        }
+
+    def _course_shard_filter(self, ctx):
+        # Invariants applied up front as a shard filter so the search only scans courses that can survive them
+        user_domain, user_edu_lvl = ctx["user_domain"], ctx["user_edu_lvl"]
+        return lambda key: self._course_passes_rules(key[0], key[1], user_domain, user_edu_lvl)
+
+    def _job_shard_filter(self, ctx):
+        user_domain = ctx["user_domain"]
+        return lambda key: user_domain == "General" or key[0] in (user_domain, "General")
+
+    def _section_course_hits(self, ctx, results):
+        """Raw semantic candidates: [(pool, corpus_id, score)] from the rule-compatible shards."""
+        top_n = ctx["top_n"]
+        course_shard_filter = self._course_shard_filter(ctx)
+
+        # Search Professional Courses (Scale up SBERT search limits to populate UI densely)
+        hits = [("professional", h["corpus_id"], h["score"]) for h in
+                self._search_store(ctx["query_emb"], self.course_shards, self.course_embs, top_n * 10, 0.28, course_shard_filter)]
+
+        # Search Academic Courses
+        if getattr(self, "academic_embs", None) is not None:
+            hits += [("academic", h["corpus_id"], h["score"]) for h in
+                     self._search_store(ctx["query_emb"], self.academic_shards, self.academic_embs, top_n * 10, 0.28, course_shard_filter)]
+        return hits
+
+    def _section_courses(self, ctx, results):
+        """Scores, filters and splits the candidates into academic / skill-gap lists."""
+        segment, assessment_vector, top_n = ctx["segment"], ctx["assessment_vector"], ctx["top_n"]
+        all_candidate_recommendations = []
+        for pool, corpus_id, score in results["course_hits"]:
+            df = self.courses_df if pool == "professional" else self.academic_df
+            course = df.iloc[corpus_id]
+            processed = self._process_one_course(
+                course, score, segment, ctx["user_level"], ctx["location"], ctx["max_budget"],
+                ctx["max_duration"], ctx["skill_gap"], assessment_vector
+            )
+            all_candidate_recommendations.append(processed)
+
+        # Unsharded fallback still needs the invariants checked per candidate
+        filtered_candidates = [
+            r for r in all_candidate_recommendations
+            if self._course_passes_rules(self._infer_domain(str(r.get("course_name", "")).lower()), r.get("level", "Entry"), ctx["user_domain"], ctx["user_edu_lvl"])
+        ]
             
         all_candidate_recommendations = sorted(filtered_candidates, key=lambda x: x['relevance_score'], reverse=True)
-        
-        final_picks = []
-        seen_names = set()
-        
-        # Priority logic - Students get academic focus, Professionals get professional focus
-        if segment == "Student":
-            # Add academic first
-            for r in all_candidate_recommendations:
-                is_acad = r.get("source_file") == "academic" or "Academic" in str(r.get("level", ""))
-                if is_acad and r["course_name"] not in seen_names:
-                    final_picks.append(r)
-                    seen_names.add(r["course_name"])
-                    if len(final_picks) >= 3: break 
-        
-        # Fill remaining slots (up to top_n)
-        for r in all_candidate_recommendations:
-            if r["course_name"] not in seen_names:
-                final_picks.append(r)
-                seen_names.add(r["course_name"])
-                if len(final_picks) >= top_n: break
 
         # ── Gold Logic: Explicit Category Separation ──
         # 1. Academic recommendations - institutional degrees/diplomas
@@ -3698,7 +4400,6 @@ class RecommendationEngine:
 
         # ── MSc / Diploma Rules ──
         pref = assessment_vector.get("education_preference", "").lower() if assessment_vector else ""
-        user_edu = assessment_vector.get("education_level", 1) if assessment_vector else 1
         
         if "msc" in pref or "master" in pref:
             # Prioritize Master/Postgraduate in academic pool
@@ -3733,13 +4434,38 @@ class RecommendationEngine:
             for c in c_list:
                 c["apply_url"] = c.get("url", "#")
 
-        #  JOB FETCHING (Routed Natively from O*NET)
+        # Dynamic Course UI Tags
+        for c in academic_recommendations + skill_gap_courses:
+            c["labels"] = []
+            if c.get("fee_numeric", 999999) == 0 or "free" in str(c.get("fee", "")).lower():
+                c["labels"].append("💰 Budget Friendly")
+            if c.get("duration_numeric", 99) <= 2 or "months" in str(c.get("duration", "")).lower():
+                c["labels"].append("⚡ Fast Track")
+            if c.get("relevance_score", 0) > 0.75:
+                c["labels"].append("🎯 Best Match")
+
+        return {
+            "academic": academic_recommendations,
+            "skill_gap": skill_gap_courses,
+            "recommendations": recommendations,
+        }
+
+    def _section_job_hits(self, ctx, results):
+        """Raw semantic job candidates from the user's domain shards."""
+        if getattr(self, "job_embs", None) is None:
+            return []
+        try:
+            return self._search_store(ctx["query_emb"], self.job_shards, self.job_embs, ctx["top_n"] + 3, 0.35, self._job_shard_filter(ctx))
+        except Exception as e:
+            print(f"Error searching live jobs: {e}")
+            return []
+
+    def _section_jobs(self, ctx, results):
+        """JOB FETCHING (Routed Natively from O*NET)"""
         jobs = []
         try:
             if getattr(self, "job_embs", None) is not None:
-                job_hits = util.semantic_search(query_emb, self.job_embs, top_k=top_n+3)[0]
-                for h in job_hits:
-                    if h["score"] < 0.35: continue 
+                for h in results["job_hits"]:
                     idx = h["corpus_id"]
                     j_row = self.jobs_df.iloc[idx]
                     jobs.append({
@@ -3748,7 +4474,7 @@ class RecommendationEngine:
                         "location": str(j_row.get("location", "Sri Lanka")),
                         "estimated_salary": {"min": 50000, "max": 150000},
                         "relevance_score": round(h["score"], 3),
-                        "missing_skills": skill_gap[:3],
+                        "missing_skills": ctx["skill_gap"][:3],
                         "apply_url": str(j_row.get("url", "#"))
                     })
         except Exception as e:
@@ -3764,8 +4490,8 @@ class RecommendationEngine:
 
         # Suppress jobs for O/L students — too early to apply
         current_status = 1
-        if assessment_vector:
-            current_status = assessment_vector.get("status_level", 1)
+        if ctx["assessment_vector"]:
+            current_status = ctx["assessment_vector"].get("status_level", 1)
             
         if current_status == 0:
             job_list = [{
@@ -3773,46 +4499,72 @@ class RecommendationEngine:
                 "company": "PathFinder+ Guidance",
                 "message": "You're at the learning and exploration stage. Focus on courses and building skills first. Job listings will appear once you've completed a Diploma or A/L qualification."
             }]
+        return job_list
 
-        # ── V3 Dashboard Alignment (11-Point Bundle) ──
-        readiness = self.calculate_readiness_score(user_skills, assessment_vector or {"status_level": 1 if segment=="Student" else 2, "experience_years": 0}, target_job)
-        
-        # 1. Career Score & Meaning
+    def _section_readiness(self, ctx, results):
+        """Career Score & Meaning (CRI)."""
+        av = ctx["assessment_vector"]
+        readiness = self.calculate_readiness_score(
+            ctx["user_skills"], av or {"status_level": 1 if ctx["segment"] == "Student" else 2, "experience_years": 0}, ctx["target_job"]
+        )
         score_val = readiness.get("overall", 0)
-        score_meaning = "Strong Fit" if score_val >= 70 else ("Developing (Growth Potential)" if score_val >= 40 else "Weak Fit (Reskilling Needed)")
-        readiness["stage"] = score_meaning
+        readiness["stage"] = "Strong Fit" if score_val >= 70 else ("Developing (Growth Potential)" if score_val >= 40 else "Weak Fit (Reskilling Needed)")
+        return readiness
 
-        # 2. Target Industry (Majority Voting)
+    def _section_skill_intelligence(self, ctx, results):
+        """Target industry (majority vote over jobs) and the true skill gaps."""
+        from collections import Counter
+        av, target_job, job_list = ctx["assessment_vector"], ctx["target_job"], results["jobs"]
+
+        # Target Industry (Majority Voting)
         domains = [self._infer_domain(j["job_title"]) for j in job_list if "specific openings" not in j["job_title"]]
         if domains:
             snapshot_domain = max(set(domains), key=domains.count)
         else:
-            snapshot_domain = assessment_vector.get("domain", self._infer_domain(target_job)) if assessment_vector else self._infer_domain(target_job)
+            snapshot_domain = av.get("domain", self._infer_domain(target_job)) if av else self._infer_domain(target_job)
 
-        # 3. Skill Intelligence (Domain Filter & True Gaps)
-        current_skills = user_skills[:10]
+        # Skill Intelligence (Domain Filter & True Gaps)
         agg_missing = []
         for j in job_list:
             if "missing_skills" in j:
                 agg_missing.extend(j["missing_skills"])
         
-        from collections import Counter
         true_gaps = [k for k, v in Counter(agg_missing).most_common(10)]
         if not true_gaps:
             # Fallback with domain isolation
-            true_gaps = [s for s in compulsory_gap if self._infer_domain(s) in [snapshot_domain, "IT", "General"]][:8]
-        skills_to_strengthen = true_gaps[:8]
-
-        # 4. ETA & Career Roadmap
-        action_roadmap = self.action_plan_gen.generate_action_plan(
-            gap_skills=skills_to_strengthen,
-            target_role=target_job,
-            assessment_vector=assessment_vector
+            true_gaps = [s for s in ctx["compulsory_gap"] if self._infer_domain(s) in [snapshot_domain, "IT", "General"]][:8]
+
+        return {
+            "snapshot_domain": snapshot_domain,
+            "current_skills": ctx["user_skills"][:10],
+            "true_gaps": true_gaps,
+            "skills_to_strengthen": true_gaps[:8],
+        }
+
+    def _section_gap_closing(self, ctx, results):
+        """Deterministic gap closers from the inverted skill -> course index."""
+        return self.find_gap_closing_courses(
+            results["skill_intelligence"]["skills_to_strengthen"], max_courses=5, segment=ctx["segment"],
+            user_level=ctx["user_level"], assessment_vector=ctx["assessment_vector"]
+        )
+
+    def _section_action_roadmap(self, ctx, results):
+        """ETA & Career Roadmap."""
+        return self.action_plan_gen.generate_action_plan(
+            gap_skills=results["skill_intelligence"]["skills_to_strengthen"],
+            target_role=ctx["target_job"],
+            assessment_vector=ctx["assessment_vector"]
         )
 
-        # 5. AI Recommended Path (Vertical/Pivot/Entry)
-        user_domain = assessment_vector.get("domain", "General") if assessment_vector else "General"
-        user_status = assessment_vector.get("status_level", 0) if assessment_vector else 0
+    def _section_alternate_paths(self, ctx, results):
+        return self.suggest_alternate_paths(ctx["target_job"], 2, ctx["assessment_vector"])
+
+    def _section_career_path(self, ctx, results):
+        """AI Recommended Path (Vertical/Pivot/Entry)."""
+        av, target_job = ctx["assessment_vector"], ctx["target_job"]
+        snapshot_domain = results["skill_intelligence"]["snapshot_domain"]
+        user_domain = av.get("domain", "General") if av else "General"
+        user_status = av.get("status_level", 0) if av else 0
         
         if user_status <= 1:
             if any(k in target_job.lower() for k in ["executive", "chief", "director", "head", "manager"]):
@@ -3832,65 +4584,67 @@ class RecommendationEngine:
             vertical_paths.append({"role": f"Senior {target_job}", "type": "Vertical (Promotion)"})
             vertical_paths.append({"role": f"Lead {target_job}", "type": "Vertical (Promotion)"})
 
-        career_path_rec = {
+        return {
             "current_role": target_job,
             "vertical": vertical_paths,
-            "horizontal": [{"role": alt["title"], "type": "Alternative Pathway"} for alt in self.suggest_alternate_paths(target_job, 2, assessment_vector)]
+            "horizontal": [{"role": alt["title"], "type": "Alternative Pathway"} for alt in results["alternate_paths"]]
         }
 
-        # 6. Salary Forecast (Dataset-driven bounds)
-        salaries = [j["estimated_salary"] for j in job_list if "estimated_salary" in j and isinstance(j["estimated_salary"], dict) and "max" in j["estimated_salary"]]
+    def _section_salary(self, ctx, results):
+        """Salary Forecast (Dataset-driven bounds)."""
+        salaries = [j["estimated_salary"] for j in results["jobs"] if "estimated_salary" in j and isinstance(j["estimated_salary"], dict) and "max" in j["estimated_salary"]]
         if salaries:
             mins = [s["min"] for s in salaries]
             maxs = [s["max"] for s in salaries]
             avg_min = sum(mins)//len(mins)
             avg_max = sum(maxs)//len(maxs)
-            salary_int = {"min": avg_min, "avg": (avg_min+avg_max)//2, "max": avg_max}
-        else:
-            salary_int = self.get_salary_for_role(target_job)
+            return {"min": avg_min, "avg": (avg_min+avg_max)//2, "max": avg_max}
+        return self.get_salary_for_role(ctx["target_job"])
 
-        # 7. Skill Gap Insights
-        skill_gap_insights = {
-            "critical_skills": true_gaps[:5] if true_gaps else ["None - extremely strong alignment"],
-            "beneficial_skills": true_gaps[5:10] if len(true_gaps) > 5 else ["No secondary gaps"],
-            "status": "Green" if not true_gaps else "Yellow" if len(true_gaps) < 5 else "Red"
-        }
+    def _section_market_demand(self, ctx, results):
+        return self.get_personalized_market_trends(ctx["target_job"], domain=results["skill_intelligence"]["snapshot_domain"])
 
-        # 8. AI Explainability
-        confidence_val = score_val / 100
+    def _section_mentors(self, ctx, results):
+        return self.match_mentors(ctx["user_skills"], target_job=ctx["target_job"], top_n=3)
+
+    def _section_ml_diagnostics(self, ctx, results):
+        return self._get_ml_diagnostics(ctx["assessment_vector"], ctx["compulsory_gap"])
+
+    def _section_explainability(self, ctx, results):
+        """AI Explainability."""
+        intel = results["skill_intelligence"]
+        confidence_val = results["readiness"].get("overall", 0) / 100
         conf_level = "High" if confidence_val >= 0.70 else ("Moderate" if confidence_val >= 0.40 else "Low")
         
-        eta_weeks = action_roadmap.get("estimated_weeks", 0)
-        missing_count = len(skills_to_strengthen)
+        eta_weeks = results["action_roadmap"].get("estimated_weeks", 0)
+        missing_count = len(intel["skills_to_strengthen"])
         
-        explainability = [
+        return [
             f"Recommendation Confidence: {conf_level} ({confidence_val:.2f})",
-            f"• Chosen path matches {len(current_skills)} of your existing verified skills.",
+            f"• Chosen path matches {len(intel['current_skills'])} of your existing verified skills.",
             f"• ETA calculation implies a rigorous {eta_weeks}-week reskilling sprint based on {missing_count} explicit knowledge gaps.",
-            f"• Market demands validated against live metrics in the {snapshot_domain} sector."
+            f"• Market demands validated against live metrics in the {intel['snapshot_domain']} sector."
         ]
 
-        # 9. Dynamic Course UI Tags
-        for c in academic_recommendations + skill_gap_courses:
-            c["labels"] = []
-            if c.get("fee_numeric", 999999) == 0 or "free" in str(c.get("fee", "")).lower():
-                c["labels"].append("💰 Budget Friendly")
-            if c.get("duration_numeric", 99) <= 2 or "months" in str(c.get("duration", "")).lower():
-                c["labels"].append("⚡ Fast Track")
-            if c.get("relevance_score", 0) > 0.75:
-                c["labels"].append("🎯 Best Match")
+    def _assemble_bundle(self, ctx, results, timings, keys=None):
+        """Lays the computed sections out as the 11-Point Dashboard Bundle (only `keys` when given)."""
+        builders = self._bundle_builders(ctx, results)
+        bundle = {k: build() for k, build in builders.items() if keys is None or k in keys}
+        bundle["section_timings"] = timings
+        return bundle
 
-        # Fallback advice assignment native to Quiz Engine preventing NameError
-        advice = f"Target {snapshot_domain} roles. Focus on professional certifications to heavily increase technical ranking."
-        
-        return {
-            # 1. Career Snapshot (CRI)
-            "career_snapshot": {
+    def _bundle_builders(self, ctx, results):
+        """Bundle key -> zero-arg builder over the computed section results."""
+        target_job, assessment_vector = ctx["target_job"], ctx["assessment_vector"]
+
+        def career_snapshot():
+            readiness = results["readiness"]
+            return {
                 "target_role": target_job,
-                "score": score_val,
-                "stage": score_meaning,
-                "estimated_transition_weeks": eta_weeks,
-                "preferred_industry": snapshot_domain,
+                "score": readiness.get("overall", 0),
+                "stage": readiness["stage"],
+                "estimated_transition_weeks": results["action_roadmap"].get("estimated_weeks", 0),
+                "preferred_industry": results["skill_intelligence"]["snapshot_domain"],
                 "sub_metrics": {
                     "Skills Alignment": readiness.get("skills_match", 0),
                     "Experience Level": readiness.get("experience", 0),
@@ -3898,41 +4652,54 @@ class RecommendationEngine:
                     "Qualification": readiness.get("qualification", 0),
                     "Gap Coverage": readiness.get("gap_coverage", 0)
                 }
-            },
+            }
+
+        def skill_gap_insights():
+            true_gaps = results["skill_intelligence"]["true_gaps"]
+            return {
+                "critical_skills": true_gaps[:5] if true_gaps else ["None - extremely strong alignment"],
+                "beneficial_skills": true_gaps[5:10] if len(true_gaps) > 5 else ["No secondary gaps"],
+                "status": "Green" if not true_gaps else "Yellow" if len(true_gaps) < 5 else "Red"
+            }
+
+        return {
+            # 1. Career Snapshot (CRI)
+            "career_snapshot": career_snapshot,
             # 2. AI Career Path Recommendation
-            "career_path_recommendation": career_path_rec,
+            "career_path_recommendation": lambda: results["career_path_recommendation"],
             # 3. Skill Intelligence
-            "skill_intelligence": {
-                "current_skills": current_skills,
-                "strengthen": skills_to_strengthen,
+            "skill_intelligence": lambda: {
+                "current_skills": results["skill_intelligence"]["current_skills"],
+                "strengthen": results["skill_intelligence"]["skills_to_strengthen"],
                 "soft_skills": assessment_vector.get("normalized_soft_skills", {}) if assessment_vector else {}
             },
             # 4. Skill Gap Insights
             "skill_gap_insights": skill_gap_insights,
             # 5. Recommended Education
-            "recommended_education": academic_recommendations[:5],
-            "skill_gap_courses": skill_gap_courses[:5],
+            "recommended_education": lambda: results["courses"]["academic"][:5],
+            "skill_gap_courses": lambda: results["courses"]["skill_gap"][:5],
+            "gap_closing_courses": lambda: results["gap_closing_courses"],
             # 6. Real Job Opportunities 
-            "job_opportunities": job_list[:5],
+            "job_opportunities": lambda: results["jobs"][:5],
             # 7. Salary Intelligence
-            "salary_intelligence": salary_int,
+            "salary_intelligence": lambda: results["salary_intelligence"],
             # 8. Market Demand Insights
-            "market_demand": self.get_personalized_market_trends(target_job, domain=snapshot_domain),
+            "market_demand": lambda: results["market_demand"],
             # 9. Mentor Recommendations
-            "mentor_recommendations": self.match_mentors(user_skills, target_job=target_job, top_n=3),
+            "mentor_recommendations": lambda: results["mentor_recommendations"],
             # 10. Personalized Action Plan
-            "action_roadmap": action_roadmap,
+            "action_roadmap": lambda: results["action_roadmap"],
             # 11. AI Explainability
-            "ai_explainability": explainability,
+            "ai_explainability": lambda: results["ai_explainability"],
 
-            
             # Legacy compatibility / Extra data
-            "status": "Incomplete" if skill_gap else "Complete",
-            "mapped_occupation": mapped_occ,
-            "skill_gap": compulsory_gap,
-            "recommendations": skill_gap_courses[:top_n],
-            "caveats": advice,
-            "ml_diagnostics": self._get_ml_diagnostics(assessment_vector, compulsory_gap)
+            "status": lambda: "Incomplete" if ctx["skill_gap"] else "Complete",
+            "mapped_occupation": lambda: ctx["mapped_occ"],
+            "skill_gap": lambda: ctx["compulsory_gap"],
+            "recommendations": lambda: results["courses"]["recommendations"],
+            # Fallback advice assignment native to Quiz Engine preventing NameError
+            "caveats": lambda: f"Target {results['skill_intelligence']['snapshot_domain']} roles. Focus on professional certifications to heavily increase technical ranking.",
+            "ml_diagnostics": lambda: results["ml_diagnostics"],
         }
 
     def _get_ml_diagnostics(self, assessment_vector, gap_skills):
@@ -3969,14 +4736,26 @@ class RecommendationEngine:
         }
 
     def suggest_alternate_paths(self, job_title, top_n=5, assessment_vector=None):
-        """Simplified version using esco similarity, returns detailed dictionaries"""
-        job_emb = self.model.encode(job_title, convert_to_tensor=True)
-        hits = util.semantic_search(job_emb, self.esco_occ_embs, top_k=top_n+10)[0]
-        
+        """Pivot roles from the transferability matrix row, falling back to esco similarity"""
         status_level = assessment_vector.get("status_level", 1) if assessment_vector else 1
+        key = ("alternate_paths", str(job_title).strip(), top_n, status_level <= 1)
+        return self.singleflight.do(key, lambda: self._compute_alternate_paths(job_title, top_n, status_level))[0]
+
+    def _compute_alternate_paths(self, job_title, top_n, status_level):
         senior_keys = ["chief", "director", "head", "president", "ceo", "cfo", "cto", "vp"]
 
         paths = []
+        for alt in self.get_transferable_roles(job_title, top_n=top_n + 10):
+            if status_level <= 1 and any(sk in alt["title"].lower() for sk in senior_keys):
+                continue
+            paths.append({"title": alt["title"], "similarity": alt["score"]})
+            if len(paths) >= top_n:
+                return paths
+        if paths:
+            return paths
+
+        job_emb = self.model.encode(job_title, convert_to_tensor=True)
+        hits = util.semantic_search(job_emb, self.esco_occ_embs, top_k=top_n+10)[0]
         for h in hits:
             alt_job = self.esco_occ.iloc[h["corpus_id"]]["preferredLabel"]
             
@@ -4012,7 +4791,14 @@ class RecommendationEngine:
         # Check cache
         if field in self._trend_cache:
             return self._trend_cache[field]
-        
+
+        # Concurrent misses for the same field share one KMeans run
+        return self.singleflight.do(("trends", field), lambda: self._compute_market_trends(field), copy_shared=False)[0]
+
+    def _compute_market_trends(self, field):
+        if field in self._trend_cache:
+            return self._trend_cache[field]
+
         # Lazy re-init: if trend_analyzer is None or was built on empty data, rebuild now
         if self.trend_analyzer is None or (hasattr(self.trend_analyzer, 'jobs_df') and self.trend_analyzer.jobs_df.empty and not self.jobs_df.empty):
             try:
@@ -4048,7 +4834,8 @@ class RecommendationEngine:
         courses = self.recommend_courses(
             user_skills=[], 
             target_job=user_query, 
-            top_n=top_n
+            top_n=top_n,
+            sections=["recommendations"]
         )
         
         # Compress into a string
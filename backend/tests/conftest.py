@@ -0,0 +1,119 @@
+import os
+import sys
+import tempfile
+import types
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+BACKEND_ROOT = Path(__file__).resolve().parent.parent
+ML_ROOT = BACKEND_ROOT.parent / "Machine Learning and Data Cleaning"
+sys.path.insert(0, str(BACKEND_ROOT))
+sys.path.append(str(ML_ROOT))
+
+# resume_api opens its job queue at import time; keep its database out of the tree
+_JOBS_TMP = tempfile.mkdtemp(prefix="resume_jobs_test_")
+os.environ.setdefault("RESUME_JOBS_DB", os.path.join(_JOBS_TMP, "resume_jobs.db"))
+os.environ.setdefault("RESUME_JOBS_DIR", os.path.join(_JOBS_TMP, "uploads"))
+
+from core.logic.bundle_state import BundleStateStore
+from core.recommendation_engine import RecommendationEngine
+
+# Routers bind `engine` from app.main at import time; loading the real one needs MongoDB and the models
+if "app.main" not in sys.modules:
+    import app
+
+    stub_main = types.ModuleType("app.main")
+    stub_main.engine = None
+    sys.modules["app.main"] = stub_main
+    app.main = stub_main
+
+from app.database import Base, get_db
+from app.models import User
+
+
+class StubEngine:
+    """Stands in for RecommendationEngine in router tests; records what the routes ask of it."""
+
+    BUNDLE_PRESETS = RecommendationEngine.BUNDLE_PRESETS
+    BUNDLE_KEY_SECTIONS = RecommendationEngine.BUNDLE_KEY_SECTIONS
+    resolve_bundle_keys = RecommendationEngine.resolve_bundle_keys
+
+    def __init__(self):
+        self.calls = []
+        self.bundle_states = BundleStateStore()
+
+    def process_comprehensive_assessment(self, answers):
+        return {"extracted_intent_skills": ["Python"], "domain": "IT", "budget_category": answers.get("budget_range")}
+
+    def get_recommendations_from_assessment(self, assessment_vector, target_job=None, sections=None,
+                                            on_section=None, session_id=None, deadline_ms=None):
+        self.calls.append({"target_job": target_job, "sections": sections, "session_id": session_id})
+        bundle = {"career_snapshot": {"target_role": target_job}, "job_opportunities": [], "skill_gap_courses": []}
+        # Same state store the real engine keys by session_id
+        if session_id is not None:
+            self.bundle_states.put(session_id, {"target_job": target_job}, assessment_vector, None, bundle)
+        if on_section is not None:
+            for key, value in bundle.items():
+                on_section(key, value)
+        return bundle
+
+    def get_recommendations_batch(self, items, sections=None, progress=None):
+        self.calls.append({"batch": len(items), "sections": sections})
+        bundles = []
+        for item in items:
+            bundles.append({"career_snapshot": {"target_role": item["target_job"]}, "job_opportunities": []})
+            if progress is not None:
+                progress(len(bundles), len(items))
+        return bundles
+
+    def what_if(self, session_id, changes):
+        state = self.bundle_states.get(session_id)
+        if state is None:
+            raise KeyError(f"No bundle state for session '{session_id}'; run an assessment first")
+        self.calls.append({"what_if": session_id, "changes": changes})
+        bundle = dict(state["bundle"], section_timings={"total": 0.0})
+        return {"bundle": bundle, "full_bundle": True, "changed_sections": [], "recomputed_sections": []}
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+
+@pytest.fixture
+def db_session(session_factory):
+    session = session_factory()
+    # auth.verify_token resolves every bearer token to this account
+    session.add(User(name="Dummy", email="dummy@test.com", hashed_password="x"))
+    session.commit()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def stub_engine(monkeypatch):
+    from app.routers import skill_assessment
+
+    engine = StubEngine()
+    monkeypatch.setattr(skill_assessment, "engine", engine)
+    return engine
+
+
+@pytest.fixture
+def assessment_client(stub_engine, db_session, session_factory, monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from app.routers import skill_assessment
+
+    # The SSE route opens its own session from a worker thread
+    monkeypatch.setattr(skill_assessment, "SessionLocal", session_factory)
+    api = FastAPI()
+    api.include_router(skill_assessment.router, prefix="/api")
+    api.dependency_overrides[get_db] = lambda: db_session
+    return TestClient(api)
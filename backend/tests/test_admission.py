@@ -0,0 +1,73 @@
+import asyncio
+
+import httpx
+from fastapi import FastAPI
+
+from app.admission import AdmissionController, AdmissionMiddleware, AdmissionPool, default_pools
+
+
+def test_only_heavy_routes_are_admission_controlled():
+    controller = AdmissionController(default_pools())
+    assert controller.pool_for("POST", "/api/skill-assessment").name == "assessment"
+    assert controller.pool_for("POST", "/api/skill-assessment/stream").name == "assessment"
+    assert controller.pool_for("POST", "/api/skill-assessment/what-if").name == "what_if"
+    assert controller.pool_for("POST", "/api/resume/upload").name == "resume"
+    # Status polling, batch submission and CORS preflights bypass the pools
+    assert controller.pool_for("GET", "/api/skill-assessment/batch/abc") is None
+    assert controller.pool_for("POST", "/api/skill-assessment/batch") is None
+    assert controller.pool_for("GET", "/api/resume/jobs/abc") is None
+    assert controller.pool_for("OPTIONS", "/api/skill-assessment") is None
+
+
+def _app(pool):
+    """POST /heavy blocks until POST /open; GET /heavy/status is outside the pool."""
+    api = FastAPI()
+    api.add_middleware(AdmissionMiddleware, controller=AdmissionController([pool]))
+    gate = asyncio.Event()
+
+    @api.post("/heavy")
+    async def heavy():
+        await gate.wait()
+        return {"ok": True}
+
+    @api.get("/heavy/status")
+    async def status():
+        return {"status": "running"}
+
+    @api.post("/open")
+    async def open_gate():
+        gate.set()
+        return {}
+
+    return api
+
+
+async def _while_one_request_holds_the_pool(pool, fn):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=_app(pool)), base_url="http://test") as http:
+        first = asyncio.create_task(http.post("/heavy"))
+        while pool.in_flight == 0:
+            await asyncio.sleep(0.01)
+        out = await fn(http)
+        await http.post("/open")
+        return await first, out
+
+
+def test_full_queue_rejects_with_retry_after_but_polling_passes():
+    pool = AdmissionPool("heavy", [("POST", "/heavy")], max_concurrent=1, max_queue=0, queue_timeout=5)
+
+    async def during(http):
+        return await http.post("/heavy"), await http.get("/heavy/status")
+
+    first, (busy, polled) = asyncio.run(_while_one_request_holds_the_pool(pool, during))
+    assert busy.status_code == 429 and int(busy.headers["retry-after"]) >= 1
+    assert polled.status_code == 200
+    assert first.status_code == 200 and "x-queue-wait-ms" in first.headers
+    assert pool.stats()["rejected_queue_full"] == 1 and pool.in_flight == 0
+
+
+def test_queue_timeout_returns_503():
+    pool = AdmissionPool("heavy", [("POST", "/heavy")], max_concurrent=1, max_queue=1, queue_timeout=0.05)
+
+    _, waited = asyncio.run(_while_one_request_holds_the_pool(pool, lambda http: http.post("/heavy")))
+    assert waited.status_code == 503
+    assert pool.stats()["rejected_timeout"] == 1
@@ -0,0 +1,52 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.routers import resume_api
+
+
+class ATSEngine:
+    def __init__(self, jobs=30):
+        self.jobs = jobs
+        self.calls = []
+
+    def ats_match(self, resumes, top_k=10, filters=None, include_matrix=False, max_matrix_cells=None):
+        self.calls.append({"resumes": len(resumes), "top_k": top_k, "max_matrix_cells": max_matrix_cells})
+        if include_matrix and max_matrix_cells and len(resumes) * self.jobs > max_matrix_cells:
+            raise ValueError("Match matrix too large; narrow the jobs with filters")
+        return {"jobs_considered": self.jobs, "matches": [[] for _ in resumes]}
+
+
+@pytest.fixture
+def ats(monkeypatch):
+    stub = ATSEngine()
+    monkeypatch.setattr(resume_api, "engine", stub)
+    api = FastAPI()
+    api.include_router(resume_api.router, prefix="/api")
+    return TestClient(api), stub
+
+
+def test_ats_match_ranks_within_the_caps(ats):
+    client, stub = ats
+    r = client.post("/api/resume/ats-match", json={"resumes": [["Python"], ["SQL"]], "top_k": resume_api.ATS_MAX_TOP_K})
+    assert r.status_code == 200
+    assert r.json() == {"success": True, "jobs_considered": 30, "matches": [[], []]}
+    assert stub.calls == [{"resumes": 2, "top_k": resume_api.ATS_MAX_TOP_K, "max_matrix_cells": resume_api.ATS_MAX_MATRIX_CELLS}]
+
+
+@pytest.mark.parametrize("payload", [
+    {"resumes": [["Python"]] * (resume_api.ATS_MAX_RESUMES + 1)},
+    {"resumes": [["Python"]], "top_k": resume_api.ATS_MAX_TOP_K + 1},
+])
+def test_ats_match_rejects_requests_past_the_caps(ats, payload):
+    client, stub = ats
+    assert client.post("/api/resume/ats-match", json=payload).status_code == 422
+    assert stub.calls == []
+
+
+def test_ats_match_refuses_an_oversized_matrix(ats, monkeypatch):
+    client, stub = ats
+    monkeypatch.setattr(resume_api, "ATS_MAX_MATRIX_CELLS", 50)
+    r = client.post("/api/resume/ats-match", json={"resumes": [["Python"], ["SQL"]], "include_matrix": True})
+    assert r.status_code == 400
+    assert "filters" in r.json()["detail"]
@@ -0,0 +1,73 @@
+import threading
+import time
+
+import pytest
+
+from app.routers import skill_assessment
+
+AUTH = {"Authorization": "Bearer token"}
+
+
+def _student(i):
+    return {"name": f"Student {i}", "email": f"s{i}@uni.lk", "domain": "IT", "target_role": "Data Scientist", "skills": ["Python"]}
+
+
+@pytest.fixture(autouse=True)
+def fresh_jobs(monkeypatch):
+    monkeypatch.setattr(skill_assessment, "BATCH_JOBS", {})
+
+
+def _wait(client, job_id, headers=AUTH):
+    for _ in range(200):
+        body = client.get(f"/api/skill-assessment/batch/{job_id}", headers=headers).json()
+        if body["status"] in ("completed", "failed"):
+            return body
+        time.sleep(0.01)
+    pytest.fail("batch never finished")
+
+
+def test_batch_runs_every_item_and_reports_results(assessment_client, stub_engine):
+    r = assessment_client.post("/api/skill-assessment/batch", json={"items": [_student(1), _student(2)], "sections": "dashboard"}, headers=AUTH)
+    assert r.status_code == 202
+    body = _wait(assessment_client, r.json()["job_id"])
+    assert body["status"] == "completed"
+    assert body["progress"] == {"profiled": 2, "done": 2, "total": 2}
+    assert [res["email"] for res in body["results"]] == ["s1@uni.lk", "s2@uni.lk"]
+    assert body["results"][0]["bundle"]["career_snapshot"] == {"target_role": "Data Scientist"}
+    assert stub_engine.calls == [{"batch": 2, "sections": "dashboard"}]
+
+
+def test_batch_requires_a_signed_in_submitter(assessment_client, stub_engine):
+    assert assessment_client.post("/api/skill-assessment/batch", json={"items": [_student(1)]}).status_code == 401
+    r = assessment_client.post("/api/skill-assessment/batch", json={"items": [_student(1)]}, headers=AUTH)
+    assert assessment_client.get(f"/api/skill-assessment/batch/{r.json()['job_id']}").status_code == 401
+
+
+def test_only_the_submitter_can_read_a_batch(assessment_client, stub_engine, monkeypatch):
+    job_id = assessment_client.post("/api/skill-assessment/batch", json={"items": [_student(1)]}, headers=AUTH).json()["job_id"]
+    _wait(assessment_client, job_id)
+    monkeypatch.setattr(skill_assessment, "_token_email", lambda authorization: "someone@else.lk")
+    assert assessment_client.get(f"/api/skill-assessment/batch/{job_id}", headers=AUTH).status_code == 404
+
+
+def test_oversized_batch_is_rejected(assessment_client, stub_engine):
+    items = [_student(i) for i in range(skill_assessment.BATCH_MAX_ITEMS + 1)]
+    r = assessment_client.post("/api/skill-assessment/batch", json={"items": items}, headers=AUTH)
+    assert r.status_code == 422
+    assert stub_engine.calls == []
+
+
+def test_new_batches_are_refused_while_too_many_are_pending(assessment_client, stub_engine, monkeypatch):
+    gate = threading.Event()
+    batch = stub_engine.get_recommendations_batch
+    monkeypatch.setattr(stub_engine, "get_recommendations_batch", lambda *a, **k: gate.wait(5) and batch(*a, **k))
+    monkeypatch.setattr(skill_assessment, "BATCH_MAX_PENDING", 1)
+
+    first = assessment_client.post("/api/skill-assessment/batch", json={"items": [_student(1)]}, headers=AUTH)
+    refused = assessment_client.post("/api/skill-assessment/batch", json={"items": [_student(2)]}, headers=AUTH)
+    assert first.status_code == 202
+    assert refused.status_code == 429 and refused.headers["retry-after"]
+
+    gate.set()
+    assert _wait(assessment_client, first.json()["job_id"])["status"] == "completed"
+    assert assessment_client.post("/api/skill-assessment/batch", json={"items": [_student(3)]}, headers=AUTH).status_code == 202
@@ -0,0 +1,83 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app import mongo
+
+
+def _event(command_name, command, request_id, duration_ms=0.0, connection_id=("localhost", 27017), database="pathfinder_plus"):
+    return SimpleNamespace(command_name=command_name, command=command, request_id=request_id, connection_id=connection_id,
+                           database_name=database, duration_micros=int(duration_ms * 1000))
+
+
+def _run(metrics, command_name, command, request_id, duration_ms, failed=False):
+    metrics.started(_event(command_name, command, request_id))
+    done = _event(command_name, {}, request_id, duration_ms)
+    (metrics.failed if failed else metrics.succeeded)(done)
+
+
+def test_query_metrics_aggregates_latency_per_collection():
+    metrics = mongo.QueryMetrics()
+    for i, ms in enumerate([1.0, 2.0, 3.0, 10.0]):
+        _run(metrics, "find", {"find": "jobs"}, request_id=i, duration_ms=ms, failed=(i == 3))
+    _run(metrics, "insert", {"insert": "users"}, request_id=9, duration_ms=4.0)
+    assert metrics.snapshot() == {
+        "pathfinder_plus.jobs": {"count": 4, "failures": 1, "avg_ms": 4.0, "p95_ms": 10.0, "max_ms": 10.0},
+        "pathfinder_plus.users": {"count": 1, "failures": 0, "avg_ms": 4.0, "p95_ms": 4.0, "max_ms": 4.0},
+    }
+
+
+def test_query_metrics_names_getmore_and_admin_commands():
+    metrics = mongo.QueryMetrics()
+    _run(metrics, "getMore", {"getMore": 12345, "collection": "courses"}, request_id=1, duration_ms=1.0)
+    _run(metrics, "ping", {"ping": 1}, request_id=2, duration_ms=1.0)
+    assert set(metrics.snapshot()) == {"pathfinder_plus.courses", "pathfinder_plus.$cmd"}
+
+
+def test_query_metrics_ignores_replies_it_never_saw_start():
+    metrics = mongo.QueryMetrics()
+    metrics.succeeded(_event("find", {}, request_id=1, duration_ms=5.0))
+    # Same request id on another connection is a different command
+    metrics.started(_event("find", {"find": "jobs"}, request_id=1, connection_id=("a", 1)))
+    metrics.succeeded(_event("find", {}, request_id=1, duration_ms=5.0, connection_id=("b", 1)))
+    assert metrics.snapshot() == {}
+
+
+def test_query_metrics_p95_uses_the_recent_window(monkeypatch):
+    monkeypatch.setattr(mongo.QueryMetrics, "WINDOW", 20)
+    metrics = mongo.QueryMetrics()
+    _run(metrics, "find", {"find": "jobs"}, request_id=0, duration_ms=500.0)
+    for i in range(1, 21):
+        _run(metrics, "find", {"find": "jobs"}, request_id=i, duration_ms=float(i))
+    stats = metrics.snapshot()["pathfinder_plus.jobs"]
+    # The 500 ms outlier has left the window but still counts towards max and the mean
+    assert stats["p95_ms"] == 20.0
+    assert stats["max_ms"] == 500.0
+    assert stats["count"] == 21
+
+
+def test_client_options_read_the_environment(monkeypatch):
+    monkeypatch.setenv("MONGO_MAX_POOL_SIZE", "8")
+    monkeypatch.setenv("MONGO_SOCKET_TIMEOUT_MS", "")
+    monkeypatch.setenv("MONGO_MAX_IDLE_TIME_MS", "60000")
+    assert mongo.client_options() == {"maxPoolSize": 8, "minPoolSize": 0, "serverSelectionTimeoutMS": 5000,
+                                      "connectTimeoutMS": 5000, "maxIdleTimeMS": 60000}
+
+
+@pytest.fixture
+def no_clients(monkeypatch):
+    monkeypatch.setattr(mongo, "_clients", {})
+    yield mongo._clients
+    for client in mongo._clients.values():
+        client.close()
+
+
+def test_sync_client_is_shared_reports_to_metrics_and_reset_after_fork(no_clients, monkeypatch):
+    client = mongo.get_client()
+    assert mongo.get_client() is client
+    assert mongo.METRICS in client.options.event_listeners
+    assert mongo.get_db("other").name == "other"
+
+    monkeypatch.setattr(mongo, "_pid", -1)
+    assert mongo.get_client() is not client
+    client.close()
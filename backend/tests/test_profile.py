@@ -0,0 +1,66 @@
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.database import get_db
+from app.models import User, UserProfile
+from app.serialization import STORED_JSON_MARK, dumps_stored, stored_raw
+
+AUTH = {"Authorization": "Bearer token"}
+
+
+@pytest.fixture
+def profile_client(db_session):
+    from app.routers import profile
+
+    api = FastAPI()
+    api.include_router(profile.router)
+    api.dependency_overrides[get_db] = lambda: db_session
+    return TestClient(api)
+
+
+def _store(db_session, last_bundle):
+    user = db_session.query(User).filter(User.email == "dummy@test.com").one()
+    db_session.add(UserProfile(user_id=user.id, state="MATCHED", last_bundle=last_bundle))
+    db_session.commit()
+
+
+def _cached_results(client):
+    r = client.get("/api/profile/status", headers=AUTH)
+    assert r.status_code == 200
+    # Parsed strictly: the spliced body must be valid JSON whatever the row held
+    return json.loads(r.text, parse_constant=lambda c: pytest.fail(f"non-JSON constant {c}"))["cached_results"]
+
+
+def test_marked_bundle_is_spliced_without_parsing(profile_client, db_session, monkeypatch):
+    from app import serialization
+    from app.routers import profile
+
+    _store(db_session, dumps_stored({"career_snapshot": {"target_role": "Data Scientist"}}))
+    monkeypatch.setattr(serialization, "loads", lambda data: pytest.fail("stored bundle was parsed"))
+    monkeypatch.setattr(profile, "load_legacy_object", lambda text: pytest.fail("stored bundle was parsed"))
+    assert _cached_results(profile_client) == {"career_snapshot": {"target_role": "Data Scientist"}}
+
+
+def test_dumps_stored_only_writes_json_objects():
+    assert stored_raw(dumps_stored({"score": float("nan")})) == b'{"score":null}'
+    assert stored_raw('{"unmarked": true}') is None
+    with pytest.raises(TypeError):
+        dumps_stored([1, 2])
+
+
+@pytest.mark.parametrize("row", ['{"career_snapshot": {"target_role": "Data', "{not json}", "[]", "", None])
+def test_unusable_rows_fall_back_to_an_empty_object(profile_client, db_session, row):
+    _store(db_session, row)
+    assert _cached_results(profile_client) == {}
+    # Left as found rather than overwritten
+    assert db_session.query(UserProfile).one().last_bundle == row
+
+
+def test_legacy_row_is_parsed_once_and_stored_marked(profile_client, db_session):
+    _store(db_session, '{"match_score": NaN, "ok": 1}')
+    assert _cached_results(profile_client) == {"match_score": None, "ok": 1}
+    assert db_session.query(UserProfile).one().last_bundle == STORED_JSON_MARK + '{"match_score":null,"ok":1}'
+    assert _cached_results(profile_client) == {"match_score": None, "ok": 1}
@@ -0,0 +1,86 @@
+import threading
+import time
+
+import pytest
+
+from app.resume_jobs import ResumeJobQueue
+from app.uploads import BufferedUpload
+
+
+def _upload(data=b"%PDF-1.4 resume"):
+    upload = BufferedUpload("cv.pdf")
+    upload.write(data)
+    upload.finish()
+    return upload
+
+
+def _queue(tmp_path, handler, **kwargs):
+    return ResumeJobQueue(str(tmp_path / "jobs.db"), str(tmp_path / "uploads"), handler, **kwargs)
+
+
+def _wait(queue, job_id, statuses=("completed", "failed", "timed_out"), timeout=5):
+    give_up = time.monotonic() + timeout
+    while time.monotonic() < give_up:
+        job = queue.get(job_id)
+        if job["status"] in statuses:
+            return job
+        time.sleep(0.01)
+    pytest.fail(f"job stayed {queue.get(job_id)['status']}")
+
+
+def _orphan(tmp_path, lease_until, attempts=1):
+    """A job left 'running' by another process, whose lease ends at lease_until."""
+    release = threading.Event()
+    first = _queue(tmp_path, lambda job, ctx: release.wait(5) or {}, max_attempts=2)
+    job_id = first.submit(_upload(), "cv.pdf", ".pdf")
+    _wait(first, job_id, statuses=("running",))
+    first.close()
+    first._set(job_id, owner="other-host:1", lease_until=lease_until, attempts=attempts)
+    return job_id, release
+
+
+def test_claimed_jobs_carry_an_owner_and_a_renewed_lease(tmp_path):
+    release = threading.Event()
+    queue = _queue(tmp_path, lambda job, ctx: release.wait(5) and {"ok": True}, lease_s=0.15)
+    job_id = queue.submit(_upload(), "cv.pdf", ".pdf")
+    job = _wait(queue, job_id, statuses=("running",))
+    assert job["owner"] == queue.owner
+    time.sleep(0.3)
+    # Still running past the first lease: the heartbeat extended it
+    assert queue.get(job_id)["lease_until"] > time.time()
+    release.set()
+    job = _wait(queue, job_id)
+    assert job["status"] == "completed" and job["owner"] is None
+    queue.close()
+
+
+def test_recovery_leaves_jobs_with_a_live_lease_alone(tmp_path):
+    job_id, release = _orphan(tmp_path, lease_until=time.time() + 60)
+    calls = []
+    queue = _queue(tmp_path, lambda job, ctx: calls.append(job["id"]) or {})
+    time.sleep(0.1)
+    job = queue.get(job_id)
+    assert job["status"] == "running" and job["owner"] == "other-host:1"
+    assert calls == []
+    release.set()
+    queue.close()
+
+
+def test_recovery_requeues_jobs_whose_lease_expired(tmp_path):
+    job_id, release = _orphan(tmp_path, lease_until=time.time() - 1)
+    release.set()
+    queue = _queue(tmp_path, lambda job, ctx: {"ok": True}, max_attempts=2)
+    job = _wait(queue, job_id)
+    assert job["status"] == "completed" and job["attempts"] == 2
+    queue.close()
+
+
+def test_recovery_fails_jobs_that_used_up_their_attempts(tmp_path):
+    job_id, release = _orphan(tmp_path, lease_until=time.time() - 1, attempts=2)
+    release.set()
+    calls = []
+    queue = _queue(tmp_path, lambda job, ctx: calls.append(job["id"]) or {}, max_attempts=2)
+    job = queue.get(job_id)
+    assert job["status"] == "failed" and "2 attempt" in job["error"]
+    assert calls == []
+    queue.close()
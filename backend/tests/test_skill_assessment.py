@@ -0,0 +1,106 @@
+import asyncio
+import threading
+
+from app.serialization import STORED_JSON_MARK
+from tests.conftest import StubEngine
+
+QUIZ = {"role": "Working Professional", "domain": "IT", "target_role": "Data Scientist", "skills": ["Python", "SQL"]}
+
+
+def test_unknown_sections_are_rejected_before_any_work(assessment_client, stub_engine):
+    r = assessment_client.post("/api/skill-assessment?sections=courses,not_a_section", json=QUIZ)
+    assert r.status_code == 400
+    assert "not_a_section" in r.json()["detail"]
+    assert stub_engine.calls == []
+
+
+def test_known_preset_is_passed_through(assessment_client, stub_engine):
+    r = assessment_client.post("/api/skill-assessment?sections=dashboard", json=QUIZ)
+    assert r.status_code == 200
+    assert r.json()["success"] is True
+    assert stub_engine.calls[0]["sections"] == "dashboard"
+
+
+AUTH = {"Authorization": "Bearer token"}
+
+
+def test_authenticated_assessment_keys_state_by_account_and_persists(assessment_client, stub_engine, db_session):
+    from app.models import UserProfile
+
+    r = assessment_client.post("/api/skill-assessment", json=QUIZ, headers=AUTH)
+    body = r.json()
+    assert r.status_code == 200
+    assert "error" not in body["bundle"]
+    # auth.verify_token returns the token payload; the session is its "sub"
+    assert stub_engine.calls[0]["session_id"] == "dummy@test.com"
+    profile = db_session.query(UserProfile).one()
+    assert profile.state == "MATCHED" and profile.last_bundle.startswith(STORED_JSON_MARK)
+
+
+def test_authenticated_stream_completes(assessment_client, stub_engine):
+    with assessment_client.stream("POST", "/api/skill-assessment/stream", json=QUIZ, headers=AUTH) as r:
+        events = [line[len("event: "):] for line in r.iter_lines() if line.startswith("event: ")]
+    assert "error" not in events
+    assert events[0] == "profile" and events[-1] == "bundle"
+    assert stub_engine.calls[0]["session_id"] == "dummy@test.com"
+
+
+def test_what_if_requires_a_verified_identity(assessment_client, stub_engine):
+    assessment_client.post("/api/skill-assessment", json=QUIZ, headers=AUTH)
+    # An email in the body is not an identity
+    r = assessment_client.post("/api/skill-assessment/what-if", json={"email": "dummy@test.com", "changes": {"weekly_availability": "20+ hours"}})
+    assert r.status_code == 401
+    assert not any("what_if" in c for c in stub_engine.calls)
+
+
+def test_what_if_for_the_signed_in_user(assessment_client, stub_engine):
+    assessment_client.post("/api/skill-assessment", json=QUIZ, headers=AUTH)
+    r = assessment_client.post("/api/skill-assessment/what-if", json={"changes": {"weekly_availability": "20+ hours"}}, headers=AUTH)
+    assert r.status_code == 200
+    assert stub_engine.calls[-1] == {"what_if": "dummy@test.com", "changes": {"time_commitment": "20+ hours"}}
+
+
+class GatedEngine(StubEngine):
+    """Emits career_snapshot, then waits for `gate` before the next section."""
+
+    def __init__(self):
+        super().__init__()
+        self.gate = threading.Event()
+        self.finished = threading.Event()
+        self.abandoned = False
+
+    def get_recommendations_from_assessment(self, assessment_vector, target_job=None, sections=None,
+                                            on_section=None, session_id=None, deadline_ms=None):
+        try:
+            on_section("career_snapshot", {"target_role": target_job})
+            self.gate.wait(5)
+            on_section("job_opportunities", [])
+            return {"career_snapshot": {"target_role": target_job}, "job_opportunities": []}
+        except Exception:
+            self.abandoned = True
+            raise
+        finally:
+            self.finished.set()
+
+
+def test_disconnected_stream_abandons_the_run_and_persists_nothing(db_session, session_factory, monkeypatch):
+    from app.models import UserProfile
+    from app.routers import skill_assessment
+
+    engine = GatedEngine()
+    monkeypatch.setattr(skill_assessment, "engine", engine)
+    monkeypatch.setattr(skill_assessment, "SessionLocal", session_factory)
+    response = skill_assessment.stream_quiz(skill_assessment.QuizData(**QUIZ), authorization="Bearer token", x_deadline_ms=None)
+
+    async def read_two_then_disconnect():
+        body = response.body_iterator
+        events = [await body.__anext__(), await body.__anext__()]
+        await body.aclose()
+        return events
+
+    events = asyncio.run(read_two_then_disconnect())
+    assert events[0].startswith("event: profile") and events[1].startswith("event: career_snapshot")
+    engine.gate.set()
+    assert engine.finished.wait(5)
+    assert engine.abandoned
+    assert db_session.query(UserProfile).count() == 0
@@ -0,0 +1,82 @@
+import asyncio
+
+import httpx
+from fastapi import FastAPI, File, UploadFile
+
+from app.uploads import UploadLimitMiddleware, read_upload
+
+LIMIT = 256 * 1024
+BOUNDARY = "limit-test"
+
+
+def _app():
+    """POST /upload through UploadLimitMiddleware; `seen` counts the body bytes the app pulled."""
+    api = FastAPI()
+    calls = []
+
+    @api.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        with await read_upload(file, max_bytes=LIMIT) as buffered:
+            calls.append(buffered.size)
+            return {"size": buffered.size, "sha256": buffered.digest}
+
+    limited = UploadLimitMiddleware(api, max_bytes=LIMIT, overhead_bytes=4096)
+    seen = {"bytes": 0}
+
+    async def counting(scope, receive, send):
+        async def counted():
+            message = await receive()
+            seen["bytes"] += len(message.get("body", b""))
+            return message
+        await limited(scope, counted, send)
+
+    return counting, calls, seen
+
+
+def _form():
+    head = (f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"cv.pdf\"\r\n"
+            "Content-Type: application/pdf\r\n\r\n").encode()
+    return head, f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+def _post(app, body, headers=None):
+    async def go():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post("/upload", content=body, headers={
+                "content-type": f"multipart/form-data; boundary={BOUNDARY}", **(headers or {})})
+    return asyncio.run(go())
+
+
+def test_upload_within_the_limit_is_read():
+    app, calls, _ = _app()
+    head, tail = _form()
+    r = _post(app, head + b"x" * 1000 + tail)
+    assert r.status_code == 200 and r.json()["size"] == 1000
+    assert calls == [1000]
+
+
+def test_declared_oversized_body_is_rejected_before_it_is_read():
+    app, calls, seen = _app()
+    head, tail = _form()
+    r = _post(app, head + b"x" * (LIMIT * 4) + tail)
+    assert r.status_code == 413
+    assert calls == [] and seen["bytes"] == 0
+
+
+def test_chunked_oversized_body_is_cut_off_while_it_arrives():
+    app, calls, seen = _app()
+    head, tail = _form()
+    chunk = b"x" * (32 * 1024)
+
+    async def body():
+        yield head
+        for _ in range(LIMIT * 8 // len(chunk)):
+            yield chunk
+        yield tail
+
+    r = _post(app, body())
+    assert r.status_code == 413
+    assert calls == []
+    # Stopped a chunk past the limit, not after the whole 2MB body
+    assert seen["bytes"] <= LIMIT + 4096 + len(chunk) + len(head)